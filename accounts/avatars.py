@@ -0,0 +1,142 @@
+"""Resize uploaded avatars into a few fixed-size, metadata-free variants.
+
+The original upload is decoded once with Pillow, orientation is applied, and
+each size is re-encoded without EXIF/ICC data. Work runs on the ``media``
+executor after the upload commits, so the request returns straight away;
+until the variants land, serializers keep pointing at the original.
+"""
+
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from marvel_rivals.executors import ExecutorSaturated, get_executor
+
+from .models import Profile
+
+logger = logging.getLogger(__name__)
+
+# Square edge length in pixels, largest first so each size is cut from the
+# previous one rather than from the full original.
+AVATAR_SIZES = {
+    'large': 256,
+    'medium': 128,
+    'small': 64,
+}
+AVATAR_FORMATS = {
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def avatar_url(profile, size, request=None):
+    """Absolute URL of the ``size`` variant, or of the original until it exists."""
+    if not profile or not profile.avatar:
+        return None
+
+    variant = _current_variants(profile).get(size)
+    url = default_storage.url(variant) if variant else profile.avatar.url
+    if url.startswith('http'):
+        return url
+    base = request.build_absolute_uri('/') if request else 'http://127.0.0.1:8000/'
+    return f"{base.rstrip('/')}{url}"
+
+
+def _current_variants(profile):
+    variants = profile.avatar_variants or {}
+    if variants.get('source') != profile.avatar.name:
+        return {}
+    return variants.get('sizes', {})
+
+
+def render_variants(fp, image_format=None):
+    """Yield ``(size_name, extension, bytes)`` for every entry in AVATAR_SIZES."""
+    from PIL import Image, ImageOps
+
+    image_format = image_format or getattr(settings, 'AVATAR_VARIANT_FORMAT', 'WEBP')
+    extension, save_options = AVATAR_FORMATS[image_format]
+    largest = max(AVATAR_SIZES.values())
+
+    with Image.open(fp) as original:
+        # Let JPEG decode at a reduced scale when the source is much bigger.
+        original.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(original)
+
+    has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+    if has_alpha and image_format == 'WEBP':
+        image = image.convert('RGBA')
+    elif has_alpha:
+        # JPEG has no alpha; flatten onto white rather than letting
+        # convert('RGB') turn transparent pixels black.
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image).convert('RGB')
+    else:
+        image = image.convert('RGB')
+
+    for name, edge in AVATAR_SIZES.items():
+        image = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        # No exif/icc_profile arguments: the re-encoded file carries no metadata.
+        image.save(buffer, image_format, **save_options)
+        yield name, extension, buffer.getvalue()
+
+
+def build_avatar_variants(profile_id, avatar_name):
+    """Render and store variants for ``avatar_name`` if it is still current."""
+    profile = Profile.objects.filter(pk=profile_id, avatar=avatar_name).first()
+    if profile is None:
+        return None
+
+    sizes = {}
+    with profile.avatar.open('rb') as fp:
+        for name, extension, data in render_variants(fp):
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            path = f'avatars/variants/{profile_id}/{digest}-{name}.{extension}'
+            sizes[name] = default_storage.save(path, ContentFile(data))
+
+    # Only publish if the user hasn't uploaded something else meanwhile.
+    updated = Profile.objects.filter(pk=profile_id, avatar=avatar_name).update(
+        avatar_variants={'source': avatar_name, 'sizes': sizes},
+    )
+    if not updated:
+        _delete_quietly(sizes.values())
+        return None
+
+    previous = (profile.avatar_variants or {}).get('sizes', {})
+    _delete_quietly(name for name in previous.values() if name not in sizes.values())
+    return sizes
+
+
+def schedule_avatar_variants(profile):
+    """Queue variant generation once the current transaction commits."""
+    profile_id, avatar_name = profile.pk, profile.avatar.name
+
+    def submit():
+        try:
+            get_executor('media').submit(_build_logged, profile_id, avatar_name)
+        except ExecutorSaturated:
+            logger.warning('Media executor saturated; avatar %s kept unresized.', avatar_name)
+
+    transaction.on_commit(submit)
+
+
+def _build_logged(profile_id, avatar_name):
+    try:
+        return build_avatar_variants(profile_id, avatar_name)
+    except Exception:
+        logger.exception('Avatar variant generation failed for profile %s', profile_id)
+        return None
+
+
+def _delete_quietly(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except Exception:
+            logger.warning('Could not delete stale avatar variant %s', name)
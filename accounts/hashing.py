@@ -0,0 +1,77 @@
+"""Password hashing that runs on the bounded ``hashing`` executor.
+
+PBKDF2 costs tens of milliseconds of CPU per call. Running it on a small
+dedicated pool caps how many login/register hashes run at once. The request
+thread still waits for its result; when the pool's queue is full the call
+raises ``ExecutorSaturated`` instead of queueing behind the others. The login
+and register API endpoints turn that into a 503 (``HashingBusy``); other
+callers, such as the admin login, see the plain exception. hashlib
+releases the GIL while hashing, so a thread pool gets real parallelism here.
+
+Logins go through ``django.contrib.auth.authenticate()`` as usual, so
+``AUTHENTICATION_BACKENDS`` and the ``user_logged_in``/``user_login_failed``
+signals behave as they would without the pool; ``PooledModelBackend`` is the
+backend that hashes on it.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth import hashers
+from django.contrib.auth.backends import ModelBackend
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from marvel_rivals.executors import get_executor
+
+
+class HashingBusy(APIException):
+    """``ExecutorSaturated`` from the hashing pool, as the API reports it."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts right now, please retry shortly.'
+    default_code = 'hashing_busy'
+
+
+def _run(fn, *args, **kwargs):
+    """Run ``fn`` on the hashing pool; raises ``ExecutorSaturated`` when full."""
+    return get_executor('hashing').run(fn, *args, **kwargs)
+
+
+def make_password(raw_password):
+    return _run(hashers.make_password, raw_password)
+
+
+def _check(raw_password, encoded):
+    # check_password calls the setter when the stored hash needs upgrading.
+    upgrade = []
+    ok = hashers.check_password(raw_password, encoded, setter=upgrade.append)
+    return ok, bool(upgrade)
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend whose password checks run on the ``hashing`` pool.
+
+    Only the hashing runs on the pool; all DB access stays on the calling
+    thread and its connection.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so response time doesn't reveal which usernames exist.
+            make_password(password)
+            return None
+
+        ok, needs_upgrade = _run(_check, password, user.password)
+        if not ok or not self.user_can_authenticate(user):
+            return None
+
+        if needs_upgrade:
+            user.password = make_password(password)
+            user.save(update_fields=['password'])
+        return user
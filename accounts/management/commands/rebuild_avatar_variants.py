@@ -0,0 +1,38 @@
+"""
+Generate resized avatar variants for profiles that don't have them yet.
+
+Run:
+    python manage.py rebuild_avatar_variants
+    python manage.py rebuild_avatar_variants --force
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import build_avatar_variants
+from accounts.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Backfill resized avatar variants for uploaded profile avatars."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render variants even when they are already current.",
+        )
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.exclude(avatar="").exclude(avatar__isnull=True)
+        built = 0
+        for profile in profiles.iterator():
+            current = (profile.avatar_variants or {}).get("source") == profile.avatar.name
+            if current and not options["force"]:
+                continue
+            try:
+                if build_avatar_variants(profile.pk, profile.avatar.name):
+                    built += 1
+            except Exception as exc:
+                self.stderr.write(f"  ! {profile}: {exc}")
+
+        self.stdout.write(f"Built avatar variants for {built} profiles.")
@@ -0,0 +1,60 @@
+"""
+Materialize ProfileStats rows for heavy users.
+
+Run:
+    python manage.py rebuild_profile_stats --min-votes 1000
+    python manage.py rebuild_profile_stats --all
+"""
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+
+from accounts.models import ProfileStats, live_user_stats
+
+
+class Command(BaseCommand):
+    help = "Create/refresh denormalized ProfileStats rows for users with large vote histories."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-votes",
+            type=int,
+            default=500,
+            help="Only users who cast or received at least this many votes.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh every user regardless of vote volume.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        stats = {
+            name: Coalesce(subquery, 0)
+            for name, subquery in live_user_stats().items()
+        }
+        users = User.objects.order_by().annotate(**stats)
+        if not options["all"]:
+            threshold = options["min_votes"]
+            # Users that already have a row are always refreshed.
+            users = users.filter(
+                Q(upvote_count__gte=threshold)
+                | Q(upvotes_received__gte=threshold)
+                | Q(stats__isnull=False)
+            )
+
+        rows = [
+            ProfileStats(user_id=row.pop("pk"), **row)
+            for row in users.values("pk", *stats)
+        ]
+        with transaction.atomic():
+            ProfileStats.objects.filter(
+                user_id__in=[row.user_id for row in rows]
+            ).delete()
+            ProfileStats.objects.bulk_create(rows, batch_size=options["batch_size"])
+
+        self.stdout.write(f"Rebuilt {len(rows)} profile stats rows.")
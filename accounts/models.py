@@ -1,12 +1,66 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 
 class Profile(models.Model):
 	user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
 	avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
 	bio = models.TextField(blank=True, default='')
+	# {"source": <avatar name>, "sizes": {"small": <storage name>, ...}}
+	avatar_variants = models.JSONField(default=dict, blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
 	def __str__(self):
 		return f"Profile({self.user.username})"
+
+
+class ProfileStats(models.Model):
+	"""Denormalized counters for users whose vote history is too big to COUNT per hit.
+
+	Rows are optional: they are created by ``rebuild_profile_stats`` and kept in
+	sync by the signals in ``accounts.signals``. Users without a row fall back
+	to the subqueries in ``annotate_user_stats``.
+	"""
+	user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+	team_count = models.IntegerField(default=0)
+	upvote_count = models.IntegerField(default=0)
+	upvotes_received = models.IntegerField(default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return f"ProfileStats({self.user.username})"
+
+
+def _count_subquery(queryset, outer_field):
+	return Subquery(
+		queryset.filter(**{outer_field: OuterRef('pk')})
+		.order_by()
+		.values(outer_field)
+		.annotate(total=Count('pk'))
+		.values('total')[:1]
+	)
+
+
+def live_user_stats():
+	"""Correlated COUNT subqueries for each stat, keyed by stat name."""
+	from teams.models import Team, Vote
+
+	return {
+		'team_count': _count_subquery(Team.objects.all(), 'user'),
+		'upvote_count': _count_subquery(Vote.objects.all(), 'user'),
+		'upvotes_received': _count_subquery(Vote.objects.all(), 'team__user'),
+	}
+
+
+def annotate_user_stats(queryset):
+	"""Annotate team_count/upvote_count/upvotes_received in the same SELECT.
+
+	A ``ProfileStats`` row wins when present; otherwise each counter falls
+	back to its live COUNT subquery.
+	"""
+	return queryset.annotate(**{
+		name: Coalesce(f'stats__{name}', subquery, 0)
+		for name, subquery in live_user_stats().items()
+	})
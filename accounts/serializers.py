@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from .avatars import avatar_url, schedule_avatar_variants
+from .hashing import HashingBusy, make_password
 from .models import Profile
+from marvel_rivals.executors import ExecutorSaturated
+from marvel_rivals.fieldsets import SparseFieldsetSerializerMixin
 from teams.models import Team, Vote
 from django.contrib.auth.password_validation import validate_password
 
@@ -18,15 +22,20 @@ class RegisterSerializer(serializers.ModelSerializer):
         return attrs
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data.get('email', ''),
+        # Hash on the bounded pool first so the user is written in one INSERT.
+        try:
+            password = make_password(validated_data['password'])
+        except ExecutorSaturated:
+            raise HashingBusy()
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data.get('email', '')),
+            password=password,
         )
-        user.set_password(validated_data['password'])
         user.save()
         return user
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     avatar_url = serializers.SerializerMethodField()
     team_count = serializers.SerializerMethodField()
     upvote_count = serializers.SerializerMethodField()
@@ -39,33 +48,27 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_avatar_url(self, obj):
         profile = getattr(obj, 'profile', None)
-        if profile and profile.avatar:
-            url = profile.avatar.url
-            if url.startswith('http'):
-                return url
-            request = self.context.get('request')
-            base = request.build_absolute_uri('/') if request else 'http://127.0.0.1:8000/'
-            return base.rstrip('/') + url
-        return None
+        return avatar_url(profile, 'large', self.context.get('request'))
 
-    def get_team_count(self, obj):
+    def _stat(self, obj, name, fallback):
+        # Prefer values from annotate_user_stats(); count lazily otherwise.
+        value = getattr(obj, name, None)
+        if value is not None:
+            return value
         try:
-            return Team.objects.filter(user=obj).count()
+            return fallback.count()
         except Exception:
             return 0
 
+    def get_team_count(self, obj):
+        return self._stat(obj, 'team_count', Team.objects.filter(user=obj))
+
     def get_upvote_count(self, obj):
-        try:
-            return Vote.objects.filter(user=obj).count()
-        except Exception:
-            return 0
-    
+        return self._stat(obj, 'upvote_count', Vote.objects.filter(user=obj))
+
     def get_upvotes_received(self, obj):
-        try:
-            return Vote.objects.filter(team__user=obj).count()
-        except Exception:
-            return 0
-    
+        return self._stat(obj, 'upvotes_received', Vote.objects.filter(team__user=obj))
+
     def get_bio(self, obj):
         profile = getattr(obj, 'profile', None)
         return profile.bio if profile else ''
@@ -86,4 +89,6 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
+        if 'avatar' in validated_data and instance.avatar:
+            schedule_avatar_variants(instance)
         return instance
@@ -0,0 +1,37 @@
+"""Keep ``ProfileStats`` counters in step with team and vote changes."""
+
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from teams.models import Team, Vote
+
+from .models import ProfileStats
+
+
+def _bump(field, delta, **lookup):
+    ProfileStats.objects.filter(**lookup).update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Team)
+def team_created(sender, instance, created, **kwargs):
+    if created:
+        _bump('team_count', 1, user_id=instance.user_id)
+
+
+@receiver(post_delete, sender=Team)
+def team_deleted(sender, instance, **kwargs):
+    _bump('team_count', -1, user_id=instance.user_id)
+
+
+@receiver(post_save, sender=Vote)
+def vote_created(sender, instance, created, **kwargs):
+    if created:
+        _bump('upvote_count', 1, user_id=instance.user_id)
+        _bump('upvotes_received', 1, user__teams=instance.team_id)
+
+
+@receiver(post_delete, sender=Vote)
+def vote_deleted(sender, instance, **kwargs):
+    _bump('upvote_count', -1, user_id=instance.user_id)
+    _bump('upvotes_received', -1, user__teams=instance.team_id)
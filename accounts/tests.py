@@ -1,3 +1,171 @@
-from django.test import TestCase
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from marvel_rivals.executors import ExecutorSaturated
+from marvel_rivals.testing import TEST_STORAGES, EndpointBudgetMixin, QuietRequestLogMixin, seed_dataset
+from PIL import Image
+
+from . import avatars
+from .models import Profile
+
+
+def _image_bytes(image, image_format, **options):
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+class ProfileEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset()
+        cls.user = cls.data["teams"][0].user
+
+    def test_own_profile(self):
+        self.assertWithinBudget("/api/auth/profile/", 2, 100, user=self.user)
+
+    def test_public_profile(self):
+        self.assertWithinBudget(f"/api/auth/users/{self.user.username}/", 2, 100)
+        self.assertWithinBudget(f"/api/auth/users/{self.user.username}/?omit=team_count,upvote_count,upvotes_received", 1, 100)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class LoginTests(QuietRequestLogMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("login-user", password="pw-123456!")
+        User.objects.create_user("inactive-user", password="pw-123456!", is_active=False)
+
+    def setUp(self):
+        cache.clear()  # throttle buckets
+        self.failures = []
+        user_login_failed.connect(self.failed)
+        self.addCleanup(user_login_failed.disconnect, self.failed)
+
+    def failed(self, sender, credentials, **kwargs):
+        self.failures.append(credentials["username"])
+
+    def login(self, username, password):
+        return APIClient().post("/api/auth/login/", {"username": username, "password": password}, format="json")
+
+    def test_valid_credentials_get_a_token(self):
+        response = self.login("login-user", "pw-123456!")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["user"]["id"], self.user.id)
+        self.assertEqual(self.failures, [])
+
+    def test_failures_go_through_authenticate(self):
+        for username, password in (
+            ("login-user", "wrong"),
+            ("nobody", "pw-123456!"),
+            ("inactive-user", "pw-123456!"),
+        ):
+            with self.subTest(username=username):
+                self.assertEqual(self.login(username, password).status_code, 400)
+        self.assertEqual(self.failures, ["login-user", "nobody", "inactive-user"])
+
+    @override_settings(AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"])
+    def test_configured_backends_are_used(self):
+        with mock.patch("accounts.hashing._run") as pooled:
+            self.assertEqual(self.login("login-user", "pw-123456!").status_code, 200)
+        pooled.assert_not_called()
+
+    def test_saturated_pool_answers_503(self):
+        with mock.patch("marvel_rivals.executors.BoundedExecutor.run", side_effect=ExecutorSaturated):
+            response = self.login("login-user", "pw-123456!")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["detail"], "Too many sign-in attempts right now, please retry shortly.")
+
+    def test_saturated_pool_outside_the_api(self):
+        # Outside DRF (e.g. the admin login) the backend raises the executor's
+        # own exception, not an APIException.
+        with mock.patch("marvel_rivals.executors.BoundedExecutor.run", side_effect=ExecutorSaturated):
+            with self.assertRaises(ExecutorSaturated):
+                authenticate(None, username="login-user", password="pw-123456!")
+
+    def test_saturated_pool_answers_503_on_register(self):
+        with mock.patch("marvel_rivals.executors.BoundedExecutor.run", side_effect=ExecutorSaturated):
+            response = APIClient().post(
+                "/api/auth/register/",
+                {"username": "busy-user", "password": "Xy7-long-pass!", "password2": "Xy7-long-pass!"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(User.objects.filter(username="busy-user").exists())
+
+
+class AvatarVariantTests(TestCase):
+    def setUp(self):
+        media_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(STORAGES=TEST_STORAGES, MEDIA_ROOT=media_root))
+
+    def variants(self, data, image_format):
+        return {
+            name: Image.open(BytesIO(payload))
+            for name, _extension, payload in avatars.render_variants(BytesIO(data), image_format)
+        }
+
+    def test_sizes_orientation_and_no_metadata(self):
+        # Stored red on top, blue below; orientation 6 displays it turned 90°
+        # clockwise, so blue ends up on the left.
+        image = Image.new("RGB", (400, 400), "red")
+        image.paste("blue", (0, 200, 400, 400))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "Test Camera"
+
+        variants = self.variants(_image_bytes(image, "JPEG", exif=exif), "WEBP")
+        self.assertEqual({name: variant.size for name, variant in variants.items()},
+                         {"large": (256, 256), "medium": (128, 128), "small": (64, 64)})
+        for variant in variants.values():
+            self.assertFalse(variant.getexif())
+            self.assertNotIn("icc_profile", variant.info)
+        large = variants["large"].convert("RGB")
+        left, right = large.getpixel((20, 128)), large.getpixel((236, 128))
+        self.assertGreater(left[2], left[0])
+        self.assertGreater(right[0], right[2])
+
+    def test_transparent_png_flattens_onto_white_for_jpeg(self):
+        image = Image.new("RGBA", (300, 300), (0, 0, 0, 0))
+        image.paste((0, 128, 0, 255), (100, 100, 200, 200))
+
+        large = self.variants(_image_bytes(image, "PNG"), "JPEG")["large"]
+        self.assertEqual(large.mode, "RGB")
+        self.assertTrue(all(channel > 240 for channel in large.getpixel((5, 5))))
+        self.assertGreater(large.getpixel((128, 128))[1], 100)
+
+        webp = self.variants(_image_bytes(image, "PNG"), "WEBP")["large"]
+        self.assertEqual(webp.getpixel((5, 5))[3], 0)  # WebP keeps the alpha
+
+    def test_stale_job_does_not_publish_over_a_newer_upload(self):
+        user = User.objects.create_user("avatar-user")
+        png = _image_bytes(Image.new("RGB", (300, 300), "red"), "PNG")
+        first = avatars.default_storage.save("avatars/first.png", ContentFile(png))
+        profile = Profile.objects.create(user=user, avatar=first)
+
+        render = avatars.render_variants
+
+        def render_then_reupload(fp, *args):
+            yield from render(fp, *args)
+            Profile.objects.filter(pk=profile.pk).update(avatar="avatars/second.png")
+
+        with mock.patch.object(avatars, "render_variants", render_then_reupload):
+            self.assertIsNone(avatars.build_avatar_variants(profile.pk, first))
+        profile.refresh_from_db()
+        self.assertEqual(profile.avatar_variants, {})
+        self.assertEqual(avatars.default_storage.listdir(f"avatars/variants/{profile.pk}")[1], [])
+
+        Profile.objects.filter(pk=profile.pk).update(avatar=first)
+        sizes = avatars.build_avatar_variants(profile.pk, first)
+        profile.refresh_from_db()
+        self.assertEqual(profile.avatar_variants, {"source": first, "sizes": sizes})
+        self.assertEqual(set(sizes), {"large", "medium", "small"})
@@ -5,11 +5,18 @@ from django.contrib.auth.models import User
 from rest_framework import generics, status
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import APIException
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from .models import Profile
+from marvel_rivals.executors import ExecutorSaturated
+from marvel_rivals.fieldsets import SparseFieldsetMixin
+from marvel_rivals.instrumentation import SerializeTimingMixin
+
+from .hashing import HashingBusy
+from .models import Profile, annotate_user_stats
 from .serializers import (
     ProfileUpdateSerializer,
     RegisterSerializer,
@@ -46,6 +53,8 @@ class RegisterView(generics.CreateAPIView):
 
 
 class LoginView(ObtainAuthToken):
+    # ObtainAuthToken disables throttling; restore it so auth-login applies.
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
     throttle_scope = 'auth-login'
 
     def post(self, request, *args, **kwargs):
@@ -57,7 +66,10 @@ class LoginView(ObtainAuthToken):
                     {'detail': 'Username and password required'},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            user = authenticate(username=username, password=password)
+            try:
+                user = authenticate(request, username=username, password=password)
+            except ExecutorSaturated:
+                raise HashingBusy()
             if not user:
                 return Response(
                     {
@@ -78,6 +90,8 @@ class LoginView(ObtainAuthToken):
                     },
                 }
             )
+        except APIException:
+            raise
         except Exception:
             logger.exception('Unexpected error during login')
             return Response(
@@ -86,14 +100,26 @@ class LoginView(ObtainAuthToken):
             )
 
 
-class ProfileView(generics.RetrieveAPIView):
+class UserStatsQuerysetMixin(SerializeTimingMixin, SparseFieldsetMixin):
+    """User queryset carrying only the stats/profile data the fieldset needs."""
+
+    def user_queryset(self):
+        queryset = self.prune_queryset(User.objects.select_related('profile'))
+        if self.sparse_excludes('team_count', 'upvote_count', 'upvotes_received'):
+            return queryset
+        return annotate_user_stats(queryset)
+
+
+class ProfileView(UserStatsQuerysetMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
+        user = self.user_queryset().get(pk=self.request.user.pk)
         # Ensure a profile exists
-        profile, _ = Profile.objects.get_or_create(user=self.request.user)
-        return self.request.user
+        if not hasattr(user, 'profile'):
+            Profile.objects.create(user=user)
+        return user
 
 
 class ProfileAvatarUpdateView(generics.UpdateAPIView):
@@ -110,8 +136,10 @@ class ProfileAvatarUpdateView(generics.UpdateAPIView):
         return super().update(request, *args, **kwargs)
 
 
-class PublicProfileView(generics.RetrieveAPIView):
-    queryset = User.objects.all()
+class PublicProfileView(UserStatsQuerysetMixin, generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = (AllowAny,)
     lookup_field = 'username'
+
+    def get_queryset(self):
+        return self.user_queryset()
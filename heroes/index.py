@@ -0,0 +1,129 @@
+"""In-memory inverted index over hero facets (role, difficulty, playstyle tags).
+
+Each facet value maps to a bitset (a Python int) over the hero list, so any
+AND/OR combination of filters is a handful of integer operations. The index
+is rebuilt lazily whenever the shared catalog version changes; hero saves,
+deletes and relation edits bump that version (see ``heroes.signals``).
+
+The version is a row in the database, so a bump in any process (another
+worker, ``seed_heroes``, the admin) reaches every worker. Each process
+re-reads it at most every ``HERO_CATALOG_RECHECK_SECONDS``, so most requests
+don't pay a query for it; the process that bumps sees its own bump at once.
+"""
+
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+_version = (None, 0.0)  # (token, time.monotonic() it was read)
+
+
+def catalog_version():
+    """Opaque token that changes whenever hero data changes, in any worker."""
+    global _version
+    token, checked = _version
+    recheck = getattr(settings, "HERO_CATALOG_RECHECK_SECONDS", 2.0)
+    if token is not None and time.monotonic() - checked < recheck:
+        return token
+
+    from .models import CatalogVersion
+
+    token = CatalogVersion.objects.filter(pk=1).values_list("token", flat=True).first() or ""
+    _version = (token, time.monotonic())
+    return token
+
+
+def bump_catalog_version():
+    global _version
+    from .models import CatalogVersion
+
+    token = uuid.uuid4().hex
+    CatalogVersion.objects.update_or_create(pk=1, defaults={"token": token})
+    _version = (token, time.monotonic())
+
+
+def normalize_tag(tag):
+    return tag.strip().lower()
+
+
+class HeroIndex:
+    def __init__(self, rows):
+        """``rows``: iterable of (id, role, difficulty, playstyle_tags)."""
+        self.ids = []
+        self.by_role = defaultdict(int)
+        self.by_difficulty = defaultdict(int)
+        self.by_tag = defaultdict(int)
+
+        for position, (hero_id, role, difficulty, tags) in enumerate(rows):
+            bit = 1 << position
+            self.ids.append(hero_id)
+            self.by_role[role] |= bit
+            self.by_difficulty[difficulty] |= bit
+            for tag in tags or ():
+                self.by_tag[normalize_tag(tag)] |= bit
+
+        self.all = (1 << len(self.ids)) - 1
+
+    def filter(self, roles=(), difficulties=(), tags=(), tag_mode="all"):
+        """Hero ids matching every given facet; values within a facet are OR-ed.
+
+        ``tag_mode="all"`` requires every tag, ``"any"`` at least one.
+        """
+        mask = self.all
+        if roles:
+            mask &= self._union(self.by_role, [role.upper() for role in roles])
+        if difficulties:
+            mask &= self._union(self.by_difficulty, difficulties)
+        if tags:
+            tags = [normalize_tag(tag) for tag in tags]
+            if tag_mode == "any":
+                mask &= self._union(self.by_tag, tags)
+            else:
+                for tag in tags:
+                    mask &= self.by_tag.get(tag, 0)
+        return self._ids(mask)
+
+    def tag_counts(self):
+        return {tag: bits.bit_count() for tag, bits in sorted(self.by_tag.items())}
+
+    @staticmethod
+    def _union(buckets, values):
+        mask = 0
+        for value in values:
+            mask |= buckets.get(value, 0)
+        return mask
+
+    def _ids(self, mask):
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_hero_index():
+    """The process-wide index, rebuilt if the catalog version moved."""
+    global _index, _index_version
+
+    version = catalog_version()
+    if _index is not None and _index_version == version:
+        return _index
+
+    from .models import Hero
+
+    with _index_lock:
+        if _index is None or _index_version != version:
+            rows = Hero.objects.order_by("name").values_list(
+                "id", "role", "difficulty", "playstyle_tags"
+            )
+            _index, _index_version = HeroIndex(rows), version
+        return _index
@@ -0,0 +1,107 @@
+"""
+Build responsive WebP/AVIF derivatives of the hero avatars and banners.
+
+Run:
+    python manage.py build_hero_media
+Optional:
+    python manage.py build_hero_media --formats webp --force
+
+Derivatives are uploaded to the default storage under content-hashed names
+and indexed in assets/heroes/manifest.json. Commit the manifest: heroes whose
+source hash and settings haven't changed, and whose derivatives are still in
+storage, are skipped on the next build.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from heroes.media import (
+    HERO_MEDIA_KINDS,
+    MANIFEST_VERSION,
+    assets_root,
+    available_formats,
+    derivative_name,
+    entry_in_storage,
+    file_sha256,
+    load_manifest,
+    render_derivatives,
+    write_manifest,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate width-bucketed WebP/AVIF hero media and write the manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--formats",
+            default=",".join(available_formats()),
+            help="Comma-separated derivative formats (default: all Pillow supports).",
+        )
+        parser.add_argument("--force", action="store_true", help="Rebuild unchanged sources too.")
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        formats = [fmt.strip() for fmt in options["formats"].split(",") if fmt.strip()]
+        unsupported = set(formats) - set(available_formats())
+        if unsupported:
+            raise CommandError(f"Pillow can't encode: {', '.join(sorted(unsupported))}")
+
+        manifest = load_manifest()
+        if manifest.get("version") != MANIFEST_VERSION:
+            manifest = {"version": MANIFEST_VERSION, "heroes": {}}
+
+        jobs = []
+        for kind, (subdir, pattern, buckets) in HERO_MEDIA_KINDS.items():
+            suffix = pattern.format(base="")
+            for path in sorted((assets_root() / subdir).glob(f"*{suffix}")):
+                base = path.name[: -len(suffix)]
+                source_hash = file_sha256(path)
+                previous = manifest["heroes"].get(base, {}).get(kind)
+                if (
+                    not options["force"]
+                    and previous
+                    and previous["source"] == source_hash
+                    and previous["formats"] == formats
+                    and previous["buckets"] == list(buckets)
+                    and entry_in_storage(previous)
+                ):
+                    continue
+                jobs.append((base, kind, path, source_hash, buckets, formats))
+
+        if not jobs:
+            self.stdout.write("Hero media is up to date.")
+            return
+
+        # Pillow releases the GIL while encoding, so threads parallelise well.
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for base, kind, entry in pool.map(lambda job: self._build(*job), jobs):
+                manifest["heroes"].setdefault(base, {})[kind] = entry
+                self.stdout.write(f"  ✓ {base} {kind}: {len(entry['variants'])} derivatives")
+
+        write_manifest(manifest)
+        self.stdout.write(f"\nBuilt {len(jobs)} sources; manifest updated.")
+
+    @staticmethod
+    def _build(base, kind, path, source_hash, buckets, formats):
+        variants = []
+        for width, fmt, data in render_derivatives(path, buckets, formats):
+            name = derivative_name(base, kind, source_hash, width, fmt)
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(data))
+            variants.append({
+                "width": width,
+                "format": fmt,
+                "bytes": len(data),
+                "name": name,
+            })
+        entry = {
+            "source": source_hash,
+            "formats": formats,
+            "buckets": list(buckets),
+            "variants": variants,
+        }
+        return base, kind, entry
@@ -5,68 +5,63 @@ Run:
     python manage.py seed_heroes
 Optional:
     FORCE_HERO_MEDIA_UPLOAD=1 python manage.py seed_heroes
+
+Only differences are written: changed heroes go through one bulk upsert, the
+synergy/counter through tables get bulk inserts/deletes, and media is uploaded
+in parallel only when the asset's content hash changed. A no-op reseed is a
+handful of SELECTs.
 """
 
 import os
-import re
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-from django.conf import settings
 from django.core.files import File
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
+from heroes.index import bump_catalog_version
+from heroes.media import HERO_MEDIA_KINDS, assets_root, file_sha256, safe_name
 from heroes.models import Hero
 
+RELATION_FIELDS = ("synergies", "counters")
+HERO_FIELDS = ("role", "description", "difficulty", "playstyle_tags")
 
-def safe_name(name: str) -> str:
-    """
-    Convert hero.name into a filesystem-friendly filename base.
 
-    Examples:
-      "Peni-Parker" -> "Peni-Parker"
-      "Cloak & Dagger" -> "Cloak_Dagger"
-      "Adam Warlock" -> "Adam_Warlock"
+def attach_media_if_exists(hero: Hero, force: bool = False) -> tuple[list[str], list[str]]:
     """
-    name = name.strip()
-    name = name.replace("&", " ")
-    name = re.sub(r"\s+", "_", name)            # spaces -> _
-    name = re.sub(r"[^A-Za-z0-9_-]", "", name)  # remove weird chars
-    return name
+    Upload local asset media whose content hash differs from the last upload.
 
-
-def attach_media_if_exists(hero: Hero) -> None:
+    Returns (changed field names, warnings). Doesn't save or touch the DB, so
+    it is safe to run on a worker thread; the caller bulk-saves the fields.
+    """
     base = safe_name(hero.name)
-
-    avatar_filename = f"{base}_Deluxe_Avatar.png"
-    banner_filename = f"{base}_banner.png"
-
-    assets_root = Path(settings.BASE_DIR) / "assets" / "heroes"
-    avatar_path = assets_root / "avatars" / avatar_filename
-    banner_path = assets_root / "banners" / banner_filename
-
-    changed = False
-
-    # FORCE upload once (recommended to fix broken DB pointers)
-    FORCE_UPLOAD = os.environ.get("FORCE_HERO_MEDIA_UPLOAD", "0") == "1"
-
-    if avatar_path.exists():
-        if FORCE_UPLOAD or not hero.image:
-            with avatar_path.open("rb") as f:
-                hero.image.save(avatar_filename, File(f), save=False)
-            changed = True
-    else:
-        print(f"  ! Missing avatar file for {hero.name}: {avatar_path.name}")
-
-    if banner_path.exists():
-        if FORCE_UPLOAD or not hero.banner:
-            with banner_path.open("rb") as f:
-                hero.banner.save(banner_filename, File(f), save=False)
-            changed = True
-    else:
-        print(f"  ! Missing banner file for {hero.name}: {banner_path.name}")
-
-    if changed:
-        hero.save()
+    hashes = dict(hero.media_hashes or {})
+    changed, warnings = [], []
+
+    for field_name, (subdir, pattern, _buckets) in HERO_MEDIA_KINDS.items():
+        filename = pattern.format(base=base)
+        path = assets_root() / subdir / filename
+        if not path.exists():
+            warnings.append(f"  ! Missing {field_name} file for {hero.name}: {filename}")
+            continue
+
+        digest = file_sha256(path)
+        field = getattr(hero, field_name)
+        if field and not force:
+            if field_name not in hashes:
+                # Uploaded before hashes were tracked: trust it, start tracking.
+                hashes[field_name] = digest
+                changed.append("media_hashes")
+            if hashes[field_name] == digest:
+                continue
+
+        with path.open("rb") as f:
+            field.save(filename, File(f), save=False)
+        hashes[field_name] = digest
+        changed += [field_name, "media_hashes"]
+
+    hero.media_hashes = hashes
+    return sorted(set(changed)), warnings
 
 
 # -------------------------
@@ -487,53 +482,117 @@ heroes_data = [
 class Command(BaseCommand):
     help = "Seed/update heroes, including synergies/counters and local asset media."
 
-    def handle(self, *args, **options):
-        self.stdout.write(f"Adding {len(heroes_data)} heroes...")
-
-        hero_objects: dict[str, dict] = {}
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force-media",
+            action="store_true",
+            help="Re-upload media even if unchanged (same as FORCE_HERO_MEDIA_UPLOAD=1).",
+        )
+        parser.add_argument(
+            "--skip-media",
+            action="store_true",
+            help="Only sync hero rows and relationships.",
+        )
+        parser.add_argument("--media-workers", type=int, default=8)
 
-        # First pass: create/update heroes
-        for hero_dict in heroes_data:
-            data = dict(hero_dict)  # don't mutate original
-
-            synergies = data.pop("synergies", [])
-            counters = data.pop("counters", [])
-
-            hero, created = Hero.objects.update_or_create(
-                name=data["name"],
-                defaults=data,
-            )
-
-            attach_media_if_exists(hero)
-
-            hero_objects[hero.name] = {
-                "hero": hero,
-                "synergies": synergies,
-                "counters": counters,
-            }
-
-            action = "Created" if created else "Updated"
-            # get_role_display exists only if role is a Django choices field
-            role_display = hero.get_role_display() if hasattr(hero, "get_role_display") else hero.role
-            self.stdout.write(f"  ✓ {action} {hero.name} ({role_display})")
-
-        # Second pass: relationships
-        self.stdout.write("\nAdding synergies and counters...")
-        for hero_name, rel in hero_objects.items():
-            hero = rel["hero"]
+    def handle(self, *args, **options):
+        self.stdout.write(f"Syncing {len(heroes_data)} heroes...")
+        # Bulk writes skip model signals, so invalidate hero caches ourselves.
+        self.changed = False
 
-            hero.synergies.clear()
-            hero.counters.clear()
+        with transaction.atomic():
+            heroes = self._sync_heroes()
+            for field in RELATION_FIELDS:
+                self._sync_relations(heroes, field)
 
-            for synergy_name in rel["synergies"]:
-                if synergy_name in hero_objects:
-                    hero.synergies.add(hero_objects[synergy_name]["hero"])
+        if not options["skip_media"]:
+            force = options["force_media"] or os.environ.get("FORCE_HERO_MEDIA_UPLOAD", "0") == "1"
+            self._sync_media(heroes, force, options["media_workers"])
 
-            for counter_name in rel["counters"]:
-                if counter_name in hero_objects:
-                    hero.counters.add(hero_objects[counter_name]["hero"])
+        if self.changed:
+            bump_catalog_version()
+        self.stdout.write(f"\nSuccessfully synced {len(heroes)} heroes!")
 
-            hero.save()
-            self.stdout.write(f"  ✓ Updated {hero.name} relationships")
+    def _sync_heroes(self) -> dict[str, Hero]:
+        existing = {hero.name: hero for hero in Hero.objects.all()}
 
-        self.stdout.write(f"\nSuccessfully added {Hero.objects.count()} heroes!")
+        upserts = []
+        for hero_dict in heroes_data:
+            fields = {field: hero_dict[field] for field in HERO_FIELDS}
+            hero = existing.get(hero_dict["name"])
+            if hero and all(getattr(hero, field) == value for field, value in fields.items()):
+                continue
+            upserts.append(Hero(name=hero_dict["name"], **fields))
+            action = "Updated" if hero else "Created"
+            self.stdout.write(f"  ✓ {action} {hero_dict['name']}")
+
+        if not upserts:
+            self.stdout.write("  Hero rows already up to date.")
+            return {name: existing[name] for name in _declared_names()}
+
+        self.changed = True
+        Hero.objects.bulk_create(
+            upserts,
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=[*HERO_FIELDS, "updated_at"],
+        )
+        return Hero.objects.in_bulk(_declared_names(), field_name="name")
+
+    def _sync_relations(self, heroes: dict[str, Hero], field: str) -> None:
+        through = getattr(Hero, field).through
+
+        wanted = set()
+        for hero_dict in heroes_data:
+            source = heroes[hero_dict["name"]]
+            for target_name in hero_dict[field]:
+                target = heroes.get(target_name)
+                if target is None:
+                    self.stdout.write(f"  ! Unknown hero {target_name!r} in {source.name} {field}")
+                    continue
+                wanted.add((source.pk, target.pk))
+
+        # Only rows owned by declared heroes are managed here.
+        current = {
+            (from_id, to_id): pk
+            for pk, from_id, to_id in through.objects.filter(
+                from_hero_id__in=[hero.pk for hero in heroes.values()]
+            ).values_list("pk", "from_hero_id", "to_hero_id")
+        }
+        stale = [pk for pair, pk in current.items() if pair not in wanted]
+        missing = wanted - current.keys()
+
+        self.changed |= bool(stale or missing)
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+        if missing:
+            through.objects.bulk_create(
+                through(from_hero_id=from_id, to_hero_id=to_id)
+                for from_id, to_id in missing
+            )
+        self.stdout.write(f"  ✓ {field}: +{len(missing)} -{len(stale)}")
+
+    def _sync_media(self, heroes: dict[str, Hero], force: bool, workers: int) -> None:
+        self.stdout.write("\nSyncing media...")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda hero: (hero, *attach_media_if_exists(hero, force)),
+                heroes.values(),
+            ))
+
+        updated, fields = [], set()
+        for hero, changed, warnings in results:
+            for warning in warnings:
+                self.stdout.write(warning)
+            if changed:
+                updated.append(hero)
+                fields.update(changed)
+
+        if updated:
+            self.changed = True
+            Hero.objects.bulk_update(updated, sorted(fields))
+        self.stdout.write(f"  ✓ Media updated for {len(updated)} heroes")
+
+
+def _declared_names() -> list[str]:
+    return [hero_dict["name"] for hero_dict in heroes_data]
@@ -0,0 +1,151 @@
+"""Responsive hero media: derivative builds and the manifest that indexes them.
+
+``build_hero_media`` reads the source PNGs under ``assets/heroes``, writes
+width-bucketed WebP/AVIF derivatives to the default storage under names that
+embed the source's content hash, and records those storage names in a JSON
+manifest. Serializers read the manifest to expose srcset strings, so clients
+can pick the smallest file that fits instead of downloading the full PNG.
+
+URLs are resolved through the storage when the manifest is read, not stored
+in it, so one manifest serves every environment (local media, Cloudinary,
+a changed MEDIA_URL or CDN host).
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+# 2: variants carry a storage "name" instead of a "url".
+MANIFEST_VERSION = 2
+
+# kind -> (assets subdirectory, source filename pattern, width buckets)
+HERO_MEDIA_KINDS = {
+    "image": ("avatars", "{base}_Deluxe_Avatar.png", (64, 128, 256)),
+    "banner": ("banners", "{base}_banner.png", (320, 640, 960, 1280)),
+}
+
+# extension -> (Pillow format, save options)
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "avif": ("AVIF", {"quality": 60, "speed": 6}),
+}
+
+
+def safe_name(name: str) -> str:
+    """
+    Convert hero.name into a filesystem-friendly filename base.
+
+    Examples:
+      "Peni-Parker" -> "Peni-Parker"
+      "Cloak & Dagger" -> "Cloak_Dagger"
+      "Adam Warlock" -> "Adam_Warlock"
+    """
+    name = name.strip()
+    name = name.replace("&", " ")
+    name = re.sub(r"\s+", "_", name)            # spaces -> _
+    name = re.sub(r"[^A-Za-z0-9_-]", "", name)  # remove weird chars
+    return name
+
+
+def assets_root() -> Path:
+    return Path(settings.BASE_DIR) / "assets" / "heroes"
+
+
+def manifest_path() -> Path:
+    return Path(getattr(settings, "HERO_MEDIA_MANIFEST", assets_root() / "manifest.json"))
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bucket_widths(buckets, source_width):
+    """Buckets narrower than the source, plus the source width itself."""
+    widths = [width for width in buckets if width < source_width]
+    widths.append(min(source_width, max(buckets)))
+    return widths
+
+
+def derivative_name(base, kind, source_hash, width, fmt):
+    return f"heroes/derived/{base}-{kind}-{source_hash[:12]}-{width}w.{fmt}"
+
+
+def render_derivatives(path: Path, buckets, formats):
+    """Yield ``(width, fmt, bytes)`` for every bucket/format pair.
+
+    The source is decoded once; each width is resized from the original.
+    """
+    from PIL import Image
+
+    with Image.open(path) as source:
+        source.load()
+        image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+
+    for width in bucket_widths(buckets, image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize(
+            (width, height), Image.Resampling.LANCZOS
+        )
+        for fmt in formats:
+            pil_format, options = DERIVATIVE_FORMATS[fmt]
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            yield width, fmt, buffer.getvalue()
+
+
+def available_formats():
+    from PIL import features
+
+    return [fmt for fmt in DERIVATIVE_FORMATS if features.check(fmt)]
+
+
+@lru_cache(maxsize=1)
+def load_manifest():
+    path = manifest_path()
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "heroes": {}}
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(manifest):
+    path = manifest_path()
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    load_manifest.cache_clear()
+    _srcset_index.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _srcset_index():
+    index = {}
+    for base, kinds in load_manifest()["heroes"].items():
+        for kind, entry in kinds.items():
+            srcsets = {}
+            for variant in entry["variants"]:
+                srcsets.setdefault(variant["format"], []).append(
+                    f"{default_storage.url(variant['name'])} {variant['width']}w"
+                )
+            index[base, kind] = {
+                fmt: ", ".join(candidates) for fmt, candidates in srcsets.items()
+            }
+    return index
+
+
+def entry_in_storage(entry):
+    """Whether every derivative a manifest entry lists is still in storage."""
+    return all(default_storage.exists(variant["name"]) for variant in entry["variants"])
+
+
+def hero_srcset(hero_name, kind):
+    """``{"webp": "url 64w, url 128w", ...}`` for a hero, or None if not built."""
+    return _srcset_index().get((safe_name(hero_name), kind))
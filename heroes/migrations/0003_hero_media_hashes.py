@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("heroes", "0002_hero_banner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="hero",
+            name="media_hashes",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -13,6 +13,8 @@ class Hero(models.Model):
     image = models.ImageField(upload_to='heroes/', blank=True, null=True)
     banner = models.ImageField(upload_to='heroes/banners/', blank=True, null=True, help_text="Banner image for team showcase")
     description = models.TextField(blank=True)
+    # SHA-256 of the asset last uploaded to image/banner, used by seed_heroes
+    media_hashes = models.JSONField(default=dict, blank=True)
     
     # For later - your YouTube videos
     video_url = models.URLField(blank=True, help_text="YouTube video URL")
@@ -56,4 +58,12 @@ class Hero(models.Model):
         ordering = ['name']
     
     def __str__(self):
-        return f"{self.name} ({self.get_role_display()})"
\ No newline at end of file
+        return f"{self.name} ({self.get_role_display()})"
+
+class CatalogVersion(models.Model):
+    """Single row whose token changes whenever hero data does.
+
+    Lives in the database rather than the cache so every worker sees the
+    same token even with the per-process LocMem cache (see ``heroes.index``).
+    """
+    token = models.CharField(max_length=32)
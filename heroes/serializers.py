@@ -1,9 +1,14 @@
 from rest_framework import serializers
+from marvel_rivals.fieldsets import SparseFieldsetSerializerMixin
+from .index import catalog_version
+from .media import hero_srcset
 from .models import Hero
 
-class HeroListSerializer(serializers.ModelSerializer):
+class HeroListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     banner_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    banner_srcset = serializers.SerializerMethodField()
     synergies = serializers.SerializerMethodField()
     counters = serializers.SerializerMethodField()
 
@@ -12,6 +17,7 @@ class HeroListSerializer(serializers.ModelSerializer):
         fields = [
             "id", "name", "role",
             "image_url", "banner_url",
+            "image_srcset", "banner_srcset",
             "description", "difficulty", "playstyle_tags",
             "synergies", "counters",
         ]
@@ -22,19 +28,27 @@ class HeroListSerializer(serializers.ModelSerializer):
     def get_banner_url(self, obj):
         return obj.banner.url if obj.banner else None
 
+    def get_image_srcset(self, obj):
+        return hero_srcset(obj.name, "image")
+
+    def get_banner_srcset(self, obj):
+        return hero_srcset(obj.name, "banner")
+
     def get_synergies(self, obj):
         return [h.name for h in obj.synergies.all()]
 
     def get_counters(self, obj):
         return [h.name for h in obj.counters.all()]
 
-class HeroDetailSerializer(serializers.ModelSerializer):
+class HeroDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     synergies = serializers.SerializerMethodField()
     counters = serializers.SerializerMethodField()
     countered_by = serializers.SerializerMethodField()
 
     image_url = serializers.SerializerMethodField()
     banner_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    banner_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Hero
@@ -44,6 +58,8 @@ class HeroDetailSerializer(serializers.ModelSerializer):
             "role",
             "image_url",
             "banner_url",
+            "image_srcset",
+            "banner_srcset",
             "description",
             "difficulty",
             "playstyle_tags",
@@ -61,6 +77,12 @@ class HeroDetailSerializer(serializers.ModelSerializer):
     def get_banner_url(self, obj):
         return obj.banner.url if obj.banner else None
 
+    def get_image_srcset(self, obj):
+        return hero_srcset(obj.name, "image")
+
+    def get_banner_srcset(self, obj):
+        return hero_srcset(obj.name, "banner")
+
     def get_synergies(self, obj):
         return [
             {"id": hero.id, "name": hero.name, "role": hero.role, "image_url": hero.image.url if hero.image else None}
@@ -79,3 +101,30 @@ class HeroDetailSerializer(serializers.ModelSerializer):
             {"id": hero.id, "name": hero.name, "role": hero.role, "image_url": hero.image.url if hero.image else None}
             for hero in countered_by_heroes
         ]
+
+
+_list_payloads = (None, {})
+
+
+def hero_catalog_payloads(required_ids=()):
+    """``{id: HeroListSerializer data}`` for every hero.
+
+    Hero payloads don't depend on the request, so the whole catalog is
+    serialized once per catalog version and shared across requests. It is
+    rebuilt early if a hero in ``required_ids`` is missing (created in this
+    process before the version bump landed). Treat the dicts as read-only.
+    """
+    global _list_payloads
+    version = catalog_version()
+    cached_version, payloads = _list_payloads
+    if cached_version != version or not payloads.keys() >= set(required_ids):
+        heroes = Hero.objects.prefetch_related("synergies", "counters")
+        payloads = {hero.id: dict(HeroListSerializer(hero).data) for hero in heroes}
+        _list_payloads = (version, payloads)
+    return payloads
+
+
+def hero_list_payloads(hero_ids):
+    """``{"<id>": HeroListSerializer data}`` for ``hero_ids``."""
+    payloads = hero_catalog_payloads(hero_ids)
+    return {str(hero_id): payloads[hero_id] for hero_id in sorted(hero_ids) if hero_id in payloads}
@@ -0,0 +1,21 @@
+"""Invalidate per-process hero caches whenever hero data changes."""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .index import bump_catalog_version
+from .models import Hero
+
+
+@receiver(post_save, sender=Hero)
+@receiver(post_delete, sender=Hero)
+def hero_changed(sender, **kwargs):
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(m2m_changed, sender=Hero.synergies.through)
+@receiver(m2m_changed, sender=Hero.counters.through)
+def hero_relations_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(bump_catalog_version)
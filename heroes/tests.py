@@ -1,3 +1,106 @@
-from django.test import TestCase
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from marvel_rivals.testing import EndpointBudgetMixin, seed_dataset
+
+from . import media
+from .index import bump_catalog_version, catalog_version, get_hero_index
+from .models import CatalogVersion, Hero
+from .serializers import hero_catalog_payloads
+
+
+class HeroEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset()
+        cls.hero = cls.data["heroes"][0]
+
+    def test_hero_list(self):
+        for path in ("/api/heroes/", "/api/heroes/?role=DUELIST", "/api/heroes/?search=Hero%201"):
+            with self.subTest(path=path):
+                self.assertWithinBudget(path, 3, 150)
+
+    def test_facet_lists_tolerate_spaces(self):
+        def names(query):
+            response = self.client.get(f"/api/heroes/?{query}")
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            return sorted(hero["name"] for hero in data.get("results", data))
+
+        self.assertEqual(names("role=DUELIST,%20VANGUARD"), names("role=DUELIST,VANGUARD"))
+        self.assertEqual(names("difficulty=1,%202"), names("difficulty=1,2"))
+        self.assertTrue(names("role=DUELIST,%20VANGUARD"))
+
+    def test_hero_detail(self):
+        self.assertWithinBudget(f"/api/heroes/{self.hero.pk}/", 4, 100)
+
+
+class CatalogVersionTests(TestCase):
+    def test_bump_in_another_process_reaches_this_one(self):
+        Hero.objects.create(name="Solo", role="DUELIST", difficulty=1)
+        bump_catalog_version()
+        self.assertEqual(len(get_hero_index().ids), 1)
+
+        # Another worker (or seed_heroes) adds a hero without signals and
+        # bumps the shared row; this process holds its own memo of the token.
+        Hero.objects.bulk_create([Hero(name="Duo", role="VANGUARD", difficulty=2)])
+        CatalogVersion.objects.filter(pk=1).update(token="bumped-elsewhere")
+
+        with override_settings(HERO_CATALOG_RECHECK_SECONDS=3600):
+            self.assertEqual(len(get_hero_index().ids), 1)
+        with override_settings(HERO_CATALOG_RECHECK_SECONDS=0):
+            self.assertEqual(len(get_hero_index().ids), 2)
+            self.assertEqual(len(hero_catalog_payloads()), 2)
+        self.assertEqual(catalog_version(), "bumped-elsewhere")
+
+
+class HeroMediaBuildTests(SimpleTestCase):
+    def setUp(self):
+        root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        (root / "assets" / "avatars").mkdir(parents=True)
+        Image.new("RGB", (200, 200), "red").save(root / "assets" / "avatars" / "Test_Hero_Deluxe_Avatar.png")
+        self.manifest = root / "manifest.json"
+        self.enterContext(override_settings(
+            STORAGES={"default": {"BACKEND": "django.core.files.storage.FileSystemStorage"}},
+            MEDIA_ROOT=str(root / "media"),
+            MEDIA_URL="/media/",
+            HERO_MEDIA_MANIFEST=self.manifest,
+        ))
+        self.enterContext(mock.patch(
+            "heroes.management.commands.build_hero_media.assets_root", return_value=root / "assets"
+        ))
+        self.addCleanup(media.load_manifest.cache_clear)
+        self.addCleanup(media._srcset_index.cache_clear)
+
+    def build(self):
+        out = StringIO()
+        call_command("build_hero_media", "--formats", "webp", "--workers", "1", stdout=out)
+        return out.getvalue()
+
+    def test_manifest_holds_storage_names_and_urls_resolve_on_read(self):
+        self.build()
+        variants = json.loads(self.manifest.read_text())["heroes"]["Test_Hero"]["image"]["variants"]
+        self.assertEqual([variant["width"] for variant in variants], [64, 128, 200])
+        self.assertTrue(all("url" not in variant and media.default_storage.exists(variant["name"]) for variant in variants))
+
+        with override_settings(MEDIA_URL="https://cdn.example.com/media/"):
+            media._srcset_index.cache_clear()
+            srcset = media.hero_srcset("Test Hero", "image")["webp"]
+        self.assertTrue(srcset.startswith("https://cdn.example.com/media/heroes/derived/Test_Hero-image-"))
+        self.assertTrue(srcset.endswith(" 200w"))
+
+    def test_missing_derivatives_are_rebuilt(self):
+        self.build()
+        self.assertIn("up to date", self.build())
+
+        name = json.loads(self.manifest.read_text())["heroes"]["Test_Hero"]["image"]["variants"][0]["name"]
+        media.default_storage.delete(name)
+        self.assertIn("Built 1 sources", self.build())
+        self.assertTrue(media.default_storage.exists(name))
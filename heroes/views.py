@@ -1,13 +1,27 @@
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
+from marvel_rivals.fieldsets import SparseFieldsetMixin, excluded_names
+from marvel_rivals.instrumentation import SerializeTimingMixin, track
+from .index import get_hero_index
 from .models import Hero
-from .serializers import HeroListSerializer, HeroDetailSerializer
+from .serializers import HeroListSerializer, HeroDetailSerializer, hero_catalog_payloads
 
-class HeroViewSet(viewsets.ReadOnlyModelViewSet):
+
+def _csv_param(params, name):
+    return [value.strip() for value in params.get(name, '').split(',') if value.strip()]
+
+
+class HeroViewSet(SerializeTimingMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for heroes
     List all heroes or retrieve a specific hero
+
+    Facet filters (answered from the in-memory hero index):
+      ?role=VANGUARD,DUELIST  ?difficulty=1,2  ?tags=dive,burst&tag_mode=all|any
+
+    Sparse fieldsets: ?fields=id,name,image_url or ?omit=description
     """
     queryset = Hero.objects.all().order_by('name')
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -18,13 +32,64 @@ class HeroViewSet(viewsets.ReadOnlyModelViewSet):
         if self.action == 'retrieve':
             return HeroDetailSerializer
         return HeroListSerializer
+
+    def get_queryset(self):
+        queryset = self.prune_queryset(self.queryset)
+        if self.action not in ('list', 'by_role'):
+            return queryset
+
+        params = self.request.query_params
+        roles = _csv_param(params, 'role')
+        tags = _csv_param(params, 'tags')
+        try:
+            difficulties = [int(value) for value in _csv_param(params, 'difficulty')]
+        except ValueError:
+            difficulties = [-1]  # matches nothing, like an unknown role
+
+        if roles or difficulties or tags:
+            hero_ids = get_hero_index().filter(
+                roles=roles,
+                difficulties=difficulties,
+                tags=tags,
+                tag_mode=params.get('tag_mode', 'all'),
+            )
+            queryset = queryset.filter(pk__in=hero_ids)
+        return queryset
     
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'FAST_READ_MODELS', True):
+            return super().list(request, *args, **kwargs)
+
+        # HeroListSerializer payloads are cached per catalog version; only
+        # the ids of the page come from the database.
+        queryset = self.filter_queryset(self.get_queryset())
+        pks = queryset.values_list('pk', flat=True)
+        page = self.paginate_queryset(pks)
+        ids = list(pks) if page is None else page
+        fields, omit = self.get_sparse_fieldset()
+        excluded = excluded_names(HeroListSerializer.Meta.fields, fields, omit)
+        with track('serialize'):
+            payloads = hero_catalog_payloads(ids)
+            if excluded:
+                data = [
+                    {name: value for name, value in payloads[pk].items() if name not in excluded}
+                    for pk in ids
+                ]
+            else:
+                data = [payloads[pk] for pk in ids]
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
     @action(detail=False, methods=['get'])
     def by_role(self, request):
         """Filter heroes by role"""
         role = request.query_params.get('role', None)
         if role:
-            heroes = self.queryset.filter(role=role.upper())
-            serializer = HeroListSerializer(heroes, many=True)
-            return Response(serializer.data)
-        return Response({'error': 'Role parameter required'}, status=400)
\ No newline at end of file
+            return self.list(request)
+        return Response({'error': 'Role parameter required'}, status=400)
+
+    @action(detail=False, methods=['get'])
+    def tags(self, request):
+        """Playstyle tags with the number of heroes carrying each"""
+        return Response(get_hero_index().tag_counts())
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class MarvelRivalsConfig(AppConfig):
+    name = "marvel_rivals"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .slow_queries import install
+
+        connection_created.connect(install, dispatch_uid="marvel_rivals.slow_queries")
@@ -18,9 +18,14 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "marvel_rivals.settings")
 django_asgi_app = get_asgi_application()
 
 from . import routing  # noqa: E402  pylint: disable=wrong-import-position
+from .warmup import WarmUpApp  # noqa: E402  pylint: disable=wrong-import-position
+
+# Warms the worker up on lifespan startup (or the first request under Daphne).
+http_app = WarmUpApp(django_asgi_app)
 
 application = ProtocolTypeRouter({
-    "http": django_asgi_app,
+    "http": http_app,
+    "lifespan": http_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(routing.websocket_urlpatterns)
     ),
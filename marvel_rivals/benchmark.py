@@ -0,0 +1,480 @@
+"""In-process HTTP benchmark for the API.
+
+Requests go through the real WSGI or ASGI ``application`` (every middleware,
+URL routing, DRF, the database) without a socket in between, so the numbers
+track the code rather than the network. A seeded request mix picks popular
+teams and pages with a Zipf skew, like real traffic on ``generate_dataset``
+data.
+
+Per scenario the runner reports throughput, p50/p95/p99 latency, DB queries
+per request (from ``RequestTimingMiddleware``'s metrics) and the peak Python
+allocation per request, measured in a separate, shorter tracemalloc pass
+because tracing slows everything down. ``compare()`` diffs a run against a
+stored baseline.
+"""
+
+import asyncio
+import bisect
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from rest_framework.authtoken.models import Token
+from rest_framework.throttling import SimpleRateThrottle
+
+from accounts.models import Profile
+from teams.models import Comment, Team, Vote
+
+BENCH_USER_PREFIX = "bench-user-"
+COMMENT_MARKER = "[bench]"
+
+MIXES = {
+    "default": {"browse": 40, "detail": 30, "heroes": 15, "vote": 10, "comment": 5},
+    "read": {"browse": 50, "detail": 35, "heroes": 15},
+    "write": {"browse": 20, "detail": 20, "vote": 40, "comment": 20},
+}
+
+# Relative change allowed before a metric counts as a regression.
+TOLERANCES = {
+    "p50_ms": 0.25,
+    "p95_ms": 0.25,
+    "p99_ms": 0.35,
+    "throughput_rps": 0.25,
+    "queries": 0.02,
+    "alloc_kib": 0.2,
+}
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+
+@dataclass
+class Call:
+    scenario: str
+    method: str
+    path: str
+    body: bytes = b""
+    token: str = ""
+    client_ip: str = "127.0.0.1"
+
+
+def _zipf_cdf(n, s=1.1):
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+class Workload:
+    """Seeded stream of ``Call``s for a mix of scenarios."""
+
+    def __init__(self, mix, seed=0, users=20, popular_teams=1000):
+        self.rng = random.Random(seed)
+        self.mix = mix
+        self.scenarios = list(mix)
+        self.mix_cdf = list(itertools.accumulate(mix.values()))
+
+        self.slugs = list(
+            Team.objects.order_by("-views", "pk").values_list("slug", flat=True)[:popular_teams]
+        )
+        if not self.slugs:
+            raise ValueError("No teams to benchmark; run generate_dataset first.")
+        self.slug_cdf = _zipf_cdf(len(self.slugs))
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 50
+        pages = max(1, min(20, -(-Team.objects.count() // page_size)))
+        self.page_cdf = _zipf_cdf(pages)
+        self.tokens = bench_tokens(users)
+
+    def _pick(self, cdf):
+        return bisect.bisect_left(cdf, self.rng.random() * cdf[-1])
+
+    def _slug(self):
+        return self.slugs[self._pick(self.slug_cdf)]
+
+    def next_call(self):
+        scenario = self.scenarios[self._pick(self.mix_cdf)]
+        ip = f"10.{self.rng.randrange(256)}.{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}"
+        if scenario == "browse":
+            page = self._pick(self.page_cdf) + 1
+            ordering = self.rng.choice(["popular", "-created_at", "-views"])
+            return Call(scenario, "GET", f"/api/teams/?ordering={ordering}&page={page}", client_ip=ip)
+        if scenario == "detail":
+            return Call(scenario, "GET", f"/api/teams/{self._slug()}/", client_ip=ip)
+        if scenario == "heroes":
+            return Call(scenario, "GET", "/api/heroes/", client_ip=ip)
+        token = self.rng.choice(self.tokens)
+        if scenario == "vote":
+            return Call(scenario, "POST", f"/api/teams/{self._slug()}/vote/", token=token, client_ip=ip)
+        if scenario == "comment":
+            words = " ".join(self.rng.choice(["gg", "nice", "comp", "dive", "meta"]) for _ in range(8))
+            body = json.dumps({"text": f"{COMMENT_MARKER} {words}"}).encode()
+            return Call(scenario, "POST", f"/api/teams/{self._slug()}/comments/", body, token, ip)
+        raise ValueError(f"Unknown scenario {scenario!r}.")
+
+
+def bench_tokens(count):
+    """Auth tokens for dedicated benchmark users, created on first use."""
+    tokens = []
+    for i in range(count):
+        user, created = User.objects.get_or_create(username=f"{BENCH_USER_PREFIX}{i}")
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=["password"])
+            Profile.objects.get_or_create(user=user)
+        tokens.append(Token.objects.get_or_create(user=user)[0].key)
+    return tokens
+
+
+def cleanup():
+    """Remove the votes and comments written by benchmark users."""
+    users = User.objects.filter(username__startswith=BENCH_USER_PREFIX)
+    Comment.objects.filter(user__in=users).delete()
+    Vote.objects.filter(user__in=users).delete()
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host and "*" not in host and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def _headers(call, host):
+    headers = {
+        "host": host,
+        "accept": "application/json",
+        "accept-encoding": "gzip, br",
+        "x-forwarded-proto": "https",
+    }
+    if call.token:
+        headers["authorization"] = f"Token {call.token}"
+    if call.body:
+        headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(call.body))
+    return headers
+
+
+class WSGIDriver:
+    def __init__(self):
+        from marvel_rivals.wsgi import application
+
+        self.application = application
+        self.host = _host()
+
+    def __call__(self, call):
+        url = urlsplit(call.path)
+        environ = {
+            "REQUEST_METHOD": call.method,
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "SCRIPT_NAME": "",
+            "SERVER_NAME": self.host,
+            "SERVER_PORT": "443",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "REMOTE_ADDR": call.client_ip,
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "https",
+            "wsgi.input": BytesIO(call.body),
+            "wsgi.errors": BytesIO(),
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in _headers(call, self.host).items():
+            key = name.upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            environ[key] = value
+
+        status = []
+        result = self.application(environ, lambda s, headers, exc_info=None: status.append(s))
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return int(status[0].split()[0]), body
+
+
+class ASGIDriver:
+    def __init__(self):
+        from marvel_rivals.asgi import application
+
+        self.application = application
+        self.host = _host()
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.lifespan())
+
+    async def lifespan(self):
+        """Start up like a server would, and wait for the worker's warm-up."""
+        from marvel_rivals.warmup import is_ready
+
+        messages = [{"type": "lifespan.shutdown"}, {"type": "lifespan.startup"}]
+
+        async def receive():
+            if len(messages) == 1:
+                while not is_ready():
+                    await asyncio.sleep(0.01)
+            return messages.pop()
+
+        async def send(message):
+            pass
+
+        await self.application({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send)
+
+    async def request(self, call):
+        url = urlsplit(call.path)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": call.method,
+            "scheme": "https",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [(k.encode(), v.encode()) for k, v in _headers(call, self.host).items()],
+            "client": (call.client_ip, 50000),
+            "server": (self.host, 443),
+        }
+        done = asyncio.Event()
+        messages = [{"type": "http.request", "body": call.body, "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Django listens for a disconnect while the view runs; only
+            # report one after the response is complete.
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        status, chunks = [], []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+
+        await self.application(scope, receive, send)
+        done.set()
+        return status[0], b"".join(chunks)
+
+    def __call__(self, call):
+        return self.loop.run_until_complete(self.request(call))
+
+
+DRIVERS = {"wsgi": WSGIDriver, "asgi": ASGIDriver}
+
+
+class _MetricsCollector(logging.Handler):
+    """Collects ``RequestTimingMiddleware``'s per-request metrics."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.records = []
+
+    def emit(self, record):
+        # Handler.handle() already holds the handler lock here.
+        metrics = getattr(record, "request_metrics", None)
+        if metrics is not None:
+            self.records.append(metrics)
+
+
+@contextmanager
+def _collect_request_metrics():
+    logger = logging.getLogger("marvel_rivals.requests")
+    saved = logger.handlers, logger.propagate, logger.level
+    collector = _MetricsCollector()
+    logger.handlers, logger.propagate, logger.level = [collector], False, logging.INFO
+    try:
+        yield collector
+    finally:
+        logger.handlers, logger.propagate, logger.level = saved
+
+
+@contextmanager
+def _relaxed_throttles():
+    """Lift throttle rates so the mix isn't answered with 429s.
+
+    The throttles still run (and hit the cache) on every request, so their
+    cost stays in the numbers.
+    """
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    saved = dict(rates)
+    rates.update({scope: "1000000/second" for scope in rates})
+    try:
+        yield
+    finally:
+        rates.clear()
+        rates.update(saved)
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    # Nearest rank: the smallest value with at least q% of the sample at or below it.
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values) / 100) - 1))
+    return sorted_values[index]
+
+
+def _run_calls(driver, calls, concurrency):
+    """Run ``calls``; returns ``[(call, status, seconds)]`` and the wall time."""
+
+    def one(call):
+        start = time.perf_counter()
+        status, _body = driver(call)
+        return call, status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        results = [one(call) for call in calls]
+    else:
+        # Each worker thread gets its own DB connection; close them afterwards.
+        def worker(chunk):
+            try:
+                return [one(call) for call in chunk]
+            finally:
+                connections.close_all()
+
+        chunks = [calls[i::concurrency] for i in range(concurrency)]
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = [result for chunk in pool.map(worker, chunks) for result in chunk]
+    return results, time.perf_counter() - start
+
+
+def _allocations(driver, calls):
+    """Peak traced allocation (KiB) per request, by scenario."""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for call in calls:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            driver(call)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.setdefault(call.scenario, []).append((peak - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+    return {scenario: statistics.median(values) for scenario, values in peaks.items()}
+
+
+def _summarize(results, metrics, wall, allocations):
+    by_scenario = {}
+    for (call, status, seconds), request_metrics in zip(results, metrics):
+        by_scenario.setdefault(call.scenario, []).append((status, seconds, request_metrics))
+
+    def summary(rows, alloc):
+        latencies = sorted(seconds * 1000 for _status, seconds, _m in rows)
+        busy = sum(latencies) / 1000
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for status, _s, _m in rows if status >= 400),
+            "throughput_rps": round(len(rows) / busy, 1) if busy else 0.0,
+            "p50_ms": round(_percentile(latencies, 50), 2),
+            "p95_ms": round(_percentile(latencies, 95), 2),
+            "p99_ms": round(_percentile(latencies, 99), 2),
+            "queries": round(statistics.fmean(m["db_queries"] for _s, _l, m in rows), 2),
+            "alloc_kib": round(alloc, 1) if alloc is not None else None,
+        }
+
+    scenarios = {
+        name: summary(rows, allocations.get(name)) for name, rows in sorted(by_scenario.items())
+    }
+    overall = summary(
+        [row for rows in by_scenario.values() for row in rows],
+        statistics.median(allocations.values()) if allocations else None,
+    )
+    # Overall throughput is wall-clock based, so it reflects --concurrency.
+    overall["throughput_rps"] = round(len(results) / wall, 1) if wall else 0.0
+    return {"overall": overall, "scenarios": scenarios}
+
+
+def run(mix="default", requests=2000, warmup=100, interface="wsgi", concurrency=1,
+        seed=0, alloc_requests=30, users=20):
+    """Run a benchmark and return the results as a JSON-ready dict."""
+    weights = MIXES[mix] if isinstance(mix, str) else mix
+    workload = Workload(weights, seed=seed, users=users)
+    driver = DRIVERS[interface]()
+
+    warmup_calls = [workload.next_call() for _ in range(warmup)]
+    calls = [workload.next_call() for _ in range(requests)]
+    alloc_calls = [workload.next_call() for _ in range(alloc_requests * len(weights))]
+
+    try:
+        with _relaxed_throttles():
+            with _collect_request_metrics():
+                _run_calls(driver, warmup_calls, 1)
+            with _collect_request_metrics() as collector:
+                results, wall = _run_calls(driver, calls, concurrency)
+            with _collect_request_metrics():
+                allocations = _allocations(driver, alloc_calls) if alloc_requests else {}
+    finally:
+        cleanup()
+
+    if len(collector.records) != len(results):
+        raise RuntimeError("RequestTimingMiddleware must be enabled to count queries.")
+    if concurrency > 1:
+        # Records arrive in completion order; queries are averaged per
+        # scenario, so pair them by path rather than by position.
+        pending = {}
+        for record in collector.records:
+            pending.setdefault((record["method"], record["path"]), []).append(record)
+        metrics = [pending[(call.method, urlsplit(call.path).path)].pop() for call, _s, _t in results]
+    else:
+        metrics = collector.records
+
+    return {
+        "meta": {
+            "mix": weights,
+            "interface": interface,
+            "requests": requests,
+            "concurrency": concurrency,
+            "seed": seed,
+            "dataset": {
+                "users": User.objects.count(),
+                "teams": Team.objects.count(),
+                "votes": Vote.objects.count(),
+                "comments": Comment.objects.count(),
+            },
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "cpus": os.cpu_count(),
+        },
+        **_summarize(results, metrics, wall, allocations),
+    }
+
+
+def compare(current, baseline, tolerances=None):
+    """Rows of ``(scope, metric, baseline, current, change, regressed)``."""
+    tolerances = {**TOLERANCES, **(tolerances or {})}
+    rows = []
+    scopes = [("overall", current["overall"], baseline.get("overall", {}))]
+    scopes += [
+        (name, stats, baseline.get("scenarios", {}).get(name, {}))
+        for name, stats in current["scenarios"].items()
+    ]
+    for scope, now, then in scopes:
+        for metric, tolerance in tolerances.items():
+            old, new = then.get(metric), now.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append((scope, metric, old, new, change, worse > tolerance))
+    return rows
@@ -0,0 +1,72 @@
+"""Cache backends that count hits and misses for the current request.
+
+Both also give the throttles (``marvel_rivals.throttling``) their counter
+operations, uncounted; ``RedisCache`` runs them as single round trips on the
+raw client.
+"""
+
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+from django.core.cache.backends.redis import RedisCache as BaseRedisCache
+
+from .instrumentation import incr
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        if value is _MISSING:
+            incr("cache_misses")
+            return default
+        incr("cache_hits")
+        return value
+
+
+class LocMemCache(InstrumentedCacheMixin, BaseLocMemCache):
+    # BaseCache.get_many() goes through get(), so it is already counted.
+
+    def window_counts(self, current_key, previous_key, timeout):
+        """Increment ``current_key`` and read ``previous_key``.
+
+        Throttle bookkeeping reads the previous window on every request, and
+        it is usually absent; it bypasses the counted ``get()`` so it does
+        not show up as cache misses.
+        """
+        self.add(current_key, 0, timeout=timeout)
+        try:
+            count = self.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.set(current_key, 1, timeout=timeout)
+            count = 1
+        return count, BaseLocMemCache.get(self, previous_key, 0)
+
+
+class RedisCache(InstrumentedCacheMixin, BaseRedisCache):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        incr("cache_hits", len(found))
+        incr("cache_misses", len(keys) - len(found))
+        return found
+
+    def window_counts(self, current_key, previous_key, timeout):
+        """Increment ``current_key`` and read ``previous_key`` in one round trip.
+
+        Counters are stored as plain integers, which is also how Django's
+        serializer stores ints, so ``get()`` reads them back unchanged.
+        """
+        current = self.make_and_validate_key(current_key)
+        previous = self.make_and_validate_key(previous_key)
+        pipe = self._cache.get_client(current, write=True).pipeline(transaction=False)
+        pipe.incr(current)
+        pipe.expire(current, timeout)
+        pipe.get(previous)
+        count, _expired, before = pipe.execute()
+        return count, int(before or 0)
+
+    def window_release(self, key):
+        """Give back one count (a rejected request) with a single DECR."""
+        key = self.make_and_validate_key(key)
+        self._cache.get_client(key, write=True).decr(key)
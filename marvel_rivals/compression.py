@@ -0,0 +1,245 @@
+"""Gzip/Brotli compression for API JSON responses.
+
+WhiteNoise only pre-compresses static files; this middleware covers the
+API. Small bodies are left alone, streaming responses are compressed chunk
+by chunk with a flush after every chunk (so SSE-style streams aren't held
+back), and compressed bodies are cached in-process by content digest, so
+identical hot responses such as the hero catalog or the first page of the
+team feed are compressed once rather than on every request.
+
+Brotli is used when the optional ``brotli`` package is installed and the
+client asks for it; gzip otherwise.
+"""
+
+import gzip
+import hashlib
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .instrumentation import track
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+DEFAULTS = {
+    "min_size": 1024,
+    "gzip_level": 6,
+    "brotli": True,
+    "brotli_quality": 5,
+    "streaming": True,
+    "cache_bytes": 8 * 1024 * 1024,
+    "cache_max_body": 1024 * 1024,
+    "paths": ("/api/",),
+    "content_types": ("application/json",),
+}
+
+
+def compression_options():
+    return {**DEFAULTS, **getattr(settings, "RESPONSE_COMPRESSION", {})}
+
+
+def choose_encoding(accept_encoding, use_brotli=True):
+    """Best supported coding from an Accept-Encoding header, or None."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[coding] = q
+
+    candidates = ["br", "gzip"] if use_brotli and brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = offered.get(coding, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_body(body, encoding, options):
+    if encoding == "br":
+        return brotli.compress(body, quality=options["brotli_quality"])
+    return gzip.compress(body, compresslevel=options["gzip_level"], mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk."""
+
+    def __init__(self, encoding, options):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=options["brotli_quality"])
+        else:
+            self._zlib = zlib.compressobj(options["gzip_level"], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data):
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def compress_stream(chunks, encoding, options):
+    compressor = _StreamCompressor(encoding, options)
+    for data in chunks:
+        out = compressor.chunk(data)
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding, options):
+    compressor = _StreamCompressor(encoding, options)
+    async for data in chunks:
+        out = compressor.chunk(data)
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+class CompressedBodyCache:
+    """Process-local LRU of compressed bodies keyed by content digest.
+
+    Keys are derived from the uncompressed bytes, so a hit can only ever
+    return the compressed form of the exact body being sent.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, body, encoding, options):
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compressed = compress_body(body, encoding, options)
+        if len(compressed) > self.max_bytes:
+            return compressed
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self._size += len(compressed)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return compressed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class CompressionMiddleware:
+    """Compress JSON responses under the configured API paths."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = compression_options()
+        self.cache = CompressedBodyCache(self.options["cache_bytes"])
+        _middlewares.add(self)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        with track("compress"):
+            return self.process_response(request, response)
+
+    def _eligible(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return False
+        if not request.path.startswith(tuple(self.options["paths"])):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return content_type in self.options["content_types"]
+
+    def _cacheable(self, response, body):
+        if not self.options["cache_bytes"] or len(body) > self.options["cache_max_body"]:
+            return False
+        cache_control = response.get("Cache-Control", "").lower()
+        return "no-store" not in cache_control and "private" not in cache_control
+
+    def process_response(self, request, response):
+        if not self._eligible(request, response):
+            return response
+
+        if response.streaming:
+            if not self.options["streaming"]:
+                return response
+        elif len(response.content) < self.options["min_size"]:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(
+            request.headers.get("Accept-Encoding", ""), self.options["brotli"]
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    response.streaming_content, encoding, self.options
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, encoding, self.options
+                )
+            del response.headers["Content-Length"]
+        else:
+            body = response.content
+            if self._cacheable(response, body):
+                compressed = self.cache.get_or_compress(body, encoding, self.options)
+            else:
+                compressed = compress_body(body, encoding, self.options)
+            if len(compressed) >= len(body):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # The body changed, so a strong validator would now be wrong.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+
+_middlewares = weakref.WeakSet()
+
+
+def compression_stats():
+    """Compressed-body cache counters for every middleware instance in this process."""
+    return [middleware.cache.stats() for middleware in list(_middlewares)]
@@ -0,0 +1,118 @@
+"""Bounded worker pools that cap how much CPU-heavy work runs at once."""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a pool already has ``max_queue`` jobs waiting."""
+
+
+class BoundedExecutor:
+    """Thread pool with a hard cap on queued work and queue-depth counters.
+
+    Submissions beyond ``workers + max_queue`` in flight are rejected right
+    away instead of piling up, so a burst can't hold request threads hostage.
+    ``workers=0`` runs jobs inline, which keeps tests single-threaded.
+    """
+
+    def __init__(self, name, workers, max_queue):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers else None
+        self._lock = threading.Lock()
+        self._pool = None
+        self._active = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn, *args, **kwargs):
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+            with self._lock:
+                self._completed += 1
+            return future
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorSaturated(f"{self.name} executor is saturated")
+
+        with self._lock:
+            self._queued += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=f"{self.name}-worker",
+                )
+        return self._pool.submit(self._run, fn, args, kwargs)
+
+    def run(self, fn, *args, **kwargs):
+        """Run ``fn`` on the pool and block until it returns."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run_async(self, fn, *args, **kwargs):
+        """Await ``fn`` on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            # Pool threads hold their own DB connections; recycle them the way
+            # the request cycle does.
+            close_old_connections()
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name):
+    """Return the process-wide executor configured in ``settings.EXECUTORS``."""
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+
+    with _executors_lock:
+        if name not in _executors:
+            config = settings.EXECUTORS[name]
+            _executors[name] = BoundedExecutor(
+                name,
+                workers=config.get("workers", 1),
+                max_queue=config.get("max_queue", 0),
+            )
+        return _executors[name]
+
+
+def executor_stats():
+    return [executor.stats() for executor in list(_executors.values())]
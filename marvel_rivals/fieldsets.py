@@ -0,0 +1,105 @@
+"""Sparse fieldsets for read endpoints: ``?fields=a,b`` or ``?omit=c,d``.
+
+The serializer drops the fields that weren't asked for, and the view defers
+the model columns that only those fields read, so unused data is neither
+loaded from the database nor encoded.
+"""
+
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _csv(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def parse_fieldset(request):
+    """``(fields, omit)`` from the query string; each is a set or None."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    params = request.query_params
+    return _csv(params.get('fields')), _csv(params.get('omit'))
+
+
+def excluded_names(names, fields=None, omit=None):
+    """Which of ``names`` a ``fields``/``omit`` pair leaves out."""
+    excluded = set()
+    if fields:
+        excluded |= set(names) - set(fields)
+    if omit:
+        excluded |= set(names) & set(omit)
+    return excluded
+
+
+class SparseFieldsetSerializerMixin:
+    """Accept ``fields=`` / ``omit=`` keyword arguments and drop the rest.
+
+    Unknown names are ignored. Only the top-level serializer is pruned;
+    nested serializers keep their full shape.
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in excluded_names(self.fields, fields, omit):
+            self.fields.pop(name)
+
+
+def unused_columns(serializer_class, model, fields=None, omit=None):
+    """Plain model columns read only by fields the response leaves out.
+
+    Method fields and relations are never deferred; only columns that are the
+    direct source of an excluded field and of no kept field qualify.
+    """
+    declared = serializer_class().fields
+    excluded = excluded_names(declared, fields, omit)
+    if not excluded:
+        return []
+
+    columns = {
+        field.name
+        for field in model._meta.concrete_fields
+        if not field.primary_key and not field.is_relation
+    }
+    kept_sources = {field.source for name, field in declared.items() if name not in excluded}
+    return sorted(
+        {
+            field.source
+            for name, field in declared.items()
+            if name in excluded and field.source in columns and field.source not in kept_sources
+        }
+    )
+
+
+class SparseFieldsetMixin:
+    """View mixin wiring ``?fields=`` / ``?omit=`` into serializer and queryset.
+
+    Call ``prune_queryset()`` from ``get_queryset`` (or ``get_object``) to
+    defer the columns the response won't use.
+    """
+
+    def get_sparse_fieldset(self):
+        return parse_fieldset(getattr(self, 'request', None))
+
+    def _supports_sparse(self, serializer_class):
+        return issubclass(serializer_class, SparseFieldsetSerializerMixin)
+
+    def sparse_excludes(self, *names):
+        """True if the response leaves out every one of ``names``."""
+        fields, omit = self.get_sparse_fieldset()
+        return set(names) <= excluded_names(names, fields, omit)
+
+    def get_serializer(self, *args, **kwargs):
+        fields, omit = self.get_sparse_fieldset()
+        if (fields or omit) and self._supports_sparse(self.get_serializer_class()):
+            kwargs.setdefault('fields', fields)
+            kwargs.setdefault('omit', omit)
+        return super().get_serializer(*args, **kwargs)
+
+    def prune_queryset(self, queryset):
+        fields, omit = self.get_sparse_fieldset()
+        serializer_class = self.get_serializer_class()
+        if not (fields or omit) or not self._supports_sparse(serializer_class):
+            return queryset
+        deferred = unused_columns(serializer_class, queryset.model, fields, omit)
+        return queryset.defer(*deferred) if deferred else queryset
@@ -1,16 +1,183 @@
-"""Simple health check endpoint for uptime monitoring."""
+"""Health check endpoint for uptime monitoring and load balancers.
 
+``/api/health/`` answers from the process alone. ``/api/health/?deep=1``
+also probes the database (``SELECT 1``), the cache (set/get/delete) and the
+channel layer (``group_send`` to a private group and back). Probe results
+are cached per process for a few seconds and refreshed by one request at a
+time, so frequent polling can't turn into load on the dependencies.
+
+A slow dependency makes the status ``degraded`` (still 200); a failed one
+makes it ``unhealthy`` with a 503, so the balancer stops routing here.
+"""
+
+import asyncio
 import os
+import threading
+import time
+import uuid
 
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.http import JsonResponse
 from django.utils import timezone
 
+from marvel_rivals import metrics
+from marvel_rivals.executors import executor_stats
+from marvel_rivals.warmup import is_ready
+
+DEFAULTS = {
+    "cache_seconds": 5,
+    "timeout": 2.0,
+    "slow_ms": {"database": 250, "cache": 50, "channel_layer": 250},
+}
+
+
+def health_options():
+    options = {**DEFAULTS, **getattr(settings, "HEALTH_CHECK", {})}
+    options["slow_ms"] = {**DEFAULTS["slow_ms"], **options["slow_ms"]}
+    return options
+
+
+def probe_database():
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception:
+        # Don't keep a broken connection around for the next request.
+        connection.close_if_unusable_or_obsolete()
+        raise
+
+
+def probe_cache():
+    key = f"health:{uuid.uuid4().hex}"
+    cache.set(key, 1, timeout=30)
+    try:
+        if cache.get(key) != 1:
+            raise RuntimeError("cache read back a different value")
+    finally:
+        cache.delete(key)
+
+
+def probe_channel_layer(timeout):
+    layer = get_channel_layer()
+    if layer is None:
+        return "skipped"
+
+    async def loopback():
+        channel = await layer.new_channel()
+        group = f"health_{uuid.uuid4().hex}"
+        await layer.group_add(group, channel)
+        try:
+            await layer.group_send(group, {"type": "health.ping"})
+            message = await layer.receive(channel)
+            if message.get("type") != "health.ping":
+                raise RuntimeError("unexpected loopback message")
+        finally:
+            await layer.group_discard(group, channel)
+
+    async def bounded():
+        # Every step can hang on an unreachable Redis, not just the receive.
+        await asyncio.wait_for(loopback(), timeout)
+
+    async_to_sync(bounded)()
+    return "ok"
+
+
+def _timed(name, probe, slow_ms):
+    start = time.perf_counter()
+    try:
+        status = probe() or "ok"
+        error = None
+    except Exception as exc:
+        status, error = "fail", f"{type(exc).__name__}: {exc}"
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    if status == "ok" and latency_ms > slow_ms[name]:
+        status = "slow"
+    result = {"status": status, "latency_ms": latency_ms}
+    if error:
+        result["error"] = error
+    return result
+
+
+def run_probes(options):
+    slow_ms = options["slow_ms"]
+    checks = {
+        "database": _timed("database", probe_database, slow_ms),
+        "cache": _timed("cache", probe_cache, slow_ms),
+        "channel_layer": _timed(
+            "channel_layer", lambda: probe_channel_layer(options["timeout"]), slow_ms
+        ),
+    }
+    statuses = {check["status"] for check in checks.values()}
+    if "fail" in statuses:
+        status = "unhealthy"
+    elif "slow" in statuses:
+        status = "degraded"
+    else:
+        status = "ok"
+    return {"status": status, "checks": checks}
+
+
+class _ProbeCache:
+    """Last probe result, refreshed by at most one thread at a time."""
+
+    def __init__(self):
+        self.result = None
+        self.checked = 0.0
+        self.lock = threading.Lock()
+
+    def get(self, options):
+        if self.result is not None and time.monotonic() - self.checked < options["cache_seconds"]:
+            return self.result, True
+        # Others keep serving the previous result while one thread refreshes.
+        blocking = self.result is None
+        if not self.lock.acquire(blocking=blocking):
+            return self.result, True
+        try:
+            if self.result is None or time.monotonic() - self.checked >= options["cache_seconds"]:
+                self.result = {**run_probes(options), "checked_at": timezone.now().isoformat()}
+                self.checked = time.monotonic()
+                return self.result, False
+            return self.result, True
+        finally:
+            self.lock.release()
+
+
+_probes = _ProbeCache()
+
+
+def _collect_dependency_metrics():
+    result = _probes.result
+    if result is None:
+        return []
+    rows = []
+    for name, check in result["checks"].items():
+        if check["status"] == "skipped":
+            continue
+        labels = {"dependency": name}
+        rows.append(("rivals_dependency_up", labels, int(check["status"] != "fail")))
+        rows.append(("rivals_dependency_latency_seconds", labels, check["latency_ms"] / 1000))
+    return rows
+
+
+metrics.register_collector(_collect_dependency_metrics)
+
+
+def health_view(request):
+    payload = {
+        "status": "ok",
+        "timestamp": timezone.now().isoformat(),
+        "commit": os.environ.get("GIT_COMMIT", "local"),
+        "ready": is_ready(),
+        "executors": executor_stats(),
+    }
+    if request.GET.get("deep") not in ("1", "true", "yes"):
+        return JsonResponse(payload)
 
-def health_view(_request):
-    return JsonResponse(
-        {
-            "status": "ok",
-            "timestamp": timezone.now().isoformat(),
-            "commit": os.environ.get("GIT_COMMIT", "local"),
-        }
-    )
+    result, cached = _probes.get(health_options())
+    payload.update(result, cached=cached)
+    return JsonResponse(payload, status=503 if result["status"] == "unhealthy" else 200)
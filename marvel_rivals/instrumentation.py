@@ -0,0 +1,99 @@
+"""Per-request performance counters.
+
+``RequestTimingMiddleware`` opens a ``RequestMetrics`` for the current
+thread; code further down records into it with ``track()`` (timed phases)
+and ``incr()`` (counters). Both are no-ops outside a request, so library
+code can call them unconditionally.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from rest_framework.response import Response
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.counters = {}
+        self.view_name = None
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def incr(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting queries and their time."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+def begin_request():
+    metrics = _local.metrics = RequestMetrics()
+    return metrics
+
+
+def end_request():
+    _local.metrics = None
+
+
+def current_metrics():
+    return getattr(_local, "metrics", None)
+
+
+@contextmanager
+def track(name):
+    """Add the time spent in the block to the current request's ``name`` phase."""
+    metrics = current_metrics()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - start)
+
+
+def incr(name, amount=1):
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.incr(name, amount)
+
+
+def serialized(serializer):
+    """``serializer.data``, timed as the ``serialize`` phase."""
+    with track("serialize"):
+        return serializer.data
+
+
+class SerializeTimingMixin:
+    """DRF ``list``/``retrieve`` with the serializer's ``.data`` timed as
+    ``serialize``, so the generic paths report the same phases as the
+    hand-built projection paths.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialized(self.get_serializer(page, many=True)))
+        return Response(serialized(self.get_serializer(queryset, many=True)))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(serialized(self.get_serializer(self.get_object())))
@@ -0,0 +1,112 @@
+"""
+Benchmark the API in-process and compare against the committed baseline.
+
+The committed baseline (benchmarks/baseline.json) was recorded on SQLite
+against a fresh database with:
+    python manage.py seed_heroes
+    python manage.py generate_dataset --size tiny --seed 0
+
+Run:
+    python manage.py benchmark
+    python manage.py benchmark --mix read --interface asgi --requests 5000
+    python manage.py benchmark --save-baseline       # after an intended change
+    python manage.py benchmark --fail-on-regression  # non-zero exit on regressions
+
+Latency and allocation numbers only compare on the same machine and dataset;
+query counts compare anywhere. Votes and comments written during the run
+belong to dedicated ``bench-user-*`` accounts and are removed afterwards.
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from marvel_rivals.benchmark import DRIVERS, MIXES, compare, run
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+COLUMNS = ("requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "queries", "alloc_kib")
+
+
+class Command(BaseCommand):
+    help = "Drive the WSGI/ASGI application with a request mix and compare to a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mix", choices=MIXES, default="default")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--warmup", type=int, default=100)
+        parser.add_argument("--interface", choices=DRIVERS, default="wsgi")
+        parser.add_argument("--concurrency", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--alloc-requests",
+            type=int,
+            default=30,
+            help="Tracemalloc-pass requests per scenario in the mix, on average (0 to skip).",
+        )
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument("--save-baseline", action="store_true")
+        parser.add_argument("--output", type=Path, help="Also write this run's results here.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            results = run(
+                mix=options["mix"],
+                requests=options["requests"],
+                warmup=options["warmup"],
+                interface=options["interface"],
+                concurrency=options["concurrency"],
+                seed=options["seed"],
+                alloc_requests=options["alloc_requests"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.print_table(results)
+        if options["output"]:
+            self.write_json(options["output"], results)
+
+        baseline_path = options["baseline"]
+        if options["save_baseline"]:
+            self.write_json(baseline_path, results)
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {baseline_path}."))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f"No baseline at {baseline_path}; run with --save-baseline.")
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        regressions = self.print_comparison(results, baseline)
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{regressions} metric(s) regressed beyond tolerance.")
+
+    def print_table(self, results):
+        self.stdout.write(f"{'scenario':<10}" + "".join(f"{c:>15}" for c in COLUMNS))
+        rows = [*results["scenarios"].items(), ("overall", results["overall"])]
+        for name, stats in rows:
+            cells = "".join(f"{'-' if stats[c] is None else stats[c]:>15}" for c in COLUMNS)
+            self.stdout.write(f"{name:<10}{cells}")
+
+    def print_comparison(self, results, baseline):
+        environment = ("python", "django", "cpus", "database", "dataset", "mix", "interface", "concurrency")
+        changed = [key for key in environment if results["meta"].get(key) != baseline["meta"].get(key)]
+        if changed:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline differs in {', '.join(changed)}; timings may not be comparable."
+            ))
+
+        regressions = 0
+        self.stdout.write(f"\n{'scenario':<10}{'metric':>16}{'baseline':>12}{'current':>12}{'change':>10}")
+        for scope, metric, old, new, change, regressed in compare(results, baseline):
+            line = f"{scope:<10}{metric:>16}{old:>12}{new:>12}{change:>+10.1%}"
+            if regressed:
+                regressions += 1
+                line = self.style.ERROR(line + "  REGRESSION")
+            self.stdout.write(line)
+        return regressions
+
+    def write_json(self, path, results):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,78 @@
+"""
+Summarise the slow-query log per query fingerprint.
+
+Needs SLOW_QUERY_LOG_DIR (or --dir) pointing at the directory the workers
+append their ``slow-queries-<pid>.jsonl`` files to.
+
+Run:
+    python manage.py slow_query_report
+    python manage.py slow_query_report --since 24 --sort count --top 10
+    python manage.py slow_query_report --plans    # include captured EXPLAIN output
+    python manage.py slow_query_report --json
+"""
+
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from marvel_rivals.slow_queries import aggregate, load_entries, slow_query_options
+
+SORTS = {"total": "total_ms", "count": "count", "mean": "mean_ms", "p95": "p95_ms", "max": "max_ms"}
+
+
+class Command(BaseCommand):
+    help = "Aggregate logged slow queries by fingerprint, worst first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", type=Path, help="Slow-query log directory (default: SLOW_QUERY_LOG_DIR).")
+        parser.add_argument("--since", type=float, help="Only queries logged in the last N hours.")
+        parser.add_argument("--sort", choices=SORTS, default="total")
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--view", help="Only queries run by this view name.")
+        parser.add_argument("--plans", action="store_true", help="Print the latest captured plan.")
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        log_dir = options["dir"] or slow_query_options()["log_dir"]
+        if not log_dir:
+            raise CommandError("No log directory; set SLOW_QUERY_LOG_DIR or pass --dir.")
+        if not Path(log_dir).is_dir():
+            raise CommandError(f"{log_dir} is not a directory.")
+
+        since = None
+        if options["since"]:
+            since = (timezone.now() - timedelta(hours=options["since"])).isoformat()
+        entries = load_entries(log_dir, since)
+        if options["view"]:
+            entries = [entry for entry in entries if entry["view"] == options["view"]]
+
+        groups = aggregate(entries)
+        groups.sort(key=lambda row: row[SORTS[options["sort"]]], reverse=True)
+        rows = groups[: options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        if not rows:
+            self.stdout.write("No slow queries logged.")
+            return
+
+        self.stdout.write(f"{len(entries)} slow queries, {len(groups)} fingerprints.\n")
+        for row in rows:
+            views = ", ".join(
+                f"{view} ({count})" for view, count in sorted(row["views"].items(), key=lambda item: -item[1])
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{row['fingerprint']}  count={row['count']} total={row['total_ms']}ms "
+                f"mean={row['mean_ms']}ms p95={row['p95_ms']}ms max={row['max_ms']}ms"
+            ))
+            self.stdout.write(f"  views: {views}")
+            self.stdout.write(f"  last:  {row['last_seen']} request_id={row['last_request_id']}")
+            self.stdout.write(f"  sql:   {row['sql']}")
+            if options["plans"]:
+                for line in row["plan"] or ["(no plan captured)"]:
+                    self.stdout.write(f"  plan:  {line}")
+            self.stdout.write("")
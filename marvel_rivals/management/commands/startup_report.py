@@ -0,0 +1,64 @@
+"""
+Break down worker cold-start time by phase and by module.
+
+Run:
+    python manage.py startup_report
+    python manage.py startup_report --interface wsgi --runs 10 --top 25
+    python manage.py startup_report --json > startup.json
+
+Phase times are medians over --runs fresh interpreters; the module tables
+come from one extra run under ``python -X importtime``, which inflates them
+somewhat, so compare them with each other rather than with the phases.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marvel_rivals.startup import PHASES, profile_startup
+
+
+class Command(BaseCommand):
+    help = "Profile settings import, django.setup(), app and URLconf loading in fresh processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interface", choices=("asgi", "wsgi"), default="asgi")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--json", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["runs"] < 1:
+            raise CommandError("--runs must be at least 1.")
+        try:
+            report = profile_startup(options["interface"], options["runs"])
+        except RuntimeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        top = options["top"]
+        self.stdout.write(
+            f"{report['interface']} cold start, median of {report['runs']} runs "
+            f"(Python {report['python']}): {report['wall_ms']} ms"
+        )
+        self.stdout.write(f"  {'interpreter':<12}{report['interpreter_ms']:>10} ms")
+        for phase in PHASES:
+            self.stdout.write(f"  {phase:<12}{report['phases_ms'][phase]:>10} ms")
+
+        for phase, rows in report["imports"].items():
+            rows = rows[:top]
+            if not rows:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\nImported during {phase} (cumulative ms)"))
+            for row in rows:
+                self.stdout.write(f"  {row['cumulative_ms']:>8}  {row['module']}")
+                for child in row["children"][:3]:
+                    if child["cumulative_ms"] >= 1:
+                        self.stdout.write(f"  {child['cumulative_ms']:>8}    {child['module']}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSelf time by top-level package (ms)"))
+        for package, ms in list(report["packages_ms"].items())[:top]:
+            self.stdout.write(f"  {ms:>8}  {package}")
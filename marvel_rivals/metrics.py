@@ -0,0 +1,370 @@
+"""Prometheus metrics for ``/api/metrics/``.
+
+Recording takes no lock: every thread writes into its own shard (plain
+dicts only that thread mutates), and a scrape sums the shards. Registering a
+shard is a set add and ending a request (``release()``) is a deque append,
+both atomic under the GIL. The registry lock is only taken to fold released
+shards, and shards of threads that died without releasing, into one retired
+shard: at scrape time, and by whichever thread registers once more than
+``_FOLD_BACKLOG`` are waiting (skipped if the lock is busy). Per-request
+threads (Django runs each ASGI request on a fresh one) therefore don't pile
+up between scrapes, and no request thread ever waits on the lock.
+
+With several worker processes, set ``METRICS_DIR`` to a directory shared by
+all of them (cleared on deploy). Each process writes its totals there every
+``METRICS_FLUSH_INTERVAL`` seconds and at exit, and a scrape of any worker
+merges every file: counters and histograms are summed across all files,
+gauges only across processes that are still alive.
+"""
+
+import atexit
+import bisect
+import collections
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .profiling import request_user
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help)
+METRICS = {
+    "rivals_http_request_duration_seconds": ("histogram", "Request latency by route."),
+    "rivals_db_queries_total": ("counter", "Database queries by route."),
+    "rivals_db_query_seconds_total": ("counter", "Time spent in database queries by route."),
+    "rivals_slow_queries_total": ("counter", "Queries over the slow-query threshold by route."),
+    "rivals_cache_requests_total": ("counter", "Cache lookups by result (hit or miss)."),
+    "rivals_websocket_connections": ("gauge", "Open comment websocket connections."),
+    "rivals_websocket_connections_total": ("counter", "Comment websocket connections accepted."),
+    "rivals_websocket_groups": ("gauge", "Team comment groups with at least one local listener."),
+    "rivals_channel_layer_errors_total": ("counter", "Failed channel layer calls by operation."),
+    "rivals_comment_broadcast_failures_total": ("counter", "New comments that could not be broadcast."),
+    "rivals_throttle_rejections_total": ("counter", "Requests rejected by a throttle, by scope."),
+    "rivals_executor_active": ("gauge", "Jobs running on a bounded executor."),
+    "rivals_executor_queued": ("gauge", "Jobs waiting on a bounded executor."),
+    "rivals_executor_completed_total": ("counter", "Jobs finished by a bounded executor."),
+    "rivals_executor_rejected_total": ("counter", "Jobs rejected by a saturated executor."),
+    "rivals_compression_cache_requests_total": ("counter", "Compressed-body cache lookups by result."),
+    "rivals_dependency_up": ("gauge", "Whether the last deep health probe of a dependency succeeded."),
+    "rivals_dependency_latency_seconds": ("gauge", "Latency of the last deep health probe of a dependency."),
+}
+
+
+class _Shard:
+    """Metric values written by a single thread."""
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.values = {}  # (name, labels) -> number, for counters and gauges
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+
+
+_FOLD_BACKLOG = 64
+
+_local = threading.local()
+_shards = set()
+_released = collections.deque()
+_retired = _Shard()
+_registry_lock = threading.Lock()
+_collectors = []
+
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard(threading.current_thread())
+        _shards.add(shard)
+        if len(_released) > _FOLD_BACKLOG and _registry_lock.acquire(blocking=False):
+            try:
+                _fold_retired()
+            finally:
+                _registry_lock.release()
+    return shard
+
+
+def _retire(shard):
+    """Fold ``shard`` into the retired totals; caller holds the registry lock."""
+    _fold(_retired.values, dict(shard.values), False)
+    _fold(_retired.histograms, dict(shard.histograms), True)
+    _shards.discard(shard)
+
+
+def _fold_retired():
+    """Retire released shards and those of dead threads; caller holds the lock."""
+    while _released:
+        shard = _released.popleft()
+        if shard in _shards:  # not already retired as a dead thread's
+            _retire(shard)
+    for shard in tuple(_shards):
+        if not shard.thread.is_alive():
+            _retire(shard)
+
+
+def release():
+    """Hand this thread's shard over to be folded (end of a request)."""
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        return
+    _local.shard = None
+    _released.append(shard)
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Add ``value`` to a counter, or to a gauge (negative to decrease)."""
+    values = _shard().values
+    key = (name, _labels(labels))
+    values[key] = values.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Record ``value`` in a histogram with ``DURATION_BUCKETS``."""
+    histograms = _shard().histograms
+    key = (name, _labels(labels))
+    row = histograms.get(key)
+    if row is None:
+        row = histograms[key] = [0] * (len(DURATION_BUCKETS) + 3)
+    row[bisect.bisect_left(DURATION_BUCKETS, value)] += 1
+    row[-2] += value
+    row[-1] += 1
+
+
+def register_collector(collect):
+    """Add a callable returning ``[(name, labels dict, value)]`` at scrape time."""
+    if collect not in _collectors:
+        _collectors.append(collect)
+
+
+def _fold(totals, rows, histogram):
+    for key, value in rows.items():
+        if histogram:
+            current = totals.get(key)
+            totals[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+def snapshot():
+    """This process's totals: ``(values, histograms)`` keyed by (name, labels)."""
+    values, histograms = {}, {}
+    with _registry_lock:
+        _fold_retired()
+        # Only folding retires shards, and it holds the lock, so none is
+        # counted twice; shards registered meanwhile are simply included.
+        for shard in [_retired, *tuple(_shards)]:
+            _fold(values, dict(shard.values), False)
+            _fold(histograms, dict(shard.histograms), True)
+
+    for collect in _collectors:
+        for name, labels, value in collect():
+            # Collectors report absolute values; don't add onto a shard's.
+            values[(name, _labels(labels))] = value
+    return values, histograms
+
+
+def _default_collector():
+    from .compression import compression_stats
+    from .executors import executor_stats
+
+    rows = []
+    for stats in executor_stats():
+        labels = {"executor": stats["name"]}
+        rows += [
+            ("rivals_executor_active", labels, stats["active"]),
+            ("rivals_executor_queued", labels, stats["queued"]),
+            ("rivals_executor_completed_total", labels, stats["completed"]),
+            ("rivals_executor_rejected_total", labels, stats["rejected"]),
+        ]
+    caches = compression_stats()
+    for result, field in (("hit", "hits"), ("miss", "misses")):
+        total = sum(stats[field] for stats in caches)
+        rows.append(("rivals_compression_cache_requests_total", {"result": result}, total))
+    return rows
+
+
+register_collector(_default_collector)
+
+
+# -- multi-process -------------------------------------------------------
+
+def _options():
+    return getattr(settings, "METRICS", {})
+
+
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+_process = None
+
+
+def _process_file(directory):
+    """This process's file; pid plus start time, so a reused pid starts afresh."""
+    global _process
+    if _process is None or _process[0] != os.getpid():
+        _process = (os.getpid(), time.time_ns())
+    return Path(directory) / f"{_process[0]}-{_process[1]}.json"
+
+
+def _after_fork():
+    # A forked worker starts from zero rather than re-reporting its parent's counts.
+    global _local, _retired, _registry_lock, _last_flush, _flush_lock
+    _local = threading.local()
+    _retired = _Shard()
+    _registry_lock = threading.Lock()
+    _shards.clear()
+    _released.clear()
+    _last_flush = 0.0
+    _flush_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _encode(values, histograms):
+    return {
+        "pid": os.getpid(),
+        "values": [[name, list(labels), value] for (name, labels), value in values.items()],
+        "histograms": [[name, list(labels), row] for (name, labels), row in histograms.items()],
+    }
+
+
+def flush(force=False):
+    """Write this process's totals to ``METRICS_DIR`` if one is configured.
+
+    Called after every request; only writes once per flush interval, and a
+    thread that finds another one already writing simply skips.
+    """
+    global _last_flush
+    directory = _options().get("dir")
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < _options().get("flush_interval", 5):
+        return
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _last_flush = now
+        path = _process_file(directory)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_encode(*snapshot())))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    finally:
+        _flush_lock.release()
+
+
+atexit.register(flush, force=True)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merged_snapshot():
+    """Totals across every worker that has written to ``METRICS_DIR``."""
+    values, histograms = snapshot()
+    directory = _options().get("dir")
+    if not directory:
+        return values, histograms
+
+    flush(force=True)
+    own = _process_file(directory)
+    for path in Path(directory).glob("*.json"):
+        if path == own:
+            continue
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        alive = _alive(data["pid"])
+        for name, labels, value in data["values"]:
+            if METRICS.get(name, ("counter",))[0] == "gauge" and not alive:
+                continue
+            key = (name, tuple(tuple(pair) for pair in labels))
+            values[key] = values.get(key, 0) + value
+        _fold(
+            histograms,
+            {(name, tuple(tuple(pair) for pair in labels)): row for name, labels, row in data["histograms"]},
+            True,
+        )
+    return values, histograms
+
+
+# -- exposition ------------------------------------------------------------
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(values, histograms):
+    """Prometheus text exposition format (version 0.0.4)."""
+    by_name = {}
+    for (name, labels), value in values.items():
+        by_name.setdefault(name, []).append((labels, value))
+    for (name, labels), row in histograms.items():
+        by_name.setdefault(name, []).append((labels, row))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = METRICS.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_name[name]):
+            if kind != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*DURATION_BUCKETS, "+Inf"), value):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def _may_scrape(request):
+    """``METRICS_TOKEN`` as a bearer token, or an admin user; anyone in DEBUG."""
+    token = _options().get("token")
+    if token and request.headers.get("Authorization") == f"Bearer {token}":
+        return True
+    user = request_user(request)
+    if user is not None and user.is_staff:
+        return True
+    return not token and settings.DEBUG
+
+
+def metrics_view(request):
+    if not _may_scrape(request):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        render(*merged_snapshot()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
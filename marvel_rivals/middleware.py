@@ -3,8 +3,16 @@
 import logging
 import threading
 import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics as prometheus
+from .instrumentation import begin_request, current_metrics, end_request
 
 _request_local = threading.local()
+request_logger = logging.getLogger("marvel_rivals.requests")
 
 
 def _get_request_id():
@@ -38,3 +46,91 @@ class RequestIDMiddleware:
 
         response["X-Request-ID"] = request_id
         return response
+
+
+class RequestTimingMiddleware:
+    """Measure each request and report it as Server-Timing plus one log line.
+
+    Records wall time, DB query count/time (through an execute_wrapper on
+    every connection), the ``serialize``/``render``/``compress`` phases
+    tracked further down, and cache hits/misses. Goes right after
+    RequestIDMiddleware so log lines carry the request ID.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "SERVER_TIMING_HEADER", settings.DEBUG)
+
+    def __call__(self, request):
+        metrics = begin_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.db_wrapper))
+                response = self.get_response(request)
+            total = metrics.elapsed()
+        finally:
+            end_request()
+
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 2),
+            "db_queries": metrics.db_queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in metrics.timings.items()},
+            "cache_hits": metrics.counters.get("cache_hits", 0),
+            "cache_misses": metrics.counters.get("cache_misses", 0),
+        }
+        request_logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"request_metrics": fields},
+        )
+        self.record(request, response, total, metrics)
+
+        if self.server_timing:
+            response["Server-Timing"] = self.server_timing_header(total, metrics)
+        return response
+
+    @staticmethod
+    def process_view(request, view_func, view_args, view_kwargs):
+        # Lets the slow-query log say which view ran a query.
+        metrics = current_metrics()
+        if metrics is not None and request.resolver_match:
+            metrics.view_name = request.resolver_match.view_name
+
+    @staticmethod
+    def record(request, response, total, metrics):
+        """Feed the Prometheus counters behind /api/metrics/."""
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        prometheus.observe(
+            "rivals_http_request_duration_seconds",
+            total,
+            method=request.method,
+            route=route,
+            status=response.status_code,
+        )
+        prometheus.inc("rivals_db_queries_total", metrics.db_queries, route=route)
+        prometheus.inc("rivals_db_query_seconds_total", metrics.db_time, route=route)
+        for result, counter in (("hit", "cache_hits"), ("miss", "cache_misses")):
+            count = metrics.counters.get(counter, 0)
+            if count:
+                prometheus.inc("rivals_cache_requests_total", count, result=result)
+        prometheus.release()
+        prometheus.flush()
+
+    @staticmethod
+    def server_timing_header(total, metrics):
+        entries = [
+            f"total;dur={total * 1000:.2f}",
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.db_queries} queries"',
+        ]
+        entries += [
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in metrics.timings.items()
+        ]
+        hits = metrics.counters.get("cache_hits", 0)
+        misses = metrics.counters.get("cache_misses", 0)
+        entries.append(f'cache;desc="{hits} hits, {misses} misses"')
+        return ", ".join(entries)
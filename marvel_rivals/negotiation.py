@@ -0,0 +1,19 @@
+"""Content negotiation that leaves room for response-shape switches in ``?format=``."""
+
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.settings import api_settings
+
+# ``?format=`` values that pick a response shape rather than a renderer.
+RESPONSE_SHAPES = {"normalized"}
+
+
+class ShapeAwareContentNegotiation(DefaultContentNegotiation):
+    def filter_renderers(self, renderers, format):
+        if format in RESPONSE_SHAPES:
+            # Fall back to Accept-header negotiation; the view handles the shape.
+            return renderers
+        return super().filter_renderers(renderers, format)
+
+
+def wants_shape(request, shape):
+    return request.query_params.get(api_settings.URL_FORMAT_OVERRIDE) == shape
@@ -0,0 +1,282 @@
+"""Opt-in cProfile (and tracemalloc) capture for individual requests.
+
+``ProfilingMiddleware`` profiles a request when either
+
+* it carries an ``X-Profile`` header holding a token from
+  ``make_profile_token()`` (always profiled), or
+* it wins the ``sample_rate`` draw and comes from a staff user, by session
+  or by API token.
+
+The top-N functions by cumulative time (plus, with ``tracemalloc`` on, the
+top-N allocation sites) are written as ``<dir>/<request_id>.json``; the
+response returns the request ID as ``X-Profile-ID``. Admins read them back
+from ``/api/admin/profiles/`` and ``/api/admin/profiles/<request_id>/``.
+
+Profiles live in files rather than the cache because the default cache is
+per process: the worker serving the admin's lookup is rarely the one that
+profiled the request. ``dir`` (``PROFILING_DIR``) defaults to a directory
+under the system temp dir, which the workers on one host share; with
+several hosts, point it at storage they all mount. Only the newest ``keep``
+profiles, none older than ``ttl`` seconds, are kept.
+
+With ``PROFILING_ENABLED`` off the middleware removes itself at startup,
+so it costs nothing. Only one request per process is profiled at a time.
+
+Make a token (valid for ``token_max_age`` seconds):
+    python manage.py shell -c "from marvel_rivals.profiling import make_profile_token; print(make_profile_token())"
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+logger = logging.getLogger("marvel_rivals.profiling")
+
+DEFAULTS = {
+    "enabled": False,
+    "sample_rate": 0.0,
+    "top_n": 30,
+    "tracemalloc": False,
+    "keep": 100,
+    "ttl": 3600,
+    "token_max_age": 3600,
+    "dir": None,
+}
+
+TOKEN_SALT = "marvel_rivals.profiling"
+SUMMARY_FIELDS = ("request_id", "method", "path", "status", "captured_at", "total_ms")
+# X-Request-ID comes from the client, so only IDs that are safe file names
+# are used as such.
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+def profiling_options():
+    return {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+
+
+def make_profile_token():
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign("profile")
+
+
+def _valid_token(token, max_age):
+    try:
+        return signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age) == "profile"
+    except signing.BadSignature:
+        return False
+
+
+def profile_dir(options=None):
+    options = options or profiling_options()
+    return Path(options["dir"] or Path(tempfile.gettempdir()) / "rivals-profiles")
+
+
+def _profile_path(directory, request_id):
+    if not _SAFE_ID.fullmatch(request_id):
+        return None
+    return directory / f"{request_id}.json"
+
+
+def _stored(options):
+    """Profile files, newest first, without the expired ones."""
+    directory = profile_dir(options)
+    cutoff = time.time() - options["ttl"]
+    paths = []
+    for path in directory.glob("*.json"):
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue  # removed by another worker meanwhile
+        if mtime >= cutoff:
+            paths.append((mtime, path))
+    return [path for _mtime, path in sorted(paths, reverse=True)]
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_profile(record, options=None):
+    """Store ``record`` and prune what ``keep`` and ``ttl`` no longer allow."""
+    options = options or profiling_options()
+    directory = profile_dir(options)
+    path = _profile_path(directory, record["request_id"])
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(record, default=str))
+        os.replace(tmp, path)
+        kept = set(_stored(options)[: options["keep"]])
+        for old in directory.glob("*.json"):
+            if old not in kept:
+                old.unlink(missing_ok=True)
+    except OSError:
+        logger.warning("Could not write profile %s to %s", record["request_id"], directory)
+
+
+def read_profile(request_id, options=None):
+    options = options or profiling_options()
+    path = _profile_path(profile_dir(options), request_id)
+    try:
+        if path is None or path.stat().st_mtime < time.time() - options["ttl"]:
+            return None
+    except OSError:
+        return None
+    return _read(path)
+
+
+def list_profiles(options=None):
+    summaries = []
+    for path in _stored(options or profiling_options()):
+        record = _read(path)
+        if record is not None:
+            summaries.append({key: record.get(key) for key in SUMMARY_FIELDS})
+    return summaries
+
+
+def _function_rows(profiler, top_n):
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:top_n]
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "primitive_calls": primitive,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for (filename, line, name), (primitive, calls, tottime, cumtime, _callers) in rows
+    ]
+
+
+def _allocation_rows(before, after, top_n):
+    return [
+        {
+            "location": str(stat.traceback),
+            "size_kib": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        }
+        for stat in after.compare_to(before, "lineno")[:top_n]
+    ]
+
+
+def request_user(request):
+    """The session user, or else the API token's user.
+
+    API clients authenticate with a token, which DRF only resolves inside
+    the view, so ``request.user`` is anonymous for them at this point.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    try:
+        resolved = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return resolved[0] if resolved else None
+
+
+class ProfilingMiddleware:
+    """Profile selected requests; goes after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.options = profiling_options()
+        if not self.options["enabled"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.busy = threading.Lock()
+
+    def __call__(self, request):
+        if not self.wants_profile(request) or not self.busy.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request)
+        finally:
+            self.busy.release()
+
+    def wants_profile(self, request):
+        token = request.headers.get("X-Profile")
+        if token and _valid_token(token, self.options["token_max_age"]):
+            return True
+        if not self.options["sample_rate"] or random.random() >= self.options["sample_rate"]:
+            return False
+        user = request_user(request)
+        return bool(user and user.is_staff)
+
+    def profile(self, request):
+        import cProfile  # only once a request is actually profiled
+
+        options = self.options
+        trace_memory = options["tracemalloc"]
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot() if trace_memory else None
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            after = tracemalloc.take_snapshot() if trace_memory else None
+            if started_tracing:
+                tracemalloc.stop()
+
+        request_id = getattr(request, "request_id", None)
+        if not request_id or not _SAFE_ID.fullmatch(request_id):
+            request_id = f"{time.time_ns():x}"
+        user = getattr(request, "user", None)
+        record = {
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "user": user.get_username() if user and user.is_authenticated else None,
+            "captured_at": timezone.now().isoformat(),
+            "total_ms": round(elapsed * 1000, 2),
+            "functions": _function_rows(profiler, options["top_n"]),
+        }
+        if trace_memory:
+            record["allocations"] = _allocation_rows(before, after, options["top_n"])
+        write_profile(record, options)
+        response["X-Profile-ID"] = request_id
+        return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_list_view(request):
+    return Response(list_profiles())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_detail_view(request, request_id):
+    record = read_profile(request_id)
+    if record is None:
+        raise NotFound("No profile stored for this request ID.")
+    return Response(record)
@@ -0,0 +1,48 @@
+"""ujson-backed JSON renderer that emits the same bytes as DRF's JSONRenderer."""
+
+import re
+
+import ujson
+from rest_framework.renderers import JSONRenderer
+
+from .instrumentation import track
+
+# ujson writes small exponents as "1e-5" where the stdlib writes "1e-05".
+# Rare enough that re-encoding those payloads with the stdlib is cheaper
+# than scanning every float up front.
+_SHORT_EXPONENT = re.compile(rb"\de-\d(?!\d)")
+
+
+class UJSONRenderer(JSONRenderer):
+    """Compact JSON via ujson; anything ujson would encode differently
+    (indented output, dates, UUIDs, lazy strings...) goes through the
+    stdlib encoder instead.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with track("render"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = ujson.dumps(
+                data,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                allow_nan=not self.strict,
+            ).encode()
+        except (TypeError, ValueError, OverflowError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if _SHORT_EXPONENT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safety escaping as JSONRenderer.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -1,7 +1,6 @@
 from pathlib import Path
 import os
 import dj_database_url
-import cloudinary
 from dotenv import load_dotenv
 
 # -------------------------
@@ -62,6 +61,100 @@ ANON_THROTTLE_RATE = os.environ.get("DRF_ANON_THROTTLE", "60/hour")
 LOGIN_THROTTLE_RATE = os.environ.get("DRF_LOGIN_THROTTLE", "10/minute")
 REGISTER_THROTTLE_RATE = os.environ.get("DRF_REGISTER_THROTTLE", "5/hour")
 
+# -------------------------
+# Background executors
+# -------------------------
+# CPU-heavy work runs on small dedicated pools that cap how much of it runs
+# at once, so bursts can't take the CPU from read traffic. workers=0 runs
+# inline (tests).
+EXECUTORS = {
+    # Password hashing for login/register
+    "hashing": {
+        "workers": int(os.environ.get("AUTH_HASHING_WORKERS", "2")),
+        "max_queue": int(os.environ.get("AUTH_HASHING_QUEUE", "16")),
+    },
+    # Avatar resizing after upload
+    "media": {
+        "workers": int(os.environ.get("MEDIA_PROCESSING_WORKERS", "1")),
+        "max_queue": int(os.environ.get("MEDIA_PROCESSING_QUEUE", "64")),
+    },
+}
+
+AVATAR_VARIANT_FORMAT = os.environ.get("AVATAR_VARIANT_FORMAT", "WEBP").upper()
+
+# Per-request timings are always logged by the marvel_rivals.requests logger.
+# They are also sent as a Server-Timing header, which tells any client how
+# long queries took, only with DEBUG on or SERVER_TIMING_HEADER=1.
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "1" if DEBUG else "0").lower() in {"1", "true", "yes"}
+
+# API response compression: bodies under min_size go out as-is, streaming
+# responses are flushed per chunk, and compressed bodies are cached
+# in-process (cache_bytes) by content digest. Brotli needs the optional
+# "brotli" package.
+RESPONSE_COMPRESSION = {
+    "min_size": int(os.environ.get("COMPRESSION_MIN_SIZE", "1024")),
+    "gzip_level": int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6")),
+    "brotli": os.environ.get("COMPRESSION_BROTLI", "1").lower() in {"1", "true", "yes"},
+    "brotli_quality": int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5")),
+    "streaming": os.environ.get("COMPRESSION_STREAMING", "1").lower() in {"1", "true", "yes"},
+    "cache_bytes": int(os.environ.get("COMPRESSION_CACHE_BYTES", str(8 * 1024 * 1024))),
+}
+
+# /api/health/?deep=1 probes the DB, cache and channel layer; results are
+# cached per process for HEALTH_CACHE_SECONDS so polling can't become load.
+HEALTH_CHECK = {
+    "cache_seconds": float(os.environ.get("HEALTH_CACHE_SECONDS", "5")),
+    "timeout": float(os.environ.get("HEALTH_PROBE_TIMEOUT", "2")),
+}
+
+# ASGI workers warm up (URLconf, hero catalog, a few GETs
+# replayed through the app) on lifespan startup, or on the first request under
+# Daphne; /api/ready/ answers 503 until that is done.
+WARMUP = {
+    "enabled": os.environ.get("WARMUP_ENABLED", "1").lower() in {"1", "true", "yes"},
+    "paths": _split_csv_env("WARMUP_PATHS", "/api/heroes/,/api/heroes/tags/,/api/teams/"),
+}
+
+# Per-request cProfile capture, read back at /api/admin/profiles/. Off by
+# default, in which case the middleware drops out of the chain entirely.
+# Profiles are written to PROFILING_DIR (default: under the system temp dir),
+# which every worker that may serve /api/admin/profiles/ must share.
+PROFILING = {
+    "enabled": os.environ.get("PROFILING_ENABLED", "0").lower() in {"1", "true", "yes"},
+    "sample_rate": float(os.environ.get("PROFILING_SAMPLE_RATE", "0")),
+    "tracemalloc": os.environ.get("PROFILING_TRACEMALLOC", "0").lower() in {"1", "true", "yes"},
+    "top_n": int(os.environ.get("PROFILING_TOP_N", "30")),
+    "dir": os.environ.get("PROFILING_DIR") or None,
+}
+
+# Prometheus metrics at /api/metrics/. With several worker processes, point
+# METRICS_DIR at a directory they share (empty it on deploy) so any worker
+# can report totals for all of them. Scrapes need METRICS_TOKEN as a bearer
+# token or an admin user's credentials; with DEBUG on and no token, anyone.
+METRICS = {
+    "dir": os.environ.get("METRICS_DIR") or None,
+    "flush_interval": float(os.environ.get("METRICS_FLUSH_INTERVAL", "5")),
+    "token": os.environ.get("METRICS_TOKEN") or None,
+}
+
+# Queries slower than SLOW_QUERY_MS are logged on marvel_rivals.slow_queries
+# with request ID, view and SQL fingerprint (0 turns it off); a sample also get
+# their EXPLAIN plan. With SLOW_QUERY_LOG_DIR set, workers append JSON lines
+# there for `manage.py slow_query_report`.
+SLOW_QUERIES = {
+    "threshold_ms": float(os.environ.get("SLOW_QUERY_MS", "200")),
+    "explain_sample_rate": float(os.environ.get("SLOW_QUERY_EXPLAIN_RATE", "0.2")),
+    "log_dir": os.environ.get("SLOW_QUERY_LOG_DIR") or None,
+}
+
+# How often (seconds) each process re-reads the hero catalog version row, i.e.
+# how long a hero edit made in another worker can take to show up here.
+HERO_CATALOG_RECHECK_SECONDS = float(os.environ.get("HERO_CATALOG_RECHECK_SECONDS", "2"))
+
+# Team/hero/comment lists are built from .values() projections instead of
+# the DRF serializers (same output); set to 0 to fall back to serializers.
+FAST_READ_MODELS = os.environ.get("FAST_READ_MODELS", "1").lower() in {"1", "true", "yes"}
+
 # -------------------------
 # Applications
 # -------------------------
@@ -73,8 +166,8 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
 
-    # Cloudinary
-    "cloudinary",
+    # Cloudinary media storage. The SDK itself (and requests/urllib3 with it)
+    # is only imported when STORAGES["default"] is first used.
     "cloudinary_storage",
 
     # Third party
@@ -84,6 +177,7 @@ INSTALLED_APPS = [
     "rest_framework.authtoken",
 
     # Local apps
+    "marvel_rivals",
     "heroes",
     "teams",
     "accounts",
@@ -93,8 +187,12 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
 
-    # Request ID middleware
+    # Request ID, then per-request timings (Server-Timing + log line)
     "marvel_rivals.middleware.RequestIDMiddleware",
+    "marvel_rivals.middleware.RequestTimingMiddleware",
+
+    # gzip/brotli for API JSON (see RESPONSE_COMPRESSION)
+    "marvel_rivals.compression.CompressionMiddleware",
 
     # WhiteNoise for static on Render
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -105,6 +203,9 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+
+    # cProfile capture for sampled staff / signed X-Profile requests (PROFILING)
+    "marvel_rivals.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "marvel_rivals.urls"
@@ -143,6 +244,22 @@ if REDIS_URL and USE_REDIS_CHANNEL_LAYER:
 else:
     CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
 
+# -------------------------
+# Cache (throttle counters)
+# -------------------------
+USE_REDIS_CACHE = os.environ.get("USE_REDIS_CACHE", "0").lower() in {"1", "true", "yes"}
+
+if REDIS_URL and USE_REDIS_CACHE:
+    CACHES = {
+        "default": {
+            "BACKEND": "marvel_rivals.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    # Per-process stand-in for tests and local dev
+    CACHES = {"default": {"BACKEND": "marvel_rivals.cache.LocMemCache"}}
+
 # -------------------------
 # Database (DATABASE_URL)
 # -------------------------
@@ -169,9 +286,16 @@ else:
 # -------------------------
 # Cloudinary
 # -------------------------
-CLOUDINARY_URL = os.getenv("CLOUDINARY_URL")
-if CLOUDINARY_URL:
-    cloudinary.config(cloudinary_url=CLOUDINARY_URL, secure=True)
+# The SDK reads CLOUDINARY_URL from the environment when cloudinary_storage
+# first imports it, and cloudinary_storage switches on secure URLs; nothing is
+# configured here so worker start-up doesn't pay for the import.
+CLOUDINARY_STORAGE = {"SECURE": True}
+
+# -------------------------
+# Authentication
+# -------------------------
+# ModelBackend, with password checks on the bounded "hashing" executor.
+AUTHENTICATION_BACKENDS = ["accounts.hashing.PooledModelBackend"]
 
 # -------------------------
 # Password validation
@@ -234,12 +358,17 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
     ],
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": "marvel_rivals.negotiation.ShapeAwareContentNegotiation",
+    "DEFAULT_RENDERER_CLASSES": [
+        "marvel_rivals.renderers.UJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 50,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.ScopedRateThrottle",
+        "marvel_rivals.throttling.UserRateThrottle",
+        "marvel_rivals.throttling.AnonRateThrottle",
+        "marvel_rivals.throttling.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": USER_THROTTLE_RATE,
@@ -281,5 +410,6 @@ LOGGING = {
         "accounts": {"handlers": ["console"], "level": LOG_LEVEL, "propagate": False},
         "teams": {"handlers": ["console"], "level": LOG_LEVEL, "propagate": False},
         "heroes": {"handlers": ["console"], "level": LOG_LEVEL, "propagate": False},
+        "marvel_rivals": {"handlers": ["console"], "level": LOG_LEVEL, "propagate": False},
     },
 }
@@ -0,0 +1,238 @@
+"""Slow-query log with request correlation and EXPLAIN capture.
+
+Every database connection gets an execute wrapper (installed on
+``connection_created``) that times each query. Queries slower than
+``threshold_ms`` are logged on ``marvel_rivals.slow_queries`` with the
+request ID, the view that ran them and a fingerprint: the SQL with literals
+and ``IN`` lists collapsed, so ``WHERE id = 3`` and ``WHERE id = 7`` count as
+the same query. A sample of slow SELECTs also get their plan captured
+(``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on Postgres), at most once per
+fingerprint every ``explain_interval`` seconds in each process.
+
+With ``log_dir`` set, each process also appends one JSON line per slow query
+to ``<log_dir>/slow-queries-<pid>.jsonl``; ``manage.py slow_query_report``
+aggregates those files per fingerprint.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import metrics
+from .instrumentation import current_metrics
+from .middleware import _get_request_id
+
+logger = logging.getLogger("marvel_rivals.slow_queries")
+
+DEFAULTS = {
+    "threshold_ms": 200.0,
+    "explain_sample_rate": 0.2,
+    "explain_interval": 300,
+    "log_dir": None,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_local = threading.local()
+_explained = {}  # fingerprint -> monotonic time of the last EXPLAIN
+_file_lock = threading.Lock()
+
+
+def slow_query_options():
+    return {**DEFAULTS, **getattr(settings, "SLOW_QUERIES", {})}
+
+
+def normalize(sql):
+    """SQL with literals replaced by ``?`` and value lists by ``(...)``."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()[:12]
+
+
+def explain(connection, sql, params):
+    """The query plan for ``sql`` as a list of lines, or None if it can't be had."""
+    if connection.vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif connection.vendor == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return None
+    if connection.needs_rollback:
+        return None
+
+    # Inside a transaction a failed EXPLAIN would poison it on Postgres.
+    savepoint = connection.savepoint() if connection.in_atomic_block else None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except Exception:
+        if savepoint:
+            connection.savepoint_rollback(savepoint)
+        return None
+    if savepoint:
+        connection.savepoint_commit(savepoint)
+    # SQLite: (id, parent, notused, detail); Postgres: (line,)
+    return [str(row[-1]) for row in rows]
+
+
+def _wants_explain(sql, fp, options):
+    if not sql.lstrip()[:6].upper() == "SELECT":
+        return False
+    if random.random() >= options["explain_sample_rate"]:
+        return False
+    now = time.monotonic()
+    if now - _explained.get(fp, float("-inf")) < options["explain_interval"]:
+        return False
+    _explained[fp] = now
+    return True
+
+
+def _write(record, log_dir):
+    path = Path(log_dir) / f"slow-queries-{os.getpid()}.jsonl"
+    line = json.dumps(record, default=str) + "\n"
+    try:
+        with _file_lock, path.open("a") as handle:
+            handle.write(line)
+    except OSError:
+        logger.warning("Could not append to %s", path)
+
+
+def record(connection, sql, params, many, duration, options):
+    fp = fingerprint(sql)
+    request_metrics = current_metrics()
+    view = getattr(request_metrics, "view_name", None) or "-"
+    entry = {
+        "at": timezone.now().isoformat(),
+        "request_id": _get_request_id(),
+        "view": view,
+        "database": connection.alias,
+        "fingerprint": fp,
+        "duration_ms": round(duration * 1000, 2),
+        "many": many,
+        "sql": normalize(sql),
+    }
+    if not many and _wants_explain(sql, fp, options):
+        entry["plan"] = explain(connection, sql, params)
+
+    logger.warning(
+        "slow query %sms fingerprint=%s view=%s: %s",
+        entry["duration_ms"], fp, view, entry["sql"][:500],
+        extra={"slow_query": entry},
+    )
+    metrics.inc("rivals_slow_queries_total", route=view)
+    if options["log_dir"]:
+        _write(entry, options["log_dir"])
+
+
+class SlowQueryWrapper:
+    """``connection.execute_wrapper`` hook timing every query on one connection."""
+
+    def __init__(self, connection, options):
+        self.connection = connection
+        self.options = options
+        self.threshold = options["threshold_ms"] / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, "active", False):
+            # The EXPLAIN (and its savepoint) issued from record().
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            _local.active = True
+            try:
+                record(self.connection, sql, params, many, duration, self.options)
+            except Exception:
+                logger.exception("Failed to record a slow query")
+            finally:
+                _local.active = False
+        return result
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver; a threshold of 0 turns the log off."""
+    options = slow_query_options()
+    if options["threshold_ms"] <= 0:
+        return
+    if any(isinstance(wrapper, SlowQueryWrapper) for wrapper in connection.execute_wrappers):
+        return
+    # Outermost, and below any execute_wrapper() block already open (they pop
+    # from the end when they exit).
+    connection.execute_wrappers.insert(0, SlowQueryWrapper(connection, options))
+
+
+# -- report ------------------------------------------------------------------
+
+def load_entries(log_dir, since=None):
+    """Slow-query records from every process's file, oldest file first."""
+    entries = []
+    for path in sorted(Path(log_dir).glob("slow-queries-*.jsonl"), key=lambda p: p.stat().st_mtime):
+        with path.open() as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if since is None or entry["at"] >= since:
+                    entries.append(entry)
+    return entries
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def aggregate(entries):
+    """Per-fingerprint totals, slowest overall first."""
+    groups = {}
+    for entry in sorted(entries, key=lambda e: e["at"]):
+        group = groups.setdefault(entry["fingerprint"], {
+            "fingerprint": entry["fingerprint"],
+            "sql": entry["sql"],
+            "durations": [],
+            "views": {},
+            "plan": None,
+            "last_seen": None,
+            "last_request_id": None,
+        })
+        group["durations"].append(entry["duration_ms"])
+        group["views"][entry["view"]] = group["views"].get(entry["view"], 0) + 1
+        group["last_seen"] = entry["at"]
+        group["last_request_id"] = entry["request_id"]
+        if entry.get("plan"):
+            group["plan"] = entry["plan"]
+
+    rows = []
+    for group in groups.values():
+        durations = sorted(group.pop("durations"))
+        total = sum(durations)
+        rows.append({
+            **group,
+            "count": len(durations),
+            "total_ms": round(total, 2),
+            "mean_ms": round(total / len(durations), 2),
+            "p95_ms": _percentile(durations, 0.95),
+            "max_ms": durations[-1],
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
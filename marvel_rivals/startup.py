@@ -0,0 +1,149 @@
+"""Cold-start profile of a worker process.
+
+Each run starts a fresh interpreter that goes through what a worker does
+before serving its first request, timing every phase:
+
+* ``settings``  importing the settings module
+* ``setup``     ``django.setup()``: app configs, models, ``ready()`` hooks
+* ``app``       importing the WSGI/ASGI module and building ``application``
+* ``urls``      importing the URLconf (views, serializers), which Django
+                otherwise does on the first request
+
+One extra run under ``python -X importtime`` attributes the time to modules:
+the imports each phase (and interpreter start-up, ``site`` and ``.pth``
+hooks included) triggered directly, and self time summed per top-level
+package, which is where a heavy dependency shows up.
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+PHASES = ("settings", "setup", "app", "urls")
+MARKER = "startup-phase:"
+
+# Runs in the child; prints phase end times (seconds since start) as JSON.
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+marks = {}
+sys.stderr.write("%(marker)s interpreter\\n")
+
+def mark(phase):
+    marks[phase] = time.perf_counter() - start
+    sys.stderr.write("%(marker)s " + phase + "\\n")
+    sys.stderr.flush()
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", %(settings)r)
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+mark("settings")
+django.setup()
+mark("setup")
+__import__(%(app)r, fromlist=["application"]).application
+mark("app")
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark("urls")
+print(json.dumps(marks))
+"""
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def _child_source(interface):
+    return CHILD % {
+        "marker": MARKER,
+        "settings": os.environ.get("DJANGO_SETTINGS_MODULE", "marvel_rivals.settings"),
+        "app": f"marvel_rivals.{interface}",
+    }
+
+
+def _run_child(interface, importtime=False):
+    args = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", _child_source(interface)]
+    started = time.perf_counter()
+    proc = subprocess.run(args, cwd=settings.BASE_DIR, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode:
+        raise RuntimeError(f"startup run failed:\n{proc.stderr[-2000:]}")
+    return wall, json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def _row(module, own, cumulative, children=()):
+    return {
+        "module": module,
+        "self_ms": round(own / 1000, 1),
+        "cumulative_ms": round(cumulative / 1000, 1),
+        "children": sorted(children, key=lambda row: row["cumulative_ms"], reverse=True),
+    }
+
+
+def parse_importtime(stderr):
+    """Per phase, the imports it triggered directly with their own direct
+    imports as ``children``; plus self time (µs) per top-level package."""
+    phases = {phase: [] for phase in ("interpreter", *PHASES)}
+    packages = {}
+    pending, children = [], []
+    for line in stderr.splitlines():
+        if line.startswith(MARKER):
+            # importtime prints a module after its children, so the lines
+            # seen since the last marker all belong to the phase just ended.
+            phases[line[len(MARKER):].strip()] = pending
+            pending, children = [], []
+            continue
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, indent, module = match.groups()
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(own)
+        if indent == "":
+            pending.append(_row(module, int(own), int(cumulative), children))
+            children = []
+        elif indent == "  ":
+            children.append(_row(module, int(own), int(cumulative)))
+    return phases, packages
+
+
+def profile_startup(interface="asgi", runs=5):
+    """Median phase times over ``runs`` cold starts, plus one importtime breakdown."""
+    walls, samples = [], []
+    for _ in range(runs):
+        wall, marks, _stderr = _run_child(interface)
+        walls.append(wall)
+        samples.append(marks)
+
+    phase_ms = {}
+    previous = [0.0] * runs
+    for phase in PHASES:
+        durations = [sample[phase] - before for sample, before in zip(samples, previous)]
+        phase_ms[phase] = round(statistics.median(durations) * 1000, 1)
+        previous = [sample[phase] for sample in samples]
+    in_process = statistics.median(sample[PHASES[-1]] for sample in samples)
+
+    _wall, _marks, stderr = _run_child(interface, importtime=True)
+    imports, packages = parse_importtime(stderr)
+    return {
+        "interface": interface,
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        # Interpreter start and exit: the wall time the phases don't cover.
+        "interpreter_ms": round((statistics.median(walls) - in_process) * 1000, 1),
+        "phases_ms": phase_ms,
+        "imports": {
+            phase: sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)
+            for phase, rows in imports.items()
+        },
+        "packages_ms": {
+            package: round(own / 1000, 1)
+            for package, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        },
+    }
@@ -0,0 +1,129 @@
+"""Shared fixtures for the per-endpoint query/latency budget tests."""
+
+import logging
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import Profile
+from heroes.index import bump_catalog_version
+from heroes.models import Hero
+from teams.models import Team
+from teams.synthetic import generate
+
+ROLES = ["VANGUARD", "DUELIST", "STRATEGIST"]
+
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def seed_dataset(heroes=30, users=40, teams=60, votes=300, comments=40, seed=42):
+    """A small but realistically shaped dataset: linked heroes, users with and
+    without avatars, and ``teams.synthetic`` teams with skewed votes and comments.
+    """
+    rng = random.Random(seed)
+
+    hero_objs = Hero.objects.bulk_create(
+        Hero(
+            name=f"Budget Hero {i}",
+            role=ROLES[i % 3],
+            difficulty=1 + i % 3,
+            description="Hero description " * 8,
+            playstyle_tags=rng.sample(["dive", "burst", "poke", "sustain", "brawl"], 2),
+            image=f"heroes/budget_{i}.png",
+        )
+        for i in range(heroes)
+    )
+    for hero in hero_objs:
+        others = [other for other in hero_objs if other != hero]
+        hero.synergies.add(*rng.sample(others, 3))
+        hero.counters.add(*rng.sample(others, 2))
+
+    ranked_team_ids = generate(
+        users=users, teams=teams, votes=votes, comments=comments,
+        seed=seed, prefix="budget", batch_size=500,
+    )
+    user_objs = list(User.objects.filter(username__startswith="budget-").order_by("pk"))
+    Profile.objects.filter(user__in=user_objs[1::2]).update(avatar="avatars/budget.png")
+    teams_by_id = Team.objects.in_bulk(ranked_team_ids)
+    # Most popular first: teams[0] has the most votes and the longest thread.
+    team_objs = [teams_by_id[team_id] for team_id in ranked_team_ids]
+    return {"heroes": hero_objs, "users": user_objs, "teams": team_objs}
+
+
+class QuietRequestLogMixin:
+    """Raise ``marvel_rivals.requests`` to WARNING for the class, keeping the
+    one-line-per-request log out of the test output.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        logger = logging.getLogger("marvel_rivals.requests")
+        cls.addClassCleanup(logger.setLevel, logger.level)
+        logger.setLevel(logging.WARNING)
+        super().setUpClass()
+
+
+class EndpointBudgetMixin(QuietRequestLogMixin):
+    """``assertWithinBudget`` runs a request warm and checks its query count
+    and median latency. Latency bounds are generous on purpose: they catch
+    order-of-magnitude regressions, not noise.
+    """
+
+    latency_runs = 3
+
+    @classmethod
+    def setUpClass(cls):
+        cls.enterClassContext(
+            override_settings(
+                SECURE_SSL_REDIRECT=False,
+                STORAGES=TEST_STORAGES,
+                MEDIA_URL="/media/",
+                # Keep the catalog version read out of the measured queries.
+                HERO_CATALOG_RECHECK_SECONDS=3600,
+            )
+        )
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        bump_catalog_version()
+
+    def assertWithinBudget(self, path, max_queries, max_ms, method="get", user=None, **extra):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        send = getattr(client, method)
+
+        # Warm per-process caches (hero catalog, throttle counters).
+        response = send(path, **extra)
+        self.assertLess(response.status_code, 400, response.content[:500])
+
+        with CaptureQueriesContext(connection) as queries:
+            send(path, **extra)
+        self.assertLessEqual(
+            len(queries),
+            max_queries,
+            f"{method.upper()} {path} ran {len(queries)} queries (budget {max_queries}):\n"
+            + "\n".join(query["sql"][:200] for query in queries.captured_queries),
+        )
+
+        timings = []
+        for _ in range(self.latency_runs):
+            start = time.perf_counter()
+            send(path, **extra)
+            timings.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(timings)
+        self.assertLessEqual(
+            median, max_ms, f"{method.upper()} {path} took {median:.1f} ms (budget {max_ms} ms)"
+        )
@@ -0,0 +1,556 @@
+import asyncio
+import bisect
+import gzip
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from marvel_rivals import compression, health, instrumentation, metrics, warmup
+# Imported up front: get_asgi_application() re-runs django.setup(), which
+# would reset logger levels set by QuietRequestLogMixin mid-test.
+from marvel_rivals.asgi import django_asgi_app
+from marvel_rivals.benchmark import _percentile, compare
+from marvel_rivals.cache import RedisCache
+from marvel_rivals.compression import CompressedBodyCache, CompressionMiddleware, choose_encoding
+from marvel_rivals.profiling import (
+    TOKEN_SALT,
+    ProfilingMiddleware,
+    _valid_token,
+    list_profiles,
+    make_profile_token,
+    write_profile,
+)
+from marvel_rivals.slow_queries import aggregate, fingerprint, normalize
+from marvel_rivals.testing import QuietRequestLogMixin
+from marvel_rivals.throttling import AnonRateThrottle
+from marvel_rivals.warmup import WarmUpApp, replay
+
+
+def _asgi_get(app, path, times=1):
+    async def drive():
+        return [await replay(app, path) for _ in range(times)]
+
+    return asyncio.run(drive())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ServerTimingTests(QuietRequestLogMixin, SimpleTestCase):
+    def test_header_is_opt_in(self):
+        self.assertNotIn("Server-Timing", APIClient().get("/api/health/"))
+        with override_settings(SERVER_TIMING_HEADER=True):
+            self.assertIn("total;dur=", APIClient().get("/api/health/")["Server-Timing"])
+
+
+class MetricsShardTests(QuietRequestLogMixin, SimpleTestCase):
+    def test_asgi_request_threads_do_not_pile_up_shards(self):
+        def health_requests():
+            return sum(
+                row[-1]
+                for (name, labels), row in metrics.snapshot()[1].items()
+                if name == "rivals_http_request_duration_seconds"
+                and dict(labels)["route"].endswith("health_view")
+            )
+
+        before = health_requests()
+        statuses = _asgi_get(django_asgi_app, "/api/health/", times=200)
+        self.assertEqual(set(statuses), {200})
+
+        # Each request ran on a thread of its own; released shards wait for
+        # at most one backlog before being folded into the retired totals,
+        # and a scrape folds the rest without losing anything.
+        self.assertLessEqual(len(metrics._shards), metrics._FOLD_BACKLOG + 5)
+        self.assertEqual(health_requests() - before, 200)
+        self.assertLessEqual(len(metrics._shards), 5)
+
+
+class BenchmarkComparisonTests(SimpleTestCase):
+    def test_percentile_is_nearest_rank(self):
+        hundred = list(range(1, 101))
+        self.assertEqual([_percentile(hundred, q) for q in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(_percentile([10, 20, 30, 40, 50], 50), 30)
+        self.assertEqual(_percentile([10, 20, 30, 40, 50], 1), 10)
+        self.assertEqual(_percentile([7], 99), 7)
+        self.assertEqual(_percentile([], 50), 0.0)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = {
+            "overall": {"p95_ms": 10.0, "throughput_rps": 100.0, "queries": 4.0},
+            "scenarios": {"browse": {"p95_ms": 8.0, "queries": 0}},
+        }
+        current = {
+            "overall": {"p95_ms": 12.4, "throughput_rps": 70.0, "queries": 4.0},
+            "scenarios": {
+                "browse": {"p95_ms": 11.0, "queries": 1},
+                "vote": {"p95_ms": 50.0},  # not in the baseline: nothing to compare
+            },
+        }
+        rows = {(scope, metric): (change, regressed) for scope, metric, _old, _new, change, regressed in compare(current, baseline)}
+        self.assertEqual(set(rows), {
+            ("overall", "p95_ms"), ("overall", "throughput_rps"), ("overall", "queries"),
+            ("browse", "p95_ms"), ("browse", "queries"),
+        })
+        self.assertFalse(rows[("overall", "p95_ms")][-1])  # +24% within 25%
+        self.assertTrue(rows[("overall", "throughput_rps")][-1])  # -30% on a higher-is-better metric
+        self.assertFalse(rows[("overall", "queries")][-1])
+        self.assertTrue(rows[("browse", "p95_ms")][-1])
+        self.assertEqual(rows[("browse", "queries")], (float("inf"), True))  # up from zero
+
+        relaxed = compare(current, baseline, tolerances={"p95_ms": 0.5})
+        self.assertFalse(next(row[-1] for row in relaxed if row[:2] == ("browse", "p95_ms")))
+
+
+class MetricsExpositionTests(SimpleTestCase):
+    def test_render(self):
+        row = [0] * (len(metrics.DURATION_BUCKETS) + 3)
+        for value in (0.003, 0.2, 20.0):
+            row[bisect.bisect_left(metrics.DURATION_BUCKETS, value)] += 1
+            row[-2] += value
+            row[-1] += 1
+
+        text = metrics.render(
+            {
+                ("rivals_db_queries_total", (("route", "teams.list"),)): 3,
+                ("rivals_dependency_latency_seconds", (("dependency", "database"),)): 0.5,
+                ("custom_thing", ()): 1,
+            },
+            {("rivals_http_request_duration_seconds", (("route", 'say "hi"\n'),)): row},
+        )
+        lines = text.splitlines()
+        self.assertTrue(text.endswith("\n"))
+        self.assertIn("# TYPE rivals_db_queries_total counter", lines)
+        self.assertIn('rivals_db_queries_total{route="teams.list"} 3', lines)
+        self.assertIn('rivals_dependency_latency_seconds{dependency="database"} 0.5', lines)
+        self.assertIn("# TYPE custom_thing untyped", lines)
+        self.assertIn("custom_thing 1", lines)
+
+        route = 'route="say \\"hi\\"\\n"'
+        buckets = [line for line in lines if line.startswith("rivals_http_request_duration_seconds_bucket")]
+        self.assertEqual(len(buckets), len(metrics.DURATION_BUCKETS) + 1)
+        self.assertEqual(buckets[0], f'rivals_http_request_duration_seconds_bucket{{{route},le="0.005"}} 1')
+        self.assertEqual(buckets[5], f'rivals_http_request_duration_seconds_bucket{{{route},le="0.25"}} 2')
+        self.assertEqual(buckets[-2], f'rivals_http_request_duration_seconds_bucket{{{route},le="10.0"}} 2')
+        self.assertEqual(buckets[-1], f'rivals_http_request_duration_seconds_bucket{{{route},le="+Inf"}} 3')
+        self.assertIn(f"rivals_http_request_duration_seconds_count{{{route}}} 3", lines)
+        self.assertIn(f"rivals_http_request_duration_seconds_sum{{{route}}} {sum((0.003, 0.2, 20.0))!r}", lines)
+
+    def test_merged_snapshot_drops_gauges_of_dead_workers(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS={"dir": directory}))
+        counter = ("rivals_db_queries_total", (("route", "merge-test"),))
+        gauge = ("rivals_websocket_connections", ())
+        histogram = ("rivals_http_request_duration_seconds", (("route", "merge-test"),))
+        row = [1] + [0] * (len(metrics.DURATION_BUCKETS) + 1) + [0.001, 1]
+
+        dead = 2 ** 22 + 1
+        while metrics._alive(dead):
+            dead += 1
+        for pid in (os.getppid(), dead):
+            with open(os.path.join(directory, f"{pid}-1.json"), "w") as handle:
+                json.dump({
+                    "pid": pid,
+                    "values": [[name, list(labels), value] for name, labels, value in ((*counter, 5), (*gauge, 3))],
+                    "histograms": [[*histogram, row]],
+                }, handle)
+
+        own_values, own_histograms = metrics.snapshot()
+        values, histograms = metrics.merged_snapshot()
+        self.assertEqual(values[counter] - own_values.get(counter, 0), 10)
+        self.assertEqual(values[gauge] - own_values.get(gauge, 0), 3)  # the live worker's only
+        self.assertEqual(histograms[histogram][-1] - own_histograms.get(histogram, [0])[-1], 2)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, METRICS={})
+class MetricsAccessTests(QuietRequestLogMixin, TestCase):
+    def scrape(self, **headers):
+        return APIClient().get("/api/metrics/", **headers).status_code
+
+    def token_header(self, **user_fields):
+        user = User.objects.create_user(f"scraper-{User.objects.count()}", **user_fields)
+        return {"HTTP_AUTHORIZATION": f"Token {Token.objects.create(user=user).key}"}
+
+    def test_admins_only_without_a_token(self):
+        self.assertEqual(self.scrape(), 401)
+        self.assertEqual(self.scrape(**self.token_header()), 401)
+        self.assertEqual(self.scrape(**self.token_header(is_staff=True)), 200)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.scrape(), 200)
+
+    def test_bearer_token(self):
+        with override_settings(METRICS={"token": "s3cret"}):
+            self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer s3cret"), 200)
+            self.assertEqual(self.scrape(HTTP_AUTHORIZATION="Bearer wrong"), 401)
+            self.assertEqual(self.scrape(**self.token_header(is_staff=True)), 200)
+            with override_settings(DEBUG=True):
+                self.assertEqual(self.scrape(), 401)  # a set token is required even in DEBUG
+
+
+@override_settings(RESPONSE_COMPRESSION={"min_size": 200, "brotli": False, "cache_bytes": 1 << 20})
+class CompressionTests(SimpleTestCase):
+    body = json.dumps([{"id": i, "name": f"Hero {i}", "role": "DUELIST"} for i in range(50)]).encode()
+
+    def compress(self, response, accept="gzip, deflate, br", path="/api/heroes/", middleware=None):
+        middleware = middleware or CompressionMiddleware(lambda request: None)
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept)
+        return middleware.process_response(request, response)
+
+    def json_response(self, body=None, **headers):
+        response = HttpResponse(self.body if body is None else body, content_type="application/json")
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def test_choose_encoding(self):
+        self.assertEqual(choose_encoding("gzip, deflate, br", use_brotli=False), "gzip")
+        self.assertIsNone(choose_encoding("gzip;q=0, deflate"))
+        self.assertIsNone(choose_encoding("*;q=0.5, gzip;q=0", use_brotli=False))
+        self.assertEqual(choose_encoding("*", use_brotli=False), "gzip")
+        self.assertIsNone(choose_encoding("identity"))
+        self.assertIsNone(choose_encoding("gzip;q=bogus"))
+        with mock.patch.object(compression, "brotli", object()):
+            self.assertEqual(choose_encoding("gzip, br"), "br")
+            self.assertEqual(choose_encoding("br;q=0.5, gzip"), "gzip")
+            self.assertEqual(choose_encoding("br, gzip", use_brotli=False), "gzip")
+            self.assertEqual(choose_encoding("*"), "br")
+
+    def test_small_bodies_and_other_paths_pass_through(self):
+        for response in (
+            self.compress(self.json_response(b'{"ok": true}')),
+            self.compress(self.json_response(), path="/admin/"),
+            self.compress(HttpResponse(self.body, content_type="text/html")),
+            self.compress(self.json_response(), accept="identity"),
+        ):
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_compressed_response_headers(self):
+        response = self.compress(self.json_response(ETag='"v1"'))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["ETag"], 'W/"v1"')
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_incompressible_body_is_sent_as_is(self):
+        noise = os.urandom(2000)
+        response = self.compress(self.json_response(noise, ETag='"v1"'))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual((response.content, response["ETag"]), (noise, '"v1"'))
+
+    def test_streaming_round_trips(self):
+        chunks = [self.body[i:i + 300] for i in range(0, len(self.body), 300)]
+
+        response = self.compress(StreamingHttpResponse(iter(chunks), content_type="application/json"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.body)
+
+        async def agen():
+            for chunk in chunks:
+                yield chunk
+
+        async def collect(response):
+            return [chunk async for chunk in response.streaming_content]
+
+        response = self.compress(StreamingHttpResponse(agen(), content_type="application/json"))
+        parts = asyncio.run(collect(response))
+        # Flushed per chunk, so every input chunk produced output of its own.
+        self.assertGreater(len(parts), len(chunks))
+        self.assertEqual(gzip.decompress(b"".join(parts)), self.body)
+
+    def test_body_cache(self):
+        middleware = CompressionMiddleware(lambda request: None)
+        for _ in range(2):
+            response = self.compress(self.json_response(), middleware=middleware)
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(middleware.cache.stats()["hits"], 1)
+
+        for cache_control in ("private, max-age=60", "no-store"):
+            self.compress(self.json_response(**{"Cache-Control": cache_control}), middleware=middleware)
+        self.assertEqual((middleware.cache.stats()["hits"], middleware.cache.stats()["misses"]), (1, 1))
+
+    def test_body_cache_evicts_least_recently_used(self):
+        options = {**compression.DEFAULTS, "gzip_level": 6}
+        first, second = self.body, self.body.replace(b"Hero", b"Team")
+        size = len(compression.compress_body(first, "gzip", options))
+        cache = CompressedBodyCache(max_bytes=size + 10)
+        cache.get_or_compress(first, "gzip", options)
+        cache.get_or_compress(second, "gzip", options)
+        self.assertEqual(cache.stats()["entries"], 1)
+        cache.get_or_compress(second, "gzip", options)
+        cache.get_or_compress(first, "gzip", options)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 3))
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    class Throttle(AnonRateThrottle):
+        rate = "4/min"
+
+    def setUp(self):
+        cache.clear()
+        self.now = 0.0
+        self.request = SimpleNamespace(user=AnonymousUser(), META={"REMOTE_ADDR": "203.0.113.9"})
+
+    def attempt(self):
+        throttle = self.Throttle()
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_limits_within_a_window_without_charging_rejections(self):
+        self.assertEqual([self.attempt()[0] for _ in range(4)], [True] * 4)
+        allowed, throttle = self.attempt()
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.current, 4)
+        self.assertEqual(cache.get(f"{throttle.key}:0"), 4)  # the rejection was given back
+        self.assertEqual(throttle.wait(), 60)  # the window itself is full
+
+    def test_previous_window_decays_across_rollover(self):
+        for _ in range(4):
+            self.attempt()
+
+        self.now = 90.0  # halfway through window 1: the previous 4 weigh 2
+        allowed, throttle = self.attempt()
+        self.assertTrue(allowed)
+        self.assertEqual((throttle.previous, throttle.elapsed), (4, 0.5))
+        self.assertEqual(throttle._estimate(throttle.current), 3)
+        self.assertTrue(self.attempt()[0])
+        allowed, throttle = self.attempt()
+        self.assertFalse(allowed)
+        # 2 + 3 admitted would be 5; 15s more of decay makes room for one.
+        self.assertEqual(throttle.wait(), 15)
+
+        self.now = 180.0  # window 3: window 1 is two windows back
+        self.assertEqual([self.attempt()[0] for _ in range(5)], [True] * 4 + [False])
+
+    def test_throttle_lookups_are_not_counted_as_cache_misses(self):
+        request_metrics = instrumentation.begin_request()
+        self.addCleanup(instrumentation.end_request)
+        self.attempt()
+        self.now = 90.0
+        self.attempt()
+        self.assertNotIn("cache_misses", request_metrics.counters)
+        self.assertNotIn("cache_hits", request_metrics.counters)
+
+    def test_redis_counts_use_one_pipeline(self):
+        backend = RedisCache("redis://localhost:6379/0", {})
+        client = mock.MagicMock()
+        client.pipeline.return_value.execute.return_value = [3, True, b"7"]
+        with mock.patch.object(type(backend._cache), "get_client", return_value=client):
+            self.assertEqual(backend.window_counts("t:1", "t:0", 120), (3, 7))
+            backend.window_release("t:1")
+        pipe = client.pipeline.return_value
+        self.assertEqual(
+            [call[0] for call in pipe.method_calls],
+            ["incr", "expire", "get", "execute"],
+        )
+        self.assertEqual(pipe.expire.call_args.args[1], 120)
+        client.decr.assert_called_once_with(backend.make_key("t:1"))
+
+
+class ChannelLayerProbeTests(SimpleTestCase):
+    def test_whole_loopback_is_bounded_by_the_timeout(self):
+        class HangingLayer:
+            async def new_channel(self):
+                await asyncio.sleep(60)
+
+        start = time.perf_counter()
+        with mock.patch.object(health, "get_channel_layer", return_value=HangingLayer()):
+            result = health._timed("channel_layer", lambda: health.probe_channel_layer(0.05), {"channel_layer": 100})
+        self.assertEqual(result["status"], "fail")
+        self.assertIn("TimeoutError", result["error"])
+        self.assertLess(time.perf_counter() - start, 1)
+
+
+class ReadinessTests(QuietRequestLogMixin, TransactionTestCase):
+    """/api/ready/ holds traffic off until the worker has warmed up."""
+
+    def setUp(self):
+        patcher = mock.patch.object(warmup, "state", warmup._State())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.app = WarmUpApp(django_asgi_app)
+
+    def assertWarmedUp(self):
+        self.assertEqual(warmup.state.status, "ready")
+        self.assertEqual(
+            [step["name"] for step in warmup.state.steps],
+            ["urlconf", "hero_catalog", *(f"GET {path}" for path in warmup.DEFAULTS["paths"])],
+        )
+        self.assertTrue(all(step["ok"] for step in warmup.state.steps), warmup.state.steps)
+
+    def test_first_request_starts_warm_up_without_lifespan(self):
+        self.assertTrue(warmup.is_ready())  # idle: nothing started warming up yet
+
+        async def drive():
+            cold = await replay(self.app, "/api/ready/")
+            await self.app.task
+            return cold, await replay(self.app, "/api/ready/")
+
+        self.assertEqual(asyncio.run(drive()), (503, 200))
+        self.assertWarmedUp()
+
+    def test_lifespan_startup_starts_warm_up(self):
+        async def drive():
+            messages = asyncio.Queue()
+            sent = []
+
+            async def send(message):
+                sent.append(message["type"])
+
+            await messages.put({"type": "lifespan.startup"})
+            lifespan = asyncio.create_task(self.app({"type": "lifespan"}, messages.get, send))
+            while not sent:
+                await asyncio.sleep(0)
+            cold = await replay(self.app, "/api/ready/")
+            await self.app.task
+            warm = await replay(self.app, "/api/ready/")
+            await messages.put({"type": "lifespan.shutdown"})
+            await lifespan
+            return cold, warm, sent
+
+        self.assertEqual(
+            asyncio.run(drive()),
+            (503, 200, ["lifespan.startup.complete", "lifespan.shutdown.complete"]),
+        )
+        self.assertWarmedUp()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProfilingTests(QuietRequestLogMixin, TestCase):
+    def setUp(self):
+        self.dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(PROFILING={"enabled": True, "dir": self.dir}))
+        self.admin = User.objects.create_user("profiler", is_staff=True)
+        self.client = APIClient()
+
+    def profiled_get(self, path, **headers):
+        return self.client.get(path, HTTP_X_PROFILE=make_profile_token(), **headers)
+
+    def test_token_validation(self):
+        token = make_profile_token()
+        self.assertTrue(_valid_token(token, max_age=60))
+        self.assertFalse(_valid_token(token + "x", max_age=60))
+        self.assertFalse(_valid_token(signing.TimestampSigner(salt=TOKEN_SALT).sign("other"), max_age=60))
+        self.assertFalse(_valid_token(signing.TimestampSigner(salt="elsewhere").sign("profile"), max_age=60))
+        with mock.patch("django.core.signing.time.time", return_value=time.time() + 120):
+            self.assertFalse(_valid_token(token, max_age=60))
+
+    def test_disabled_middleware_drops_out(self):
+        with override_settings(PROFILING={"enabled": False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: None)
+
+    def test_only_signed_requests_are_profiled(self):
+        self.assertNotIn("X-Profile-ID", self.client.get("/api/health/"))
+        self.assertNotIn("X-Profile-ID", self.client.get("/api/health/", HTTP_X_PROFILE="forged"))
+        self.assertEqual(list_profiles(), [])
+
+    def test_profiles_are_readable_from_any_worker(self):
+        response = self.profiled_get("/api/health/", HTTP_X_REQUEST_ID="abc123")
+        self.assertEqual(response["X-Profile-ID"], "abc123")
+
+        # Another worker doesn't share this one's cache, only PROFILING_DIR.
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+        listing = self.client.get("/api/admin/profiles/")
+        detail = self.client.get("/api/admin/profiles/abc123/")
+        self.assertEqual([row["request_id"] for row in listing.json()], ["abc123"])
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(detail.json()["path"], "/api/health/")
+        self.assertTrue(detail.json()["functions"])
+
+    def test_staff_token_requests_are_sampled(self):
+        player = User.objects.create_user("sampled-player")
+        with override_settings(PROFILING={"enabled": True, "dir": self.dir, "sample_rate": 1}):
+            for user, profiled in ((self.admin, True), (player, False)):
+                token = Token.objects.create(user=user)
+                response = APIClient().get("/api/health/", HTTP_AUTHORIZATION=f"Token {token.key}")
+                self.assertEqual("X-Profile-ID" in response, profiled, user)
+            response = APIClient().get("/api/health/", HTTP_AUTHORIZATION="Token bogus")
+            self.assertNotIn("X-Profile-ID", response)
+        self.assertEqual(len(list_profiles()), 1)
+
+    def test_unsafe_request_id_is_not_used_as_a_file_name(self):
+        response = self.profiled_get("/api/health/", HTTP_X_REQUEST_ID="../../escape")
+        self.assertNotIn("/", response["X-Profile-ID"])
+        self.assertEqual([row["request_id"] for row in list_profiles()], [response["X-Profile-ID"]])
+
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get("/api/admin/profiles/..escape/").status_code, 404)
+        self.assertEqual(self.client.get("/api/admin/profiles/missing/").status_code, 404)
+
+    def test_endpoints_are_admin_only(self):
+        self.profiled_get("/api/health/", HTTP_X_REQUEST_ID="abc123")
+        for path in ("/api/admin/profiles/", "/api/admin/profiles/abc123/"):
+            self.assertEqual(APIClient().get(path).status_code, 401)
+            self.client.force_authenticate(User.objects.get_or_create(username="player")[0])
+            self.assertEqual(self.client.get(path).status_code, 403)
+            self.client.force_authenticate(self.admin)
+            self.assertEqual(self.client.get(path).status_code, 200)
+
+    def test_only_the_newest_profiles_are_kept(self):
+        options = {"dir": self.dir, "keep": 2, "ttl": 3600}
+        for request_id in ("first", "second", "third"):
+            write_profile({"request_id": request_id, "path": "/"}, options)
+            time.sleep(0.01)
+        self.assertEqual([row["request_id"] for row in list_profiles(options)], ["third", "second"])
+
+
+class SlowQueryFingerprintTests(SimpleTestCase):
+    def test_literals_collapse(self):
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id = 3 AND name = 'O''Brien' AND score > -1.5e3"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND score > ?",
+        )
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id = 3"), fingerprint("SELECT * FROM t WHERE id = 70"))
+        self.assertNotEqual(fingerprint("SELECT * FROM t WHERE id = 3"), fingerprint("SELECT * FROM u WHERE id = 3"))
+
+    def test_in_lists_of_any_length_collapse(self):
+        self.assertEqual(normalize("SELECT x FROM t WHERE id IN (1, 2, 3)"), "SELECT x FROM t WHERE id IN (...)")
+        self.assertEqual(
+            fingerprint("SELECT x FROM t WHERE id IN (%s, %s)"),
+            fingerprint("SELECT x FROM t WHERE id IN (%s,%s,%s,%s)"),
+        )
+        # A parenthesized condition is not a value list.
+        self.assertEqual(normalize("SELECT x FROM t WHERE (a = 1)"), "SELECT x FROM t WHERE (a = ?)")
+
+    def test_quoted_identifiers_are_kept(self):
+        sql = 'SELECT "heroes_hero"."id", "t2"."col_1", "2fa" FROM "heroes_hero" WHERE "heroes_hero"."difficulty" = 2 LIMIT 21'
+        self.assertEqual(
+            normalize(sql),
+            'SELECT "heroes_hero"."id", "t2"."col_1", "2fa" FROM "heroes_hero" WHERE "heroes_hero"."difficulty" = ? LIMIT ?',
+        )
+
+    def test_aggregate_per_fingerprint(self):
+        def entry(fp, at, duration, view="teams.list", plan=None):
+            return {
+                "fingerprint": fp, "sql": f"SQL {fp}", "at": at, "duration_ms": duration,
+                "view": view, "request_id": f"req-{at}", "plan": plan,
+            }
+
+        rows = aggregate([
+            entry("a", "2026-01-01T00:00:03", 300.0, view="teams.detail"),
+            entry("a", "2026-01-01T00:00:01", 250.0, plan=["SCAN t"]),
+            entry("b", "2026-01-01T00:00:02", 900.0),
+            entry("a", "2026-01-01T00:00:02", 200.0),
+        ])
+        self.assertEqual([row["fingerprint"] for row in rows], ["b", "a"])  # by total time
+        a = rows[1]
+        self.assertEqual(
+            {key: a[key] for key in ("count", "total_ms", "mean_ms", "p95_ms", "max_ms", "views", "plan")},
+            {
+                "count": 3, "total_ms": 750.0, "mean_ms": 250.0, "p95_ms": 300.0, "max_ms": 300.0,
+                "views": {"teams.list": 2, "teams.detail": 1}, "plan": ["SCAN t"],
+            },
+        )
+        self.assertEqual((a["last_seen"], a["last_request_id"]), ("2026-01-01T00:00:03", "req-2026-01-01T00:00:03"))
@@ -0,0 +1,101 @@
+"""DRF throttles that keep O(1) counters in the shared cache.
+
+DRF's stock throttles store a list of request timestamps per client and
+rewrite the whole list on every request. These classes keep two integer
+counters per client (the current and previous fixed window) and estimate a
+sliding window from them. On ``marvel_rivals.cache.RedisCache`` that is one
+pipelined round trip per throttle (``INCR`` + ``EXPIRE`` on the current
+window, ``GET`` on the previous one), plus a ``DECR`` when a request is
+rejected, and the limits hold across all workers. The LocMem stand-in for
+tests and local dev does the same with ``add``/``incr``/``get``, and any other
+backend falls back to the plain cache API. Neither of the project backends
+counts these lookups as the request's cache hits or misses.
+"""
+
+from rest_framework import throttling
+
+from . import metrics
+
+
+class SlidingWindowCounterMixin:
+    """Sliding-window approximation over two fixed-window counters."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+
+        self.current, self.previous = self._counts(current_key, previous_key)
+        self.elapsed = offset / self.duration
+
+        if self._estimate(self.current) > self.num_requests:
+            # Rejected requests don't consume budget.
+            self._release(current_key)
+            self.current -= 1
+            metrics.inc("rivals_throttle_rejections_total", scope=self.scope)
+            return self.throttle_failure()
+        return True
+
+    def _counts(self, current_key, previous_key):
+        # Counters outlive their window so they can serve as "previous".
+        timeout = self.duration * 2
+        window_counts = getattr(self.cache, "window_counts", None)
+        if window_counts is not None:
+            return window_counts(current_key, previous_key, timeout)
+
+        self.cache.add(current_key, 0, timeout=timeout)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.cache.set(current_key, 1, timeout=timeout)
+            current = 1
+        return current, self.cache.get(previous_key, 0)
+
+    def _release(self, key):
+        window_release = getattr(self.cache, "window_release", None)
+        if window_release is not None:
+            window_release(key)
+        else:
+            self.cache.decr(key)
+
+    def _estimate(self, current):
+        return self.previous * (1 - self.elapsed) + current
+
+    def wait(self):
+        remaining_window = self.duration * (1 - self.elapsed)
+        if self.current + 1 > self.num_requests or not self.previous:
+            return remaining_window
+
+        # Time until the previous window's weight has decayed enough to
+        # admit one more request.
+        excess = self._estimate(self.current + 1) - self.num_requests
+        return min(remaining_window, self.duration * excess / self.previous)
+
+
+class AnonRateThrottle(SlidingWindowCounterMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowCounterMixin, throttling.UserRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(SlidingWindowCounterMixin, throttling.ScopedRateThrottle):
+    def allow_request(self, request, view):
+        # Same scope resolution as DRF, which would otherwise bypass the mixin.
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
@@ -4,6 +4,9 @@ from django.contrib import admin
 from django.urls import include, path
 from django.shortcuts import redirect
 from marvel_rivals.health import health_view
+from marvel_rivals.metrics import metrics_view
+from marvel_rivals.profiling import profile_detail_view, profile_list_view
+from marvel_rivals.warmup import readiness_view
 
 
 def root_view(_request):
@@ -14,6 +17,10 @@ urlpatterns = [
     path("", root_view),
     path('admin/', admin.site.urls),
     path('api/health/', health_view),
+    path('api/ready/', readiness_view),
+    path('api/metrics/', metrics_view),
+    path('api/admin/profiles/', profile_list_view),
+    path('api/admin/profiles/<str:request_id>/', profile_detail_view),
     path('api/', include('heroes.urls')),
     path('api/', include('teams.urls')),
     path('api/auth/', include('accounts.urls')),
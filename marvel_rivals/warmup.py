@@ -0,0 +1,235 @@
+"""Worker warm-up and the readiness flag behind ``/api/ready/``.
+
+A fresh worker would otherwise serve its first requests with the URLconf
+not yet imported, an unbuilt hero index and catalog, and empty response
+caches. ``WarmUpApp`` wraps the Django ASGI application and, once per process,
+
+* imports the URLconf (views, serializers),
+* builds the hero index and the serialized hero catalog (with synergies and
+  counters), and
+* replays a few ``GET`` requests (``paths``) through the application, which
+  fills the compressed-body cache and every lazily built per-view structure.
+
+Database connections aren't pre-opened: Django runs each ASGI request on a
+thread of its own, with connections of its own, so there is no request
+thread to open them on ahead of time. The replayed requests do check that
+the database answers.
+
+It starts on ASGI ``lifespan.startup`` (uvicorn, hypercorn). Daphne doesn't
+speak lifespan, so there it starts with the first HTTP request instead,
+which is normally the load balancer's first readiness probe. Either way the
+worker answers ``/api/health/`` throughout, while ``/api/ready/`` returns 503
+until warm-up has finished. A failed step is logged and reported but doesn't
+hold the worker back; ``/api/health/?deep=1`` is what reports broken
+dependencies.
+"""
+
+import asyncio
+import logging
+import time
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils import timezone
+
+logger = logging.getLogger("marvel_rivals.warmup")
+
+DEFAULTS = {
+    "enabled": True,
+    "paths": ["/api/heroes/", "/api/heroes/tags/", "/api/teams/"],
+    "timeout": 30.0,
+}
+
+
+def warmup_options():
+    return {**DEFAULTS, **getattr(settings, "WARMUP", {})}
+
+
+class _State:
+    """Process-wide warm-up progress.
+
+    ``idle`` means nothing in this process has started warming up (WSGI,
+    tests, commands), which counts as ready.
+    """
+
+    def __init__(self):
+        self.status = "idle"
+        self.started_at = None
+        self.finished_at = None
+        self.duration_ms = None
+        self.steps = []
+
+    def begin(self):
+        self.status = "warming"
+        self.started_at = timezone.now().isoformat()
+
+    def as_dict(self):
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_ms": self.duration_ms,
+            "steps": self.steps,
+        }
+
+    @property
+    def ready(self):
+        return self.status in ("idle", "ready")
+
+
+state = _State()
+
+
+def is_ready():
+    return state.ready
+
+
+def load_urlconf():
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+
+def load_hero_catalog():
+    from heroes.index import get_hero_index
+    from heroes.serializers import hero_catalog_payloads
+
+    get_hero_index()
+    hero_catalog_payloads()
+
+
+def _host():
+    for host in settings.ALLOWED_HOSTS:
+        if host and "*" not in host and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+async def replay(app, path):
+    """``GET path`` through ``app``; returns the response status."""
+    url = urlsplit(path)
+    host = _host()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", host.encode()),
+            (b"accept", b"application/json"),
+            (b"accept-encoding", b"gzip, br"),
+            (b"x-forwarded-proto", b"https"),
+            (b"x-request-id", f"warmup-{time.time_ns():x}".encode()),
+        ],
+        # Its own throttle bucket, so warm-up never uses up a real client's.
+        "client": ("warmup", 0),
+        "server": (host, 443),
+    }
+    done = asyncio.Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        done.set()
+    return status[0] if status else None
+
+
+async def _step(name, run, timeout):
+    start = time.perf_counter()
+    step = {"name": name, "ok": True}
+    try:
+        result = await asyncio.wait_for(run(), timeout)
+        if isinstance(result, int):
+            step["status"] = result
+            step["ok"] = result < 500
+    except Exception as exc:
+        step.update(ok=False, error=f"{type(exc).__name__}: {exc}")
+    step["ms"] = round((time.perf_counter() - start) * 1000, 2)
+    if not step["ok"]:
+        logger.warning("Warm-up step %s failed: %s", name, step.get("error", step.get("status")))
+    state.steps.append(step)
+
+
+async def warm_up(app):
+    """Run every warm-up step once, in order, then mark the worker ready."""
+    options = warmup_options()
+    start = time.perf_counter()
+    timeout = options["timeout"]
+
+    for name, func in (
+        ("urlconf", load_urlconf),
+        ("hero_catalog", load_hero_catalog),
+    ):
+        await _step(name, sync_to_async(func, thread_sensitive=True), timeout)
+    for path in options["paths"]:
+        await _step(f"GET {path}", lambda path=path: replay(app, path), timeout)
+
+    state.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+    state.finished_at = timezone.now().isoformat()
+    state.status = "ready"
+    failed = [step["name"] for step in state.steps if not step["ok"]]
+    logger.info(
+        "Warm-up finished in %sms%s", state.duration_ms,
+        f" ({len(failed)} step(s) failed: {', '.join(failed)})" if failed else "",
+    )
+
+
+class WarmUpApp:
+    """ASGI wrapper that warms the worker up once, then gets out of the way."""
+
+    def __init__(self, app):
+        self.app = app
+        self.task = None
+        self.enabled = warmup_options()["enabled"]
+
+    def start(self):
+        if self.enabled and self.task is None:
+            # Not ready from here on, even before the task first runs.
+            state.begin()
+            self.task = asyncio.get_running_loop().create_task(warm_up(self.app))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+        # Servers without lifespan support: warm up alongside the first request.
+        self.start()
+        return await self.app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Accept traffic right away; /api/ready/ holds the balancer off.
+                self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.task is not None and not self.task.done():
+                    self.task.cancel()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def readiness_view(request):
+    return JsonResponse(state.as_dict(), status=200 if state.ready else 503)
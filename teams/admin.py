@@ -1,25 +1,30 @@
 from django.contrib import admin
-from .models import Team, TeamMember, Vote, Comment
+from .models import Team, TeamAnalysis, TeamMember, Vote, Comment
 
 class TeamMemberInline(admin.TabularInline):
     model = TeamMember
     extra = 6
     max_num = 6
 
+class TeamAnalysisInline(admin.StackedInline):
+    model = TeamAnalysis
+    can_delete = False
+    classes = ['collapse']
+
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
     list_display = ['name', 'user', 'composition_score', 'upvote_count', 'views', 'created_at']
     list_filter = ['created_at']
     search_fields = ['name', 'description', 'user__username']
     readonly_fields = ['slug', 'views', 'created_at', 'updated_at']
-    inlines = [TeamMemberInline]
+    inlines = [TeamMemberInline, TeamAnalysisInline]
     
     fieldsets = (
         ('Team Info', {
             'fields': ('user', 'name', 'description', 'slug')
         }),
         ('Analysis', {
-            'fields': ('composition_score', 'analysis_data'),
+            'fields': ('composition_score',),
             'classes': ('collapse',)
         }),
         ('Stats', {
@@ -0,0 +1,62 @@
+"""Compact hero-set signatures for teams.
+
+``Team.composition_key`` is a SHA-1 of the sorted member hero ids, so every
+team with the same six heroes shares one indexed key regardless of slot order
+or name; ``CompositionStats`` rolls teams up by that key.
+
+``Team.hero_mask`` has bit ``hero_id - 1`` set for each member, so "teams
+containing all of these heroes" is ``hero_mask & wanted = wanted`` on one
+narrow column instead of one TeamMember join per hero. A signed BIGINT holds
+63 bits; heroes with larger ids fall back to a membership subquery.
+"""
+
+import hashlib
+
+from django.db.models import F
+
+MASK_BITS = 63
+
+
+def hero_bit(hero_id):
+    return 1 << (hero_id - 1) if 1 <= hero_id <= MASK_BITS else 0
+
+
+def hero_mask(hero_ids):
+    mask = 0
+    for hero_id in hero_ids:
+        mask |= hero_bit(hero_id)
+    return mask
+
+
+def composition_key(hero_ids):
+    canonical = ",".join(str(hero_id) for hero_id in sorted(hero_ids))
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def filter_teams_with_heroes(queryset, hero_ids):
+    """Restrict a Team queryset to teams containing every hero in ``hero_ids``."""
+    from .models import TeamMember
+
+    hero_ids = sorted(set(hero_ids))
+    if not hero_ids:
+        return queryset
+
+    # Anchor on one hero through the TeamMember.hero index so the mask check
+    # only runs over that hero's teams rather than the whole table.
+    anchor, *rest = hero_ids
+    queryset = queryset.filter(
+        pk__in=TeamMember.objects.filter(hero_id=anchor).values('team_id')
+    )
+
+    mask = hero_mask(rest)
+    if mask:
+        queryset = queryset.alias(
+            matched_heroes=F('hero_mask').bitand(mask)
+        ).filter(matched_heroes=mask)
+
+    for hero_id in rest:
+        if not hero_bit(hero_id):
+            queryset = queryset.filter(
+                pk__in=TeamMember.objects.filter(hero_id=hero_id).values('team_id')
+            )
+    return queryset
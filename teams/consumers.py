@@ -1,10 +1,23 @@
 import json
 import logging
+from collections import Counter
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from marvel_rivals import metrics
+
 logger = logging.getLogger(__name__)
 
+# Listeners per comment group in this process (consumers share one event loop).
+_group_listeners = Counter()
+
+
+def _collect_websocket_metrics():
+    return [("rivals_websocket_groups", {}, len(_group_listeners))]
+
+
+metrics.register_collector(_collect_websocket_metrics)
+
 
 class TeamCommentConsumer(AsyncWebsocketConsumer):
     """Broadcast new comments for a specific team in real time."""
@@ -14,6 +27,9 @@ class TeamCommentConsumer(AsyncWebsocketConsumer):
         self.group_name = f"team_comments_{self.slug}"
 
         await self.accept()
+        self.joined = False
+        metrics.inc("rivals_websocket_connections")
+        metrics.inc("rivals_websocket_connections_total")
 
         # This will eliminate errors if Redis is not configured
         if not self.channel_layer:
@@ -23,16 +39,26 @@ class TeamCommentConsumer(AsyncWebsocketConsumer):
         try:
             await self.channel_layer.group_add(self.group_name, self.channel_name)
         except Exception:
+            metrics.inc("rivals_channel_layer_errors_total", operation="group_add")
             logger.exception("group_add failed; websocket will be passive.")
             return
+        self.joined = True
+        _group_listeners[self.group_name] += 1
 
     async def disconnect(self, close_code):
-        if not self.channel_layer:
+        if not hasattr(self, "joined"):
+            return  # never accepted
+        metrics.inc("rivals_websocket_connections", -1)
+        if not self.joined:
             return
 
+        _group_listeners[self.group_name] -= 1
+        if _group_listeners[self.group_name] <= 0:
+            del _group_listeners[self.group_name]
         try:
             await self.channel_layer.group_discard(self.group_name, self.channel_name)
         except Exception:
+            metrics.inc("rivals_channel_layer_errors_total", operation="group_discard")
             logger.exception("group_discard failed.")
 
     async def receive(self, text_data=None, bytes_data=None):
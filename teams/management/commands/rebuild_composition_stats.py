@@ -0,0 +1,22 @@
+"""
+Recompute the composition and hero pick/pair rollups from scratch.
+
+Run:
+    python manage.py rebuild_composition_stats
+
+Needed after bulk loads or direct SQL that bypass the serializer/signal hooks.
+"""
+
+from django.core.management.base import BaseCommand
+
+from teams.rollups import rebuild_composition_stats, rebuild_hero_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild CompositionStats, HeroPickStat and HeroPairStat from Team and Vote rows."
+
+    def handle(self, *args, **options):
+        rows = rebuild_composition_stats()
+        self.stdout.write(f"Rebuilt {rows} composition rows.")
+        picks, pairs = rebuild_hero_stats()
+        self.stdout.write(f"Rebuilt {picks} hero pick rows and {pairs} pair rows.")
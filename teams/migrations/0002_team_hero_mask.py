@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:27
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_hero_mask(apps, schema_editor):
+    # Inlined from teams.compositions so the migration doesn't drift with it.
+    Team = apps.get_model("teams", "Team")
+    TeamMember = apps.get_model("teams", "TeamMember")
+
+    last_pk = 0
+    while True:
+        team_ids = list(
+            Team.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:BATCH_SIZE]
+        )
+        if not team_ids:
+            break
+        masks = dict.fromkeys(team_ids, 0)
+        for team_id, hero_id in TeamMember.objects.filter(
+            team_id__in=team_ids
+        ).values_list("team_id", "hero_id"):
+            if 1 <= hero_id <= 63:
+                masks[team_id] |= 1 << (hero_id - 1)
+        Team.objects.bulk_update(
+            [Team(pk=team_id, hero_mask=mask) for team_id, mask in masks.items() if mask],
+            ["hero_mask"],
+        )
+        last_pk = team_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="team",
+            name="hero_mask",
+            field=models.BigIntegerField(
+                default=0, help_text="Bit (hero_id - 1) per member hero"
+            ),
+        ),
+        migrations.RunPython(backfill_hero_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:28
+
+import hashlib
+
+from django.db import migrations, models
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def backfill_compositions(apps, schema_editor):
+    Team = apps.get_model("teams", "Team")
+    TeamMember = apps.get_model("teams", "TeamMember")
+    CompositionStats = apps.get_model("teams", "CompositionStats")
+
+    stats = {}
+    last_pk = 0
+    while True:
+        teams = list(
+            Team.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .annotate(vote_total=Count("votes"))
+            .values_list("pk", "composition_score", "vote_total")[:BATCH_SIZE]
+        )
+        if not teams:
+            break
+        members = {team_id: [] for team_id, _, _ in teams}
+        for team_id, hero_id in TeamMember.objects.filter(
+            team_id__in=members
+        ).values_list("team_id", "hero_id"):
+            members[team_id].append(hero_id)
+
+        updated = []
+        for team_id, score, votes in teams:
+            hero_ids = sorted(members[team_id])
+            if not hero_ids:
+                continue
+            key = hashlib.sha1(",".join(map(str, hero_ids)).encode()).hexdigest()
+            updated.append(Team(pk=team_id, composition_key=key))
+            row = stats.setdefault(key, CompositionStats(key=key, hero_ids=hero_ids))
+            row.team_count += 1
+            row.total_votes += votes
+            row.score_total += score
+        Team.objects.bulk_update(updated, ["composition_key"])
+        last_pk = teams[-1][0]
+
+    CompositionStats.objects.bulk_create(stats.values(), batch_size=BATCH_SIZE)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0002_team_hero_mask"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompositionStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=40, unique=True)),
+                ("hero_ids", models.JSONField(default=list)),
+                ("team_count", models.IntegerField(db_index=True, default=0)),
+                ("total_votes", models.IntegerField(db_index=True, default=0)),
+                ("score_total", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "composition stats",
+                "ordering": ["-team_count"],
+            },
+        ),
+        migrations.AddField(
+            model_name="team",
+            name="composition_key",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="SHA-1 of the sorted member hero ids",
+                max_length=40,
+            ),
+        ),
+        migrations.RunPython(backfill_compositions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:30
+
+from collections import Counter
+from itertools import combinations
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_hero_stats(apps, schema_editor):
+    CompositionStats = apps.get_model("teams", "CompositionStats")
+    HeroPickStat = apps.get_model("teams", "HeroPickStat")
+    HeroPairStat = apps.get_model("teams", "HeroPairStat")
+
+    picks = Counter()
+    pairs = Counter()
+    for hero_ids, teams in CompositionStats.objects.filter(
+        team_count__gt=0
+    ).values_list("hero_ids", "team_count"):
+        for hero_id in hero_ids:
+            picks[hero_id] += teams
+        for pair in combinations(sorted(set(hero_ids)), 2):
+            pairs[pair] += teams
+
+    HeroPickStat.objects.bulk_create(
+        [HeroPickStat(hero_id=hero_id, team_count=n) for hero_id, n in picks.items()],
+        batch_size=1000,
+    )
+    HeroPairStat.objects.bulk_create(
+        [
+            HeroPairStat(hero_id=hero, partner_id=partner, team_count=n)
+            for (hero, partner), n in pairs.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("heroes", "0003_hero_media_hashes"),
+        ("teams", "0003_composition_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HeroPickStat",
+            fields=[
+                (
+                    "hero",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="pick_stat",
+                        serialize=False,
+                        to="heroes.hero",
+                    ),
+                ),
+                ("team_count", models.IntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="HeroPairStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("team_count", models.IntegerField(default=0)),
+                (
+                    "hero",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="heroes.hero",
+                    ),
+                ),
+                (
+                    "partner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="heroes.hero",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("hero", "partner"), name="unique_hero_pair"
+                    ),
+                    models.CheckConstraint(
+                        condition=models.Q(("hero__lt", models.F("partner"))),
+                        name="ordered_hero_pair",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_hero_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def _batches(queryset):
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE])
+        if not rows:
+            break
+        yield rows
+        last_pk = rows[-1][0]
+
+
+def move_analysis_out(apps, schema_editor):
+    Team = apps.get_model("teams", "Team")
+    TeamAnalysis = apps.get_model("teams", "TeamAnalysis")
+
+    # Only non-empty results get a row; the model treats a missing row as {}.
+    for rows in _batches(Team.objects.values_list("pk", "analysis_data")):
+        TeamAnalysis.objects.bulk_create(
+            [TeamAnalysis(team_id=pk, data=data) for pk, data in rows if data]
+        )
+
+
+def move_analysis_back(apps, schema_editor):
+    Team = apps.get_model("teams", "Team")
+    TeamAnalysis = apps.get_model("teams", "TeamAnalysis")
+
+    for rows in _batches(TeamAnalysis.objects.values_list("pk", "data")):
+        Team.objects.bulk_update(
+            [Team(pk=pk, analysis_data=data) for pk, data in rows],
+            ["analysis_data"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0004_hero_pick_pair_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamAnalysis",
+            fields=[
+                (
+                    "team",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="analysis",
+                        serialize=False,
+                        to="teams.team",
+                    ),
+                ),
+                ("data", models.JSONField(blank=True, default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "team analyses",
+            },
+        ),
+        migrations.RunPython(move_analysis_out, move_analysis_back),
+        migrations.RemoveField(
+            model_name="team",
+            name="analysis_data",
+        ),
+    ]
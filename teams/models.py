@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from heroes.models import Hero
 import uuid
@@ -18,9 +20,17 @@ class Team(models.Model):
     # Social features
     views = models.IntegerField(default=0)
     
-    # Analysis results (cached)
-    analysis_data = models.JSONField(default=dict, blank=True)
+    # Analysis results live in TeamAnalysis so list scans stay narrow
     composition_score = models.IntegerField(default=0, help_text="Overall score 0-100")
+
+    # Bitmask of member hero ids, kept by TeamCreateSerializer._sync_members
+    hero_mask = models.BigIntegerField(default=0, help_text="Bit (hero_id - 1) per member hero")
+    composition_key = models.CharField(
+        max_length=40,
+        blank=True,
+        db_index=True,
+        help_text="SHA-1 of the sorted member hero ids",
+    )
     
     class Meta:
         ordering = ['-created_at']
@@ -36,7 +46,29 @@ class Team(models.Model):
     
     @property
     def upvote_count(self):
-        return self.votes.count()
+        # annotate_team_votes() provides upvote_total; count lazily otherwise.
+        total = getattr(self, 'upvote_total', None)
+        return self.votes.count() if total is None else total
+
+    @property
+    def analysis_data(self):
+        try:
+            return self.analysis.data
+        except TeamAnalysis.DoesNotExist:
+            return {}
+
+
+class TeamAnalysis(models.Model):
+    """Cached analysis results, kept off the hot Team row and loaded on detail only."""
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, primary_key=True, related_name='analysis')
+    data = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'team analyses'
+
+    def __str__(self):
+        return f"Analysis for team {self.team_id}"
 
 
 class TeamMember(models.Model):
@@ -70,6 +102,65 @@ class Vote(models.Model):
         return f"{self.user.username} voted for {self.team.name}"
 
 
+def annotate_team_votes(queryset, user=None):
+    """Annotate ``upvote_total`` (and ``user_voted`` for a logged-in ``user``)
+    as correlated subqueries, so list/detail serializers don't count per row.
+    """
+    votes = Vote.objects.filter(team=OuterRef('pk'))
+    if 'upvote_total' not in queryset.query.annotations:  # e.g. ordering=popular
+        queryset = queryset.annotate(
+            upvote_total=Coalesce(
+                Subquery(votes.order_by().values('team').annotate(n=Count('pk')).values('n')),
+                0,
+            ),
+        )
+    if user is not None and user.is_authenticated:
+        queryset = queryset.annotate(user_voted=Exists(votes.filter(user=user)))
+    return queryset
+
+
+class CompositionStats(models.Model):
+    """Incrementally maintained rollup of teams per canonical hero lineup."""
+    key = models.CharField(max_length=40, unique=True)
+    hero_ids = models.JSONField(default=list)
+    team_count = models.IntegerField(default=0, db_index=True)
+    total_votes = models.IntegerField(default=0, db_index=True)
+    score_total = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-team_count']
+        verbose_name_plural = 'composition stats'
+
+    def __str__(self):
+        return f"Composition {self.key[:8]} ({self.team_count} teams)"
+
+
+class HeroPickStat(models.Model):
+    """Number of saved teams that include a hero, kept by delta."""
+    hero = models.OneToOneField(Hero, on_delete=models.CASCADE, primary_key=True, related_name='pick_stat')
+    team_count = models.IntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"{self.hero_id}: {self.team_count} teams"
+
+
+class HeroPairStat(models.Model):
+    """Teams containing both heroes; one row per unordered pair (hero < partner)."""
+    hero = models.ForeignKey(Hero, on_delete=models.CASCADE, related_name='+')
+    partner = models.ForeignKey(Hero, on_delete=models.CASCADE, related_name='+')
+    team_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hero', 'partner'], name='unique_hero_pair'),
+            models.CheckConstraint(condition=models.Q(hero__lt=models.F('partner')), name='ordered_hero_pair'),
+        ]
+
+    def __str__(self):
+        return f"{self.hero_id}+{self.partner_id}: {self.team_count} teams"
+
+
 class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='comments')
@@ -0,0 +1,152 @@
+"""Read models for the hot team/comment list endpoints.
+
+These build the same dicts as ``TeamListSerializer``/``CommentSerializer``
+straight from ``.values()`` rows and a few batched lookups, skipping DRF's
+per-object field machinery. The output must stay byte-identical to the
+serializers (``teams.tests.FastPathParityTests`` compares the two), so any
+field added to those serializers needs adding here as well.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+from rest_framework import serializers
+
+from accounts.avatars import avatar_url
+from accounts.models import Profile
+from heroes.serializers import hero_catalog_payloads
+from marvel_rivals.fieldsets import excluded_names
+
+from .models import TeamMember, Vote
+from .serializers import TeamListSerializer
+
+TEAM_LIST_FIELDS = tuple(TeamListSerializer.Meta.fields)
+
+_datetime = serializers.DateTimeField(read_only=True)
+
+USER_COLUMNS = (
+    'user_id',
+    'user__username',
+    'user__profile__avatar',
+    'user__profile__avatar_variants',
+)
+TEAM_COLUMNS = (
+    'id',
+    'slug',
+    'name',
+    'description',
+    'composition_score',
+    'views',
+    'created_at',
+) + USER_COLUMNS
+COMMENT_COLUMNS = ('id', 'text', 'created_at', 'updated_at') + USER_COLUMNS
+
+
+def enabled():
+    return getattr(settings, 'FAST_READ_MODELS', True)
+
+
+class _Users:
+    """teams.UserSerializer output per user id, built once per response."""
+
+    def __init__(self, request):
+        self.request = request
+        self.cache = {}
+
+    def __call__(self, row):
+        user_id = row['user_id']
+        user = self.cache.get(user_id)
+        if user is None:
+            avatar = row['user__profile__avatar']
+            profile = (
+                Profile(avatar=avatar, avatar_variants=row['user__profile__avatar_variants'])
+                if avatar else None
+            )
+            user = self.cache[user_id] = {
+                'id': user_id,
+                'username': row['user__username'],
+                'avatar_url': avatar_url(profile, 'small', self.request),
+            }
+        return user
+
+
+def team_list_items(rows, request, fields=None, omit=None, normalized=False):
+    """Project ``TEAM_COLUMNS`` rows into TeamListSerializer-shaped dicts."""
+    rows = list(rows)
+    excluded = excluded_names(TEAM_LIST_FIELDS, fields, omit)
+    keep = [name for name in TEAM_LIST_FIELDS if name not in excluded]
+    team_ids = [row['id'] for row in rows]
+
+    members = defaultdict(list)
+    if 'members' in keep or 'member_count' in keep:
+        for member in TeamMember.objects.filter(team_id__in=team_ids).values(
+            'id', 'team_id', 'hero_id', 'position'
+        ):
+            members[member['team_id']].append(member)
+
+    heroes = {}
+    if 'members' in keep and not normalized:
+        heroes = hero_catalog_payloads(
+            {member['hero_id'] for team in members.values() for member in team}
+        )
+
+    upvotes = {}
+    if 'upvote_count' in keep:
+        upvotes = dict(
+            Vote.objects.filter(team_id__in=team_ids)
+            .values_list('team_id')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+
+    voted = set()
+    if 'user_has_voted' in keep and request and request.user.is_authenticated:
+        voted = set(
+            Vote.objects.filter(user=request.user, team_id__in=team_ids)
+            .values_list('team_id', flat=True)
+        )
+
+    def member_items(team_id):
+        if normalized:
+            return [
+                {'id': m['id'], 'hero_id': m['hero_id'], 'position': m['position']}
+                for m in members[team_id]
+            ]
+        return [
+            {'id': m['id'], 'hero': heroes[m['hero_id']], 'position': m['position']}
+            for m in members[team_id]
+        ]
+
+    users = _Users(request)
+    builders = {
+        'id': lambda row: row['id'],
+        'slug': lambda row: row['slug'],
+        'name': lambda row: row['name'],
+        'description': lambda row: row['description'],
+        'user': users,
+        'members': lambda row: member_items(row['id']),
+        'member_count': lambda row: len(members[row['id']]),
+        'upvote_count': lambda row: upvotes.get(row['id'], 0),
+        'user_has_voted': lambda row: row['id'] in voted,
+        'composition_score': lambda row: row['composition_score'],
+        'views': lambda row: row['views'],
+        'created_at': lambda row: _datetime.to_representation(row['created_at']),
+    }
+    build = [(name, builders[name]) for name in keep]
+    return [{name: builder(row) for name, builder in build} for row in rows]
+
+
+def comment_items(rows, request):
+    """Project ``COMMENT_COLUMNS`` rows into CommentSerializer-shaped dicts."""
+    users = _Users(request)
+    return [
+        {
+            'id': row['id'],
+            'user': users(row),
+            'text': row['text'],
+            'created_at': _datetime.to_representation(row['created_at']),
+            'updated_at': _datetime.to_representation(row['updated_at']),
+        }
+        for row in rows
+    ]
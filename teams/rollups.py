@@ -0,0 +1,184 @@
+"""Delta maintenance for the team rollups.
+
+``CompositionStats`` counts teams per canonical lineup; ``HeroPickStat`` and
+``HeroPairStat`` count teams per hero and per unordered hero pair. Each write
+touches a handful of rows with F() increments, so the stats endpoints never
+GROUP BY over all teams. Bulk loads bypass these hooks; run
+``rebuild_composition_stats`` afterwards.
+"""
+
+from collections import Counter
+from functools import reduce
+from itertools import combinations
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+
+from .models import CompositionStats, HeroPairStat, HeroPickStat, Team, TeamMember, Vote
+
+
+def adjust_composition(key, hero_ids, teams=0, votes=0, score=0):
+    if not key or not (teams or votes or score):
+        return
+
+    changes = {
+        'team_count': F('team_count') + teams,
+        'total_votes': F('total_votes') + votes,
+        'score_total': F('score_total') + score,
+    }
+    if CompositionStats.objects.filter(key=key).update(**changes):
+        return
+    # First team with this lineup; a concurrent writer may win the insert.
+    CompositionStats.objects.bulk_create(
+        [CompositionStats(key=key, hero_ids=sorted(hero_ids))],
+        ignore_conflicts=True,
+    )
+    CompositionStats.objects.filter(key=key).update(**changes)
+
+
+def move_team(team, old_key, new_key, new_hero_ids):
+    """Move ``team`` (with its votes and score) from one lineup to another."""
+    if old_key == new_key:
+        return
+    votes = team.votes.count() if old_key else 0
+    score = team.composition_score
+    move_hero_stats(_composition_heroes(old_key), new_hero_ids)
+    # The old row already exists, so its hero ids are never needed.
+    adjust_composition(old_key, (), teams=-1, votes=-votes, score=-score)
+    adjust_composition(new_key, new_hero_ids, teams=1, votes=votes, score=score)
+
+
+def remove_team(team):
+    """Take a deleted team out of every rollup."""
+    move_hero_stats(_composition_heroes(team.composition_key), ())
+    # Cascaded votes are deleted (and counted down) before the team itself.
+    adjust_composition(team.composition_key, (), teams=-1, score=-team.composition_score)
+
+
+def _composition_heroes(key):
+    """Hero ids of a lineup, read off its rollup row rather than TeamMember."""
+    if not key:
+        return []
+    return CompositionStats.objects.filter(key=key).values_list('hero_ids', flat=True).first() or []
+
+
+def hero_pairs(hero_ids):
+    return combinations(sorted(set(hero_ids)), 2)
+
+
+def move_hero_stats(old_hero_ids, new_hero_ids):
+    """Apply the pick/pair difference between two lineups of the same team."""
+    old, new = set(old_hero_ids), set(new_hero_ids)
+    _adjust_picks(new - old, 1)
+    _adjust_picks(old - new, -1)
+
+    old_pairs, new_pairs = set(hero_pairs(old)), set(hero_pairs(new))
+    _adjust_pairs(new_pairs - old_pairs, 1)
+    _adjust_pairs(old_pairs - new_pairs, -1)
+
+
+def _adjust_picks(hero_ids, delta):
+    if not hero_ids:
+        return
+    if delta > 0:
+        HeroPickStat.objects.bulk_create(
+            [HeroPickStat(hero_id=hero_id) for hero_id in hero_ids],
+            ignore_conflicts=True,
+        )
+    HeroPickStat.objects.filter(hero_id__in=hero_ids).update(
+        team_count=F('team_count') + delta,
+    )
+
+
+def _adjust_pairs(pairs, delta):
+    if not pairs:
+        return
+    if delta > 0:
+        HeroPairStat.objects.bulk_create(
+            [HeroPairStat(hero_id=hero, partner_id=partner) for hero, partner in pairs],
+            ignore_conflicts=True,
+        )
+    match = reduce(or_, (Q(hero_id=hero, partner_id=partner) for hero, partner in pairs))
+    HeroPairStat.objects.filter(match).update(team_count=F('team_count') + delta)
+
+
+def adjust_votes_for_team(team_id, delta):
+    CompositionStats.objects.filter(
+        key__in=Team.objects.filter(pk=team_id).values('composition_key'),
+    ).update(total_votes=F('total_votes') + delta)
+
+
+def rebuild_composition_stats(batch_size=1000):
+    """Recompute every rollup row from Team/Vote. Returns the row count."""
+    rows = {}
+    samples = {}
+    for row in (
+        Team.objects.exclude(composition_key='')
+        .values('composition_key')
+        .annotate(teams=Count('pk'), score=Sum('composition_score'), sample=Min('pk'))
+        .order_by()
+    ):
+        key = row['composition_key']
+        rows[key] = CompositionStats(
+            key=key,
+            team_count=row['teams'],
+            score_total=row['score'] or 0,
+        )
+        samples[row['sample']] = key
+
+    for row in (
+        Vote.objects.exclude(team__composition_key='')
+        .values('team__composition_key')
+        .annotate(votes=Count('pk'))
+        .order_by()
+    ):
+        rows[row['team__composition_key']].total_votes = row['votes']
+
+    # Every team sharing a key has the same heroes; read them off one sample.
+    sample_ids = list(samples)
+    for start in range(0, len(sample_ids), batch_size):
+        for team_id, hero_id in TeamMember.objects.filter(
+            team_id__in=sample_ids[start:start + batch_size]
+        ).values_list('team_id', 'hero_id'):
+            rows[samples[team_id]].hero_ids.append(hero_id)
+    for row in rows.values():
+        row.hero_ids.sort()
+
+    with transaction.atomic():
+        CompositionStats.objects.all().delete()
+        CompositionStats.objects.bulk_create(rows.values(), batch_size=batch_size)
+    return len(rows)
+
+
+def rebuild_hero_stats(batch_size=1000):
+    """Recompute hero pick and pair counts from the composition rollup.
+
+    Run after ``rebuild_composition_stats``; lineups are few compared to
+    teams, so this never touches TeamMember. Returns ``(picks, pairs)``.
+    """
+    picks = Counter()
+    pairs = Counter()
+    for hero_ids, teams in CompositionStats.objects.filter(team_count__gt=0).values_list(
+        'hero_ids', 'team_count'
+    ):
+        for hero_id in hero_ids:
+            picks[hero_id] += teams
+        for pair in hero_pairs(hero_ids):
+            pairs[pair] += teams
+
+    with transaction.atomic():
+        HeroPickStat.objects.all().delete()
+        HeroPairStat.objects.all().delete()
+        HeroPickStat.objects.bulk_create(
+            [HeroPickStat(hero_id=hero_id, team_count=count) for hero_id, count in picks.items()],
+            batch_size=batch_size,
+        )
+        HeroPairStat.objects.bulk_create(
+            [
+                HeroPairStat(hero_id=hero, partner_id=partner, team_count=count)
+                for (hero, partner), count in pairs.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(picks), len(pairs)
@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.db import transaction
+from .compositions import composition_key, hero_mask
 from .models import Team, TeamMember, Vote, Comment
+from .rollups import move_team
+from accounts.avatars import avatar_url
+from marvel_rivals.fieldsets import SparseFieldsetSerializerMixin
 from heroes.serializers import HeroListSerializer
 
 class TeamMemberSerializer(serializers.ModelSerializer):
@@ -13,6 +17,14 @@ class TeamMemberSerializer(serializers.ModelSerializer):
         model = TeamMember
         fields = ['id', 'hero', 'hero_id', 'position']
 
+class TeamMemberRefSerializer(serializers.ModelSerializer):
+    """Team slot that references its hero by id (normalized responses)"""
+    hero_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = TeamMember
+        fields = ['id', 'hero_id', 'position']
+
 class UserSerializer(serializers.ModelSerializer):
     """Basic user info with avatar"""
     avatar_url = serializers.SerializerMethodField()
@@ -22,20 +34,11 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'avatar_url']
 
     def get_avatar_url(self, obj):
+        # Team cards and comments only ever render a small avatar.
         profile = getattr(obj, 'profile', None)
-        if profile and profile.avatar:
-            url = profile.avatar.url
-            if url.startswith('http'):
-                return url
-            request = self.context.get('request')
-            base = (
-                request.build_absolute_uri('/')
-                if request else 'http://127.0.0.1:8000/'
-            )
-            return f"{base.rstrip('/')}{url}"
-        return None
+        return avatar_url(profile, 'small', self.context.get('request'))
 
-class TeamListSerializer(serializers.ModelSerializer):
+class TeamListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Team list with members for display"""
     user = UserSerializer(read_only=True)
     members = TeamMemberSerializer(many=True, read_only=True)
@@ -64,15 +67,23 @@ class TeamListSerializer(serializers.ModelSerializer):
         return obj.members.count()
 
     def get_user_has_voted(self, obj):
+        voted = getattr(obj, 'user_voted', None)
+        if voted is not None:
+            return voted
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Vote.objects.filter(user=request.user, team=obj).exists()
         return False
 
-class TeamDetailSerializer(serializers.ModelSerializer):
+class NormalizedTeamListSerializer(TeamListSerializer):
+    """Team list item whose members point into a side-loaded ``heroes`` map"""
+    members = TeamMemberRefSerializer(many=True, read_only=True)
+
+class TeamDetailSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Full team with members and analysis"""
     user = UserSerializer(read_only=True)
     members = TeamMemberSerializer(many=True, read_only=True)
+    analysis_data = serializers.JSONField(read_only=True)
     upvote_count = serializers.IntegerField(read_only=True)
     user_has_voted = serializers.SerializerMethodField()
     
@@ -96,6 +107,9 @@ class TeamDetailSerializer(serializers.ModelSerializer):
     
     def get_user_has_voted(self, obj):
         """Check if current user has voted for this team"""
+        voted = getattr(obj, 'user_voted', None)
+        if voted is not None:
+            return voted
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return Vote.objects.filter(user=request.user, team=obj).exists()
@@ -104,10 +118,24 @@ class TeamDetailSerializer(serializers.ModelSerializer):
 class TeamCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating teams"""
     members = TeamMemberSerializer(many=True)
+    duplicate_of = serializers.SerializerMethodField()
     
     class Meta:
         model = Team
-        fields = ['name', 'description', 'members']
+        fields = ['name', 'description', 'members', 'composition_key', 'duplicate_of']
+        read_only_fields = ['composition_key']
+
+    def get_duplicate_of(self, obj):
+        """Slug of the earliest other team with the same six heroes, if any"""
+        if not obj.composition_key:
+            return None
+        return (
+            Team.objects.filter(composition_key=obj.composition_key)
+            .exclude(pk=obj.pk)
+            .order_by('created_at')
+            .values_list('slug', flat=True)
+            .first()
+        )
     
     def validate_members(self, members):
         if len(members) != 6:
@@ -144,6 +172,18 @@ class TeamCreateSerializer(serializers.ModelSerializer):
             ]
         )
 
+        hero_ids = [member['hero_id'] for member in members_data]
+        old_key = team.composition_key
+        signature = {
+            'hero_mask': hero_mask(hero_ids),
+            'composition_key': composition_key(hero_ids),
+        }
+        if any(getattr(team, field) != value for field, value in signature.items()):
+            Team.objects.filter(pk=team.pk).update(**signature)
+            for field, value in signature.items():
+                setattr(team, field, value)
+        move_team(team, old_key, signature['composition_key'], hero_ids)
+
     def create(self, validated_data):
         members_data = validated_data.pop('members')
         with transaction.atomic():
@@ -0,0 +1,23 @@
+"""Keep the team rollups in step with team deletes and votes."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Team, Vote
+from .rollups import adjust_votes_for_team, remove_team
+
+
+@receiver(post_delete, sender=Team)
+def team_deleted(sender, instance, **kwargs):
+    remove_team(instance)
+
+
+@receiver(post_save, sender=Vote)
+def vote_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_votes_for_team(instance.team_id, 1)
+
+
+@receiver(post_delete, sender=Vote)
+def vote_deleted(sender, instance, **kwargs):
+    adjust_votes_for_team(instance.team_id, -1)
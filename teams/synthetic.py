@@ -0,0 +1,250 @@
+"""Deterministic synthetic data for benchmarks and budget tests.
+
+Everything is drawn from one ``random.Random(seed)``, so the same arguments
+against the same hero table always produce the same rows. Rows are streamed
+into ``bulk_create`` in batches and never held in memory all at once; only
+the user and team primary keys are kept.
+
+Popularity is Zipf-shaped: team ranks are shuffled once, and a team's share
+of votes, comments and views falls off as ``1 / rank ** s``. Lineups repeat
+the same way, drawn from a pool of "meta" compositions, so the composition
+rollups see realistic duplication.
+
+Bulk inserts bypass the model signals; ``generate()`` rebuilds the team
+rollups itself when asked to.
+"""
+
+import bisect
+import itertools
+import random
+from collections import defaultdict
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from accounts.models import Profile
+from heroes.models import Hero
+
+from .compositions import composition_key, hero_mask
+from .models import Comment, Team, TeamMember, Vote
+from .rollups import rebuild_composition_stats, rebuild_hero_stats
+
+SIZES = {
+    "tiny": {"users": 200, "teams": 1_000, "votes": 10_000, "comments": 2_000},
+    "small": {"users": 5_000, "teams": 25_000, "votes": 250_000, "comments": 50_000},
+    "medium": {"users": 50_000, "teams": 200_000, "votes": 2_000_000, "comments": 400_000},
+    "large": {"users": 250_000, "teams": 1_000_000, "votes": 10_000_000, "comments": 2_000_000},
+}
+
+WORDS = (
+    "dive poke brawl sustain burst flank peel anchor engage disengage rotate "
+    "ultimate combo tempo frontline backline control pressure objective push"
+).split()
+
+ROLES = ("VANGUARD", "DUELIST", "STRATEGIST")
+
+
+def zipf_cdf(n, s):
+    """Cumulative Zipf weights for ranks 1..n, for ``bisect`` sampling."""
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+def zipf_counts(total, n, s, cap):
+    """Split ``total`` across ``n`` ranks by Zipf weight, at most ``cap`` each.
+
+    Whatever a capped rank can't take spills over to the next ranks, so the
+    result sums to ``min(total, n * cap)``.
+    """
+    weights = [1 / rank ** s for rank in range(1, n + 1)]
+    counts = [0] * n
+    remaining, weight_left = total, sum(weights)
+    for i, weight in enumerate(weights):
+        if remaining <= 0:
+            break
+        share = min(cap, remaining, round(remaining * weight / weight_left))
+        counts[i] = share
+        remaining -= share
+        weight_left -= weight
+    for i in range(n):
+        if remaining <= 0:
+            break
+        extra = min(cap - counts[i], remaining)
+        counts[i] += extra
+        remaining -= extra
+    return counts
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+class Generator:
+    def __init__(self, seed=0, prefix="synth", batch_size=5000, zipf_s=1.1, log=None):
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.zipf_s = zipf_s
+        self.log = log or (lambda message: None)
+
+    def _insert(self, model, rows):
+        inserted = 0
+        for batch in _batches(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            inserted += len(batch)
+        return inserted
+
+    def _lineups(self, heroes, count):
+        """``count`` distinct six-hero lineups, two per role where possible."""
+        by_role = defaultdict(list)
+        for hero_id, role in heroes:
+            by_role[role].append(hero_id)
+        balanced = all(len(by_role[role]) >= 2 for role in ROLES)
+        all_ids = [hero_id for hero_id, _ in heroes]
+
+        lineups, seen = [], set()
+        attempts = 0
+        while len(lineups) < count and attempts < count * 20:
+            attempts += 1
+            if balanced:
+                hero_ids = [h for role in ROLES for h in self.rng.sample(by_role[role], 2)]
+            else:
+                hero_ids = self.rng.sample(all_ids, 6)
+            key = composition_key(hero_ids)
+            if key not in seen:
+                seen.add(key)
+                self.rng.shuffle(hero_ids)
+                lineups.append((hero_ids, key, hero_mask(hero_ids)))
+        return lineups
+
+    def users(self, count):
+        # A fixed unusable hash: real hashing would dominate the run.
+        password = UNUSABLE_PASSWORD_PREFIX + "synthetic"
+        names = (f"{self.prefix}-user-{i}" for i in range(count))
+        self._insert(User, (User(username=name, password=password) for name in names))
+        user_ids = list(
+            User.objects.filter(username__startswith=f"{self.prefix}-user-")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        self._insert(
+            Profile,
+            (Profile(user_id=user_id, bio=_sentence(self.rng, 8) if i % 3 == 0 else "")
+             for i, user_id in enumerate(user_ids)),
+        )
+        self.log(f"Created {len(user_ids)} users with profiles.")
+        return user_ids
+
+    def teams(self, count, user_ids, heroes):
+        lineups = self._lineups(heroes, max(1, count // 10))
+        lineup_cdf = zipf_cdf(len(lineups), self.zipf_s)
+        view_counts = zipf_counts(count * 200, count, self.zipf_s, cap=1_000_000)
+        # Rank -> team index, so popularity isn't tied to insertion order.
+        ranks = list(range(count))
+        self.rng.shuffle(ranks)
+        views = [0] * count
+        for rank, index in enumerate(ranks):
+            views[index] = view_counts[rank]
+
+        chosen = []
+
+        def rows():
+            for i in range(count):
+                hero_ids, key, mask = lineups[
+                    bisect.bisect_left(lineup_cdf, self.rng.random() * lineup_cdf[-1])
+                ]
+                chosen.append(hero_ids)
+                yield Team(
+                    user_id=self.rng.choice(user_ids),
+                    name=f"Synthetic Team {i}",
+                    slug=f"{self.prefix}-team-{i}",
+                    description=_sentence(self.rng, self.rng.randint(0, 40)),
+                    views=views[i],
+                    composition_score=self.rng.randint(35, 98),
+                    hero_mask=mask,
+                    composition_key=key,
+                )
+
+        self._insert(Team, rows())
+        team_ids = list(
+            Team.objects.filter(slug__startswith=f"{self.prefix}-team-")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        self._insert(
+            TeamMember,
+            (
+                TeamMember(team_id=team_id, hero_id=hero_id, position=position)
+                for team_id, hero_ids in zip(team_ids, chosen)
+                for position, hero_id in enumerate(hero_ids, start=1)
+            ),
+        )
+        self.log(f"Created {len(team_ids)} teams from {len(lineups)} lineups.")
+        return [team_ids[index] for index in ranks]
+
+    def votes(self, count, user_ids, ranked_team_ids):
+        counts = zipf_counts(count, len(ranked_team_ids), self.zipf_s, cap=len(user_ids))
+
+        def rows():
+            for team_id, voters in zip(ranked_team_ids, counts):
+                for user_id in self.rng.sample(user_ids, voters):
+                    yield Vote(user_id=user_id, team_id=team_id)
+
+        created = self._insert(Vote, rows())
+        self.log(f"Created {created} votes.")
+        return created
+
+    def comments(self, count, user_ids, ranked_team_ids):
+        counts = zipf_counts(count, len(ranked_team_ids), self.zipf_s, cap=count)
+
+        def rows():
+            for team_id, comments in zip(ranked_team_ids, counts):
+                for _ in range(comments):
+                    yield Comment(
+                        user_id=self.rng.choice(user_ids),
+                        team_id=team_id,
+                        text=_sentence(self.rng, self.rng.randint(3, 30)),
+                    )
+
+        created = self._insert(Comment, rows())
+        self.log(f"Created {created} comments.")
+        return created
+
+
+def generate(users, teams, votes, comments, seed=0, prefix="synth",
+             batch_size=5000, zipf_s=1.1, rollups=True, log=None):
+    """Insert a synthetic dataset on top of the existing heroes.
+
+    Returns team ids ordered from most to least popular.
+    """
+    heroes = list(Hero.objects.order_by("pk").values_list("pk", "role"))
+    if len(heroes) < 6:
+        raise ValueError("At least 6 heroes are needed; run seed_heroes first.")
+    if User.objects.filter(username__startswith=f"{prefix}-user-").exists():
+        raise ValueError(f"Synthetic rows with prefix {prefix!r} already exist.")
+
+    generator = Generator(seed=seed, prefix=prefix, batch_size=batch_size, zipf_s=zipf_s, log=log)
+    user_ids = generator.users(max(1, users))
+    ranked_team_ids = generator.teams(teams, user_ids, heroes)
+    if ranked_team_ids:
+        generator.votes(votes, user_ids, ranked_team_ids)
+        generator.comments(comments, user_ids, ranked_team_ids)
+
+    if rollups:
+        compositions = rebuild_composition_stats(batch_size=batch_size)
+        picks, pairs = rebuild_hero_stats(batch_size=batch_size)
+        generator.log(
+            f"Rebuilt {compositions} composition rows, {picks} hero pick rows and {pairs} pair rows."
+        )
+    if connection.vendor in ("postgresql", "sqlite"):
+        # Fresh planner statistics, or the first benchmark run measures stale plans.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    return ranked_team_ids
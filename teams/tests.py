@@ -1,3 +1,391 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import Profile
+from heroes.index import bump_catalog_version
+from heroes.models import Hero
+from marvel_rivals.renderers import UJSONRenderer
+from marvel_rivals.testing import EndpointBudgetMixin, QuietRequestLogMixin, seed_dataset
+
+from .models import Comment, CompositionStats, HeroPairStat, HeroPickStat, Team, TeamMember, Vote
+from .rollups import rebuild_composition_stats, rebuild_hero_stats
+from .synthetic import generate
+
+FILE_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def _renderers(*classes):
+    return {**settings.REST_FRAMEWORK, "DEFAULT_RENDERER_CLASSES": list(classes)}
+
+
+FAST = override_settings(
+    FAST_READ_MODELS=True,
+    REST_FRAMEWORK=_renderers("marvel_rivals.renderers.UJSONRenderer"),
+)
+SLOW = override_settings(
+    FAST_READ_MODELS=False,
+    REST_FRAMEWORK=_renderers("rest_framework.renderers.JSONRenderer"),
+)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, STORAGES=FILE_STORAGES, MEDIA_URL="/media/")
+class FastPathParityTests(QuietRequestLogMixin, TestCase):
+    """The .values() projections + ujson must match the serializers byte for byte."""
+
+    @classmethod
+    def setUpTestData(cls):
+        heroes = [
+            Hero.objects.create(
+                name=f"Hero {i}",
+                role=role,
+                difficulty=1 + i % 3,
+                description=f'Line one\nline "two" </script>   {i} héros',
+                playstyle_tags=["dive", "burst"] if i % 2 else [],
+                image=f"heroes/hero_{i}.png" if i % 3 else None,
+            )
+            for i, role in enumerate(["VANGUARD", "DUELIST", "STRATEGIST"] * 3)
+        ]
+        heroes[0].synergies.add(heroes[1], heroes[2])
+        heroes[1].counters.add(heroes[0])
+
+        cls.owner = User.objects.create_user("owner", password="pw-123456!")
+        cls.voter = User.objects.create_user("voter", password="pw-123456!")
+        User.objects.create_user("no-profile", password="pw-123456!")
+        Profile.objects.create(
+            user=cls.owner,
+            avatar="avatars/owner.png",
+            avatar_variants={"source": "avatars/owner.png", "sizes": {"small": "avatars/variants/1/s.webp"}},
+        )
+        Profile.objects.create(user=cls.voter)
+
+        cls.teams = []
+        for t in range(7):
+            user = cls.owner if t % 2 else cls.voter
+            team = Team.objects.create(user=user, name=f"Team {t}", description="x" * t, views=t)
+            TeamMember.objects.bulk_create(
+                TeamMember(team=team, hero=heroes[(t + p) % len(heroes)], position=p + 1)
+                for p in range(6)
+            )
+            cls.teams.append(team)
+        for team in cls.teams[:3]:
+            Vote.objects.create(user=cls.voter, team=team)
+        Vote.objects.create(user=cls.owner, team=cls.teams[0])
+        for i in range(3):
+            Comment.objects.create(user=cls.owner if i % 2 else cls.voter, team=cls.teams[0], text=f"gg {i} / ✓")
+
+    def setUp(self):
+        cache.clear()
+        bump_catalog_version()
+
+    def assertSameBytes(self, path, user=None):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        with SLOW:
+            expected = client.get(path)
+        with FAST:
+            actual = client.get(path)
+        self.assertEqual(expected.status_code, 200, expected.content)
+        self.assertEqual(actual.status_code, 200)
+        self.assertEqual(actual.content, expected.content, path)
+
+    def test_team_list(self):
+        for user in (None, self.voter):
+            for path in (
+                "/api/teams/",
+                "/api/teams/?page_size=25",
+                "/api/teams/?page=2",
+                "/api/teams/?ordering=popular&page_size=25",
+                f"/api/teams/?user={self.owner.pk}",
+            ):
+                with self.subTest(path=path, user=user):
+                    self.assertSameBytes(path, user)
+
+    def test_team_list_shapes_and_fieldsets(self):
+        for path in (
+            "/api/teams/?format=normalized&page_size=25",
+            "/api/teams/?fields=id,name,user,upvote_count",
+            "/api/teams/?omit=members,description",
+            "/api/teams/?fields=member_count,user_has_voted&format=normalized",
+        ):
+            with self.subTest(path=path):
+                self.assertSameBytes(path, self.voter)
+
+    def test_my_teams(self):
+        for path in ("/api/teams/my_teams/", "/api/teams/my_teams/?format=normalized"):
+            with self.subTest(path=path):
+                self.assertSameBytes(path, self.owner)
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        plain = client.get("/api/teams/my_teams/").json()
+        normalized = client.get("/api/teams/my_teams/?format=normalized").json()
+        self.assertIsInstance(plain, list)  # the default shape stays a bare list
+        self.assertEqual(set(normalized), {"results", "heroes"})
+        self.assertEqual(len(plain), len(normalized["results"]))
+
+    def test_comments(self):
+        self.assertSameBytes(f"/api/teams/{self.teams[0].slug}/comments/")
+        self.assertSameBytes(f"/api/teams/{self.teams[1].slug}/comments/")
+
+    def test_hero_list(self):
+        for path in (
+            "/api/heroes/",
+            "/api/heroes/?role=DUELIST",
+            "/api/heroes/?search=Hero%201&ordering=-difficulty",
+            "/api/heroes/?fields=id,name,synergies",
+            "/api/heroes/by_role/?role=VANGUARD",
+        ):
+            with self.subTest(path=path):
+                self.assertSameBytes(path)
+
+    def test_serializer_paths_report_serialize_timing(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        paths = (
+            "/api/teams/",
+            f"/api/teams/{self.teams[0].slug}/",
+            f"/api/teams/{self.teams[0].slug}/comments/",
+            "/api/teams/my_teams/",
+            f"/api/heroes/{Hero.objects.first().pk}/",
+            "/api/auth/profile/",
+            "/api/auth/users/owner/",
+        )
+        with SLOW, override_settings(SERVER_TIMING_HEADER=True):
+            for path in paths:
+                with self.subTest(path=path):
+                    response = client.get(path)
+                    self.assertEqual(response.status_code, 200, response.content[:200])
+                    self.assertIn("serialize;dur=", response["Server-Timing"])
+
+
+class UJSONRendererTests(QuietRequestLogMixin, TestCase):
+    def test_matches_json_renderer(self):
+        payloads = [
+            {"text": "a\x00b\x1f\x7f\n\t\"\\/ </script> &    héros 🦸", "n": None},
+            [0.1, 1.0, 0.5555555555555556, 1e22, 1.5e300, -(2**63), 2**63 - 1],
+            {"small": 1e-05, "tiny": 3.14e-7},
+            {1: "int key", "nested": [{"ok": True}, []]},
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                self.assertEqual(UJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_falls_back_for_types_ujson_cannot_encode(self):
+        import datetime
+        import uuid
+
+        payload = {"when": datetime.date(2024, 1, 2), "id": uuid.UUID(int=7)}
+        self.assertEqual(UJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+    def test_indented_output_uses_stdlib(self):
+        context = {"indent": 2}
+        payload = {"a": [1, 2]}
+        self.assertEqual(
+            UJSONRenderer().render(payload, "application/json", context),
+            JSONRenderer().render(payload, "application/json", context),
+        )
+
+
+class TeamEndpointBudgetTests(EndpointBudgetMixin, TestCase):
+    """Query-count and latency budgets for the team endpoints (warm caches)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset()
+        cls.user = cls.data["users"][0]
+        cls.team = cls.data["teams"][0]
+
+    def test_team_list_orderings(self):
+        # count, page rows, members, votes, own votes (+ catalog check)
+        for ordering in ("-created_at", "popular", "-views", "name", "-composition_score"):
+            for user in (None, self.user):
+                with self.subTest(ordering=ordering, user=user):
+                    self.assertWithinBudget(
+                        f"/api/teams/?ordering={ordering}&page_size=25", 6, 250, user=user
+                    )
+
+    def test_team_list_variants(self):
+        for path in (
+            "/api/teams/?format=normalized&page_size=25",
+            "/api/teams/?fields=id,slug,name,user,upvote_count&page_size=25",
+            f"/api/teams/?heroes={self.team.members.first().hero_id}",
+        ):
+            with self.subTest(path=path):
+                self.assertWithinBudget(path, 6, 250, user=self.user)
+
+    def test_my_teams(self):
+        owner = self.team.user
+        self.assertWithinBudget("/api/teams/my_teams/", 5, 250, user=owner)
+
+    def test_team_detail(self):
+        # team (+user, profile, analysis, votes), members, heroes, synergies,
+        # counters, views UPDATE, views refresh
+        for user in (None, self.user):
+            with self.subTest(user=user):
+                self.assertWithinBudget(f"/api/teams/{self.team.slug}/", 7, 150, user=user)
+
+    def test_comments(self):
+        self.assertWithinBudget(f"/api/teams/{self.team.slug}/comments/", 2, 150)
+
+    def test_vote_toggle(self):
+        # team, get_or_create (+savepoint), stats rollups, upvote count
+        self.assertWithinBudget(
+            f"/api/teams/{self.team.slug}/vote/", 10, 150, method="post", user=self.user
+        )
+
+    def test_compositions_and_hero_stats(self):
+        self.assertWithinBudget("/api/teams/compositions/", 3, 150)
+        self.assertWithinBudget("/api/teams/hero-stats/", 4, 150)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RollupDeltaTests(QuietRequestLogMixin, TestCase):
+    """Creating, editing and deleting teams keeps the rollups equal to a rebuild."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.heroes = [
+            Hero.objects.create(name=f"Rollup Hero {i}", role=["VANGUARD", "DUELIST", "STRATEGIST"][i % 3])
+            for i in range(9)
+        ]
+        cls.owner = User.objects.create_user("rollup-owner")
+        cls.voter = User.objects.create_user("rollup-voter")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def members(self, *indexes):
+        return [{"hero_id": self.heroes[i].id, "position": p + 1} for p, i in enumerate(indexes)]
+
+    def create(self, *indexes):
+        response = self.client.post(
+            "/api/teams/", {"name": "Rollup team", "members": self.members(*indexes)}, format="json"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return Team.objects.latest("pk")
+
+    @staticmethod
+    def rollups():
+        return (
+            dict(HeroPickStat.objects.filter(team_count__gt=0).values_list("hero_id", "team_count")),
+            {
+                (hero, partner): count
+                for hero, partner, count in HeroPairStat.objects.filter(team_count__gt=0).values_list(
+                    "hero_id", "partner_id", "team_count"
+                )
+            },
+            {
+                key: (teams, votes)
+                for key, teams, votes in CompositionStats.objects.filter(team_count__gt=0).values_list(
+                    "key", "team_count", "total_votes"
+                )
+            },
+        )
+
+    def assertMatchesRebuild(self):
+        maintained = self.rollups()
+        rebuild_composition_stats()
+        rebuild_hero_stats()
+        self.assertEqual(maintained, self.rollups())
+
+    def test_create_edit_delete(self):
+        first = self.create(0, 1, 2, 3, 4, 5)
+        self.create(0, 1, 2, 3, 4, 5)
+        third = self.create(3, 4, 5, 6, 7, 8)
+        Vote.objects.create(user=self.voter, team=first)
+        self.assertEqual(self.rollups()[0][self.heroes[3].id], 3)
+        self.assertMatchesRebuild()
+
+        # Swap two heroes: only the picks/pairs that differ move.
+        response = self.client.put(
+            f"/api/teams/{first.slug}/",
+            {"name": "Rollup team", "members": self.members(0, 1, 2, 3, 6, 7)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.rollups()[0][self.heroes[5].id], 2)
+        self.assertMatchesRebuild()
+
+        for team in (first, third):
+            self.assertEqual(self.client.delete(f"/api/teams/{team.slug}/").status_code, 204)
+        self.assertEqual(self.rollups()[0], {self.heroes[i].id: 1 for i in range(6)})
+        self.assertMatchesRebuild()
+
+    def test_hero_stats_totals_and_partner_limit(self):
+        self.create(0, 1, 2, 3, 4, 5)
+        self.create(3, 4, 5, 6, 7, 8)
+
+        data = self.client.get("/api/teams/hero-stats/").json()
+        self.assertEqual(data["total_teams"], 2)
+        self.assertEqual(
+            {hero["id"]: hero["pick_rate"] for hero in data["heroes"]}[self.heroes[3].id], 1.0
+        )
+
+        response = self.client.get("/api/teams/hero-stats/?partners=-3")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(hero["paired_with"] == [] for hero in response.json()["heroes"]))
+
+
+class SyntheticDatasetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(12):
+            Hero.objects.create(name=f"Synthetic Hero {i}", role=["VANGUARD", "DUELIST", "STRATEGIST"][i % 3])
+
+    @staticmethod
+    def dataset(**overrides):
+        options = {"users": 15, "teams": 30, "votes": 120, "comments": 25, "seed": 7, "batch_size": 8}
+        ranked = generate(prefix="det", **{**options, **overrides})
+        rank = {team_id: i for i, team_id in enumerate(ranked)}
+        teams = {team.pk: team for team in Team.objects.filter(pk__in=ranked).select_related("user")}
+        lineups = {}
+        for team_id, hero_name, position in TeamMember.objects.filter(team__in=ranked).values_list(
+            "team_id", "hero__name", "position"
+        ):
+            lineups.setdefault(team_id, []).append((position, hero_name))
+        rows = {
+            "users": sorted(User.objects.filter(username__startswith="det-").values_list("username", flat=True)),
+            "teams": [
+                (teams[pk].user.username, teams[pk].name, teams[pk].views, sorted(lineups[pk]))
+                for pk in ranked
+            ],
+            "votes": sorted(
+                (username, rank[team_id])
+                for username, team_id in Vote.objects.filter(team__in=ranked).values_list("user__username", "team_id")
+            ),
+            "comments": sorted(
+                (username, rank[team_id], text)
+                for username, team_id, text in Comment.objects.filter(team__in=ranked).values_list(
+                    "user__username", "team_id", "text"
+                )
+            ),
+        }
+        return rows, RollupDeltaTests.rollups()
+
+    def test_same_seed_same_rows_and_rollups(self):
+        first, rollups = self.dataset()
+        self.assertEqual(len(first["teams"]), 30)
+        self.assertEqual(len(first["votes"]), 120)
+
+        # The rollups generate() wrote are exactly what a rebuild produces.
+        rebuild_composition_stats()
+        rebuild_hero_stats()
+        self.assertEqual(rollups, RollupDeltaTests.rollups())
+        _picks, _pairs, compositions = rollups
+        self.assertEqual(sum(teams for teams, _votes in compositions.values()), 30)
+        self.assertEqual(sum(votes for _teams, votes in compositions.values()), 120)
+
+        User.objects.filter(username__startswith="det-").delete()
+        self.assertEqual(self.dataset(), (first, rollups))
+
+        User.objects.filter(username__startswith="det-").delete()
+        self.assertNotEqual(self.dataset(seed=8)[0], first)
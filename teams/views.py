@@ -1,15 +1,26 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from django.db.models import F
+from django.db.models import F, FloatField, Q, Sum
+from django.db.models.functions import Cast
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from .models import Team, Vote
+from . import projections
+from .compositions import filter_teams_with_heroes
+from heroes.models import Hero
+from heroes.serializers import hero_list_payloads
+from marvel_rivals import metrics
+from marvel_rivals.fieldsets import SparseFieldsetMixin
+from marvel_rivals.instrumentation import SerializeTimingMixin, serialized, track
+from marvel_rivals.negotiation import wants_shape
+from .models import CompositionStats, HeroPairStat, HeroPickStat, Team, Vote, annotate_team_votes
 from .pagination import TeamPagination
 from .permissions import IsOwnerOrReadOnly
 from .serializers import (
     TeamListSerializer,
+    NormalizedTeamListSerializer,
     TeamDetailSerializer,
     TeamCreateSerializer,
     CommentSerializer,
@@ -18,14 +29,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-class TeamViewSet(viewsets.ModelViewSet):
+class TeamViewSet(SerializeTimingMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     API endpoint for teams
+
+    Read endpoints accept ?fields=a,b or ?omit=c to trim the response.
     """
     queryset = (
         Team.objects.all()
-        .select_related('user')
-        .prefetch_related('members__hero')
+        .select_related('user__profile')
+        .prefetch_related('members__hero__synergies', 'members__hero__counters')
     )
 
     # ...
@@ -39,29 +52,90 @@ class TeamViewSet(viewsets.ModelViewSet):
             return TeamCreateSerializer
         elif self.action == 'retrieve':
             return TeamDetailSerializer
+        elif self._normalized():
+            return NormalizedTeamListSerializer
         return TeamListSerializer
+
+    def _normalized(self):
+        """?format=normalized: members carry hero_id, heroes are side-loaded once"""
+        return self.request is not None and wants_shape(self.request, 'normalized')
+
+    def _with_heroes(self, response, teams):
+        hero_ids = {member['hero_id'] for team in teams for member in team.get('members', ())}
+        response.data['heroes'] = hero_list_payloads(hero_ids)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if projections.enabled():
+            response = self._projected_list(request)
+        else:
+            response = super().list(request, *args, **kwargs)
+        if self._normalized():
+            self._with_heroes(response, response.data['results'])
+        return response
+    
+    def _projected_list(self, request):
+        """Same payload as TeamListSerializer, built from .values() rows"""
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        page = self.paginate_queryset(queryset.values(*projections.TEAM_COLUMNS))
+        fields, omit = self.get_sparse_fieldset()
+        with track('serialize'):
+            data = projections.team_list_items(
+                page, request, fields, omit, normalized=self._normalized()
+            )
+        return self.get_paginated_response(data)
     
     def get_queryset(self):
-        from django.db.models import Count
         queryset = self.queryset
         
         # Filter by user
         user_id = self.request.query_params.get('user', None)
         if user_id:
             queryset = queryset.filter(user_id=user_id)
+
+        # Filter by heroes: ?heroes=3,17 -> teams containing all of them
+        heroes = self.request.query_params.get('heroes', None)
+        if heroes:
+            try:
+                hero_ids = {int(hero_id) for hero_id in heroes.split(',') if hero_id.strip()}
+            except ValueError:
+                raise ValidationError({'heroes': 'Expected comma-separated hero ids.'})
+            if len(hero_ids) > 6:
+                raise ValidationError({'heroes': 'A team has at most 6 heroes.'})
+            queryset = filter_teams_with_heroes(queryset, hero_ids)
         
         # Order by popularity or newest
         ordering = self.request.query_params.get('ordering', '-created_at')
         if ordering == 'popular':
-            # Annotate with vote count and order by it
-            queryset = queryset.annotate(vote_count=Count('votes')).order_by(
-                '-vote_count',
-                '-views',
-            )
+            # The same correlated vote count the serializers read, rather than
+            # a JOIN + GROUP BY over every team's votes.
+            queryset = annotate_team_votes(queryset).order_by('-upvote_total', '-views')
         else:
             queryset = queryset.order_by(ordering)
+
+        if self.action in ('list', 'retrieve'):
+            queryset = self._shape_queryset(queryset)
+        else:
+            # vote/comments/update only need the team row itself.
+            queryset = queryset.prefetch_related(None)
         
         return queryset
+
+    def _shape_queryset(self, queryset):
+        """Load only what the chosen serializer and fieldset will read"""
+        if self.sparse_excludes('user'):
+            queryset = queryset.select_related(None)
+        if self.action == 'retrieve' and not self.sparse_excludes('analysis_data'):
+            # The analysis blob lives in its own table; join it for detail only.
+            queryset = queryset.select_related('analysis')
+        if not self.sparse_excludes('upvote_count', 'user_has_voted'):
+            queryset = annotate_team_votes(queryset, self.request.user)
+        if self.sparse_excludes('members', 'member_count'):
+            queryset = queryset.prefetch_related(None)
+        elif self._normalized():
+            # Hero rows come from the shared catalog payloads instead.
+            queryset = queryset.prefetch_related(None).prefetch_related('members')
+        return self.prune_queryset(queryset)
     
     def retrieve(self, request, *args, **kwargs):
         """Increment view count when team is viewed"""
@@ -70,7 +144,7 @@ class TeamViewSet(viewsets.ModelViewSet):
         instance.refresh_from_db(fields=['views'])
         
         serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return Response(serialized(serializer))
     
     def perform_create(self, serializer):
         """Set the authenticated user when creating a team"""
@@ -105,13 +179,18 @@ class TeamViewSet(viewsets.ModelViewSet):
         team = self.get_object()
         
         if request.method == 'GET':
+            if projections.enabled():
+                rows = team.comments.values(*projections.COMMENT_COLUMNS)
+                with track('serialize'):
+                    data = projections.comment_items(rows, request)
+                return Response(data)
             comments = team.comments.all()
             serializer = CommentSerializer(
                 comments,
                 many=True,
                 context={'request': request},
             )
-            return Response(serializer.data)
+            return Response(serialized(serializer))
         
         # POST - create comment
         serializer = CommentSerializer(
@@ -128,6 +207,7 @@ class TeamViewSet(viewsets.ModelViewSet):
             try:
                 self._broadcast_comment(team.slug, response_serializer.data)
             except Exception:
+                metrics.inc('rivals_comment_broadcast_failures_total')
                 logger.exception("Comment broadcast failed (Redis/Channels). Comment saved anyway.")
             return Response(
                 response_serializer.data,
@@ -142,10 +222,115 @@ class TeamViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def my_teams(self, request):
-        """Get current user's teams"""
-        teams = self.queryset.filter(user=request.user)
-        serializer = TeamListSerializer(teams, many=True)
-        return Response(serializer.data)
+        """Get current user's teams; ?format=normalized wraps them as {"results", "heroes"}"""
+        teams = self._shape_queryset(self.queryset.filter(user=request.user))
+        if projections.enabled():
+            fields, omit = self.get_sparse_fieldset()
+            with track('serialize'):
+                data = projections.team_list_items(
+                    teams.prefetch_related(None).values(*projections.TEAM_COLUMNS),
+                    request,
+                    fields,
+                    omit,
+                    normalized=self._normalized(),
+                )
+        else:
+            data = serialized(self.get_serializer(teams, many=True))
+        if self._normalized():
+            return self._with_heroes(Response({'results': data}), data)
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def compositions(self, request):
+        """Most popular hero lineups, served from the CompositionStats rollup
+
+        ?ordering=teams (default) | votes | score
+        """
+        orderings = {
+            'teams': ('-team_count', '-total_votes'),
+            'votes': ('-total_votes', '-team_count'),
+            'score': ('-average_score', '-team_count'),
+        }
+        ordering = orderings.get(
+            request.query_params.get('ordering', 'teams'), orderings['teams']
+        )
+        rows = (
+            CompositionStats.objects.filter(team_count__gt=0)
+            .annotate(
+                average_score=Cast('score_total', FloatField()) / F('team_count'),
+            )
+            .order_by(*ordering)
+        )
+        page = self.paginate_queryset(rows)
+
+        heroes = Hero.objects.only('id', 'name', 'role').in_bulk(
+            {hero_id for row in page for hero_id in row.hero_ids}
+        )
+        data = [
+            {
+                'composition_key': row.key,
+                'heroes': [
+                    {'id': hero.id, 'name': hero.name, 'role': hero.role}
+                    for hero in (heroes.get(hero_id) for hero_id in row.hero_ids)
+                    if hero
+                ],
+                'team_count': row.team_count,
+                'total_votes': row.total_votes,
+                'average_score': round(row.average_score, 1),
+            }
+            for row in page
+        ]
+        return self.get_paginated_response(data)
+
+    @action(detail=False, methods=['get'], url_path='hero-stats')
+    def hero_stats(self, request):
+        """Hero pick rates and "frequently paired with" lists from the pick/pair rollups
+
+        ?hero=<id> limits the response to one hero, ?partners=<n> (default 5,
+        max 20) sets the length of each paired-with list. Pick rates are out
+        of the teams that have a lineup, summed off the composition rollup.
+        """
+        try:
+            partners_limit = max(0, min(int(request.query_params.get('partners', 5)), 20))
+            hero_id = request.query_params.get('hero')
+            hero_id = int(hero_id) if hero_id else None
+        except ValueError:
+            raise ValidationError({'detail': 'hero and partners must be integers.'})
+
+        total_teams = CompositionStats.objects.aggregate(total=Sum('team_count'))['total'] or 0
+        picks = HeroPickStat.objects.filter(team_count__gt=0)
+        pairs = HeroPairStat.objects.filter(team_count__gt=0)
+        if hero_id is not None:
+            picks = picks.filter(hero_id=hero_id)
+            pairs = pairs.filter(Q(hero_id=hero_id) | Q(partner_id=hero_id))
+        pick_counts = dict(picks.values_list('hero_id', 'team_count'))
+
+        partners = {}
+        for hero, partner, count in pairs.values_list('hero_id', 'partner_id', 'team_count'):
+            partners.setdefault(hero, []).append((count, partner))
+            partners.setdefault(partner, []).append((count, hero))
+
+        heroes = Hero.objects.only('id', 'name', 'role').in_bulk(
+            set(pick_counts) | {partner for rows in partners.values() for _, partner in rows}
+        )
+
+        def brief(pk):
+            hero = heroes.get(pk)
+            return {'id': pk, 'name': hero.name if hero else None, 'role': hero.role if hero else None}
+
+        data = []
+        for pk, count in sorted(pick_counts.items(), key=lambda item: -item[1]):
+            top = sorted(partners.get(pk, []), key=lambda row: (-row[0], row[1]))[:partners_limit]
+            data.append({
+                **brief(pk),
+                'team_count': count,
+                'pick_rate': round(count / total_teams, 4) if total_teams else 0.0,
+                'paired_with': [
+                    {**brief(partner), 'team_count': together, 'rate': round(together / count, 4)}
+                    for together, partner in top
+                ],
+            })
+        return Response({'total_teams': total_teams, 'heroes': data})
 
     @staticmethod
     def _broadcast_comment(slug, payload):